@@ -293,7 +293,7 @@ except ImportError:
 
 bambou_logger.addHandler(NullHandler())
 
-__all__ = ['NURESTRootObject', 'NURESTConnection', 'NURESTModelController', 'NURESTFetcher', 'NURESTLoginController', 'NURESTObject', 'NURESTPushCenter', 'NURESTRequest', 'NURESTResponse', 'NURESTSession', 'BambouConfig']
+__all__ = ['NURESTRootObject', 'NURESTConnection', 'NURESTModelController', 'NURESTFetcher', 'NURESTLoginController', 'NURESTObject', 'NURESTPushCenter', 'NURESTRequest', 'NURESTResponse', 'NURESTSession', 'NURESTRetryPolicy', 'NURESTCircuitBreaker', 'NURESTRateLimiter', 'NURESTRequestCoalescer', 'NURESTMiddleware', 'NURESTMetrics', 'NURESTTracer', 'NURESTSpan', 'NURESTSpanExporter', 'NURESTJSONFileSpanExporter', 'NURESTProfiler', 'NURESTAPIKeyRenewer', 'NURESTTreeFetcher', 'NURESTSnapshot', 'NURESTObjectStore', 'NURESTMirror', 'NURESTFilter', 'NURESTCountCache', 'NURESTChangeSet', 'BambouConfig']
 
 from bambou.nurest_session import NURESTSession
 from bambou.nurest_root_object import NURESTRootObject
@@ -305,4 +305,20 @@ from bambou.nurest_push_center import NURESTPushCenter
 from bambou.nurest_request import NURESTRequest
 from bambou.nurest_response import NURESTResponse
 from bambou.nurest_modelcontroller import NURESTModelController
+from bambou.nurest_retry_policy import NURESTRetryPolicy
+from bambou.nurest_circuit_breaker import NURESTCircuitBreaker
+from bambou.nurest_rate_limiter import NURESTRateLimiter
+from bambou.nurest_request_coalescer import NURESTRequestCoalescer
+from bambou.nurest_middleware import NURESTMiddleware
+from bambou.nurest_metrics import NURESTMetrics
+from bambou.nurest_tracer import NURESTTracer, NURESTSpan, NURESTSpanExporter, NURESTJSONFileSpanExporter
+from bambou.nurest_profiler import NURESTProfiler
+from bambou.nurest_api_key_renewer import NURESTAPIKeyRenewer
+from bambou.nurest_tree_fetcher import NURESTTreeFetcher
+from bambou.nurest_snapshot import NURESTSnapshot
+from bambou.nurest_object_store import NURESTObjectStore
+from bambou.nurest_mirror import NURESTMirror
+from bambou.nurest_filter import NURESTFilter
+from bambou.nurest_count_cache import NURESTCountCache
+from bambou.nurest_change_set import NURESTChangeSet
 from bambou.config import BambouConfig
@@ -25,12 +25,36 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import os
+
 try:
     import configparser
 except ImportError:
     import ConfigParser as configparser
 
 
+def _parse_sample_rate(value, default=1.0):
+    """ Parses a profiling sample rate, clamped between 0 and 1
+
+        Args:
+            value (string): the value to parse, like the one of BAMBOU_PROFILING_SAMPLE_RATE
+            default (float): the rate to use when the value is missing or malformed
+
+        Returns:
+            float: the sample rate
+    """
+
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        return default
+
+    if rate != rate:
+        return default
+
+    return min(max(rate, 0.0), 1.0)
+
+
 class BambouConfig(object):
     """ Bambou configuration
 
@@ -41,6 +65,9 @@ class BambouConfig(object):
     _config_parser = None
     _id_remote_name = "ID"
     _id_type = str
+    _metrics_enabled = os.environ.get('BAMBOU_METRICS', '').lower() in ('1', 'true', 'yes')
+    _profiling_enabled = os.environ.get('BAMBOU_PROFILING', '').lower() in ('1', 'true', 'yes')
+    _profiling_sample_rate = _parse_sample_rate(os.environ.get('BAMBOU_PROFILING_SAMPLE_RATE'))
 
     @classmethod
     def set_id_remote_name(cls, remote_name):
@@ -89,6 +116,32 @@ class BambouConfig(object):
         """
         cls._should_raise_bambou_http_error = should_raise
 
+    @classmethod
+    def set_metrics_enabled(cls, enabled):
+        """ Set if bambou should collect metrics in
+            the default NURESTMetrics registry
+
+            Args:
+                enabled (bool): a boolean. Default is False, or the value of BAMBOU_METRICS.
+
+        """
+        cls._metrics_enabled = enabled
+
+    @classmethod
+    def set_profiling_enabled(cls, enabled, sample_rate=None):
+        """ Set if bambou should record the time spent in
+            its hot paths in the default NURESTProfiler
+
+            Args:
+                enabled (bool): a boolean. Default is False, or the value of BAMBOU_PROFILING.
+                sample_rate (float): the fraction of calls to time, between 0 and 1. Default keeps the current rate.
+
+        """
+        cls._profiling_enabled = enabled
+
+        if sample_rate is not None:
+            cls._profiling_sample_rate = min(max(sample_rate, 0.0), 1.0)
+
     @classmethod
     def set_default_values_config_file(cls, file_path):
         """ Set the name for an alternative default value configuration file
@@ -43,6 +43,45 @@ class BambouHTTPError(Exception):
         super(BambouHTTPError, self).__init__("[HTTP %s(%s)] %s" % (response.status_code, response.reason, response.errors))
 
 
+class BambouCircuitOpenError(BambouHTTPError):
+    """ Bambou CircuitOpenError
+
+        Raised when a request is not sent because the circuit
+        of its endpoint is open.
+    """
+    def __init__(self, connection, endpoint_key):
+        """ Intializes a BambouCircuitOpenError
+
+            Args:
+                connection: the Connection object
+                endpoint_key: the key of the open circuit
+
+        """
+        self.endpoint_key = endpoint_key
+
+        super(BambouCircuitOpenError, self).__init__(connection)
+
+
+class BambouRateLimitError(Exception):
+    """ Bambou RateLimitError
+
+        Raised when a request is not sent because the
+        client side rate limit has been reached.
+    """
+    def __init__(self, resource_name, retry_after):
+        """ Intializes a BambouRateLimitError
+
+            Args:
+                resource_name: the resource name of the request
+                retry_after: the number of seconds before a request can be sent
+
+        """
+        self.resource_name = resource_name
+        self.retry_after = retry_after
+
+        super(BambouRateLimitError, self).__init__("Rate limit reached for %s. Retry in %.3fs" % (resource_name if resource_name else "session", retry_after))
+
+
 class InternalConsitencyError(Exception):
     """ Bambou InternalConsitency
 
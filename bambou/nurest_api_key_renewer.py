@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import random
+import threading
+
+from time import time
+
+from bambou import bambou_logger
+from .nurest_metrics import NURESTMetrics
+
+
+class NURESTAPIKeyRenewer(object):
+    """ Renews the API key of a :class:`bambou.NURESTSession` before it expires
+
+        A background thread logs in again `lead_time` seconds before the key
+        expiry given by the root object `api_key_expiry` attribute. A random
+        delay of up to `jitter` seconds spreads the logins of many sessions.
+        Requests keep using the current key until the new one is received,
+        so they do not get 419 responses while the key is renewed.
+
+        Example:
+            >>> session = NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443")
+            >>> session.start()
+            >>> session.start_api_key_renewal(lead_time=300, jitter=60)
+            >>> print session.api_key_renewer.renewal_count
+            3
+    """
+
+    def __init__(self, session, lead_time=300, jitter=30, retry_interval=10, api_key_lifetime=None):
+        """ Initializes a renewer
+
+            Args:
+                session (bambou.NURESTSession): the session to keep authenticated
+                lead_time (float): number of seconds before the expiry to renew the key
+                jitter (float): maximum number of random seconds to renew the key earlier
+                retry_interval (float): number of seconds to wait after a failed renewal
+                api_key_lifetime (float): number of seconds a key is valid when the root object has no expiry. Default is None
+        """
+
+        self.lead_time = lead_time
+        self.jitter = jitter
+        self.retry_interval = retry_interval
+        self.api_key_lifetime = api_key_lifetime
+
+        self._session = session
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._renewed_at = time()
+        self._renewal_count = 0
+        self._failure_count = 0
+
+    # Properties
+
+    @property
+    def is_running(self):
+        """ Returns True if the renewal thread is running """
+
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def renewal_count(self):
+        """ Returns the number of successful renewals """
+
+        return self._renewal_count
+
+    @property
+    def failure_count(self):
+        """ Returns the number of failed renewals """
+
+        return self._failure_count
+
+    # Methods
+
+    def get_expiry_time(self):
+        """ Get the time the current API key expires at
+
+            Returns:
+                (float): the number of seconds since epoch, or None if unknown
+        """
+
+        root_object = self._session.root_object
+        expiry = getattr(root_object, 'api_key_expiry', None) if root_object else None
+
+        if expiry:
+            return float(expiry) / 1000
+
+        if self.api_key_lifetime:
+            return self._renewed_at + self.api_key_lifetime
+
+        return None
+
+    def get_renewal_delay(self):
+        """ Get the number of seconds to wait before renewing the API key
+
+            Returns:
+                (float): the number of seconds, or None if the expiry is unknown
+        """
+
+        expires_at = self.get_expiry_time()
+
+        if expires_at is None:
+            return None
+
+        return max(0, expires_at - time() - self.lead_time - random.uniform(0, self.jitter))
+
+    def renew(self):
+        """ Renews the API key now
+
+            Returns:
+                (bool): True if the key has been renewed
+        """
+
+        metrics = NURESTMetrics.get_default_metrics() if NURESTMetrics.is_enabled() else None
+
+        try:
+            self._session.renew_api_key()
+        except Exception as exc:
+            self._failure_count += 1
+            bambou_logger.warning('[NURESTAPIKeyRenewer] Could not renew the API key: %s' % exc)
+
+            if metrics:
+                metrics.increment('bambou_api_key_renewal_errors_total')
+
+            return False
+
+        self._renewed_at = time()
+        self._renewal_count += 1
+        bambou_logger.debug('[NURESTAPIKeyRenewer] API key renewed')
+
+        if metrics:
+            metrics.increment('bambou_api_key_renewals_total')
+
+        return True
+
+    def start(self):
+        """ Starts the renewal thread """
+
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='bambou-api-key-renewer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """ Stops the renewal thread
+
+            Args:
+                timeout (float): maximum number of seconds to wait for the thread to stop
+        """
+
+        self._stop_event.set()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+        self._thread = None
+
+    def _run(self):
+        """ Renews the API key until the renewer is stopped """
+
+        has_failed = False
+
+        while not self._stop_event.is_set():
+            delay = self.retry_interval if has_failed else self.get_renewal_delay()
+
+            if delay is None:
+                self._stop_event.wait(self.retry_interval)
+                continue
+
+            # Event.wait returns None before Python 2.7
+            self._stop_event.wait(delay)
+
+            if self._stop_event.is_set():
+                break
+
+            has_failed = not self.renew()
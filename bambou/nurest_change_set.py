@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+class NURESTChangeSet(object):
+    """ Objects added, updated and removed by a committed fetch
+
+        Change sets are computed while a fetch is merged in its fetcher, when
+        requested with `changes=True`. Added and updated objects are the
+        objects held by the fetcher after the merge, removed objects are the
+        objects it no longer holds. An object is updated when its
+        `last_updated_date` changed, or when any attribute changed if the
+        dates are not known.
+
+        Example:
+            >>> changes = enterprise.domains.fetch_changes()
+            >>> print changes
+            <NURESTChangeSet added=2 updated=1 removed=0>
+            >>> for domain in changes.added + changes.updated:
+            ...     reconcile(domain)
+    """
+
+    def __init__(self, added=None, updated=None, removed=None):
+        """ Initializes a change set
+
+            Args:
+                added (list): the new objects
+                updated (list): the objects whose attributes changed
+                removed (list): the objects that are not fetched anymore
+        """
+
+        self.added = added if added is not None else list()
+        self.updated = updated if updated is not None else list()
+        self.removed = removed if removed is not None else list()
+
+    def __repr__(self):
+        return '<%s added=%s updated=%s removed=%s>' % (self.__class__.__name__, len(self.added), len(self.updated), len(self.removed))
+
+    def __len__(self):
+        return len(self.added) + len(self.updated) + len(self.removed)
+
+    def __nonzero__(self):
+        return len(self) > 0
+
+    __bool__ = __nonzero__
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+
+from time import time
+
+from bambou import bambou_logger
+from .utils.resource_path import get_resource_path_template
+
+
+CIRCUIT_STATE_CLOSED = 'closed'
+CIRCUIT_STATE_OPEN = 'open'
+CIRCUIT_STATE_HALF_OPEN = 'half_open'
+
+
+class _NURESTCircuit(object):
+    """ State of the circuit of a single endpoint """
+
+    def __init__(self):
+        """ Initializes a closed circuit """
+
+        self.state = CIRCUIT_STATE_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_calls = 0
+        self.rejected = 0
+
+    def to_dict(self):
+        """ Converts the circuit into a dictionary """
+
+        return {'state': self.state,
+                'failures': self.failures,
+                'opened_at': self.opened_at,
+                'rejected': self.rejected}
+
+
+class NURESTCircuitBreaker(object):
+    """ Circuit breaker used by :class:`bambou.NURESTConnection`
+
+        Circuits are kept per endpoint, identified by the HTTP method and the
+        resource path where identifiers are replaced by `{id}`, for instance
+        `GET enterprises/{id}/domains`.
+
+        A circuit opens after `failure_threshold` consecutive failures. While open,
+        requests fail immediately with a :class:`bambou.exceptions.BambouCircuitOpenError`.
+        After `recovery_timeout` seconds, the circuit becomes half open and lets
+        `half_open_max_calls` requests go through: a success closes the circuit,
+        a failure opens it again.
+
+        Example:
+            >>> breaker = NURESTCircuitBreaker(failure_threshold=5, recovery_timeout=30)
+            >>> session = NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443", circuit_breaker=breaker)
+            >>> print breaker.get_states()
+            {'GET enterprises/{id}/domains': {'state': 'open', 'failures': 5, 'opened_at': 1446759052.17, 'rejected': 12}}
+    """
+
+    DEFAULT_FAILURE_STATUS_CODES = (500, 502, 503, 504)
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1, failure_status_codes=DEFAULT_FAILURE_STATUS_CODES):
+        """ Initializes a circuit breaker
+
+            Args:
+                failure_threshold (int): number of consecutive failures that opens a circuit
+                recovery_timeout (float): number of seconds before an open circuit becomes half open
+                half_open_max_calls (int): number of requests allowed while a circuit is half open
+                failure_status_codes (list): status codes considered as failures
+        """
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_status_codes = failure_status_codes
+
+        self._lock = threading.Lock()
+        self._circuits = dict()
+
+    # Methods
+
+    @classmethod
+    def get_endpoint_key(cls, method, url, base_url=None):
+        """ Get the key identifying the endpoint of a request
+
+            Args:
+                method (string): the HTTP method
+                url (string): the url of the request
+                base_url (string): the API url, that will be removed from the path
+
+            Returns:
+                Returns a string like `GET enterprises/{id}/domains`
+        """
+
+        return '%s %s' % (method, get_resource_path_template(url, base_url))
+
+    def allow_request(self, key):
+        """ Check if a request can be sent to an endpoint
+
+            Args:
+                key (string): the endpoint key
+
+            Returns:
+                Returns True if the request can be sent
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+
+            if circuit is None or circuit.state == CIRCUIT_STATE_CLOSED:
+                return True
+
+            if circuit.state == CIRCUIT_STATE_OPEN:
+                if time() - circuit.opened_at < self.recovery_timeout:
+                    circuit.rejected += 1
+                    return False
+
+                bambou_logger.info('[NURESTCircuitBreaker] Circuit %s is now half open' % key)
+                circuit.state = CIRCUIT_STATE_HALF_OPEN
+                circuit.half_open_calls = 0
+
+            if circuit.half_open_calls >= self.half_open_max_calls:
+                circuit.rejected += 1
+                return False
+
+            circuit.half_open_calls += 1
+            return True
+
+    def release_request(self, key):
+        """ Gives back the slot of an allowed request that ended without response
+
+            A half open circuit only allows a few requests. When one of them fails
+            before reaching the server, for instance because of the rate limiter,
+            its slot is released so that another request can probe the endpoint.
+
+            Args:
+                key (string): the endpoint key
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+
+            if circuit is not None and circuit.state == CIRCUIT_STATE_HALF_OPEN and circuit.half_open_calls > 0:
+                circuit.half_open_calls -= 1
+
+    def record_success(self, key):
+        """ Records a successful request
+
+            Args:
+                key (string): the endpoint key
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+
+            if circuit is None:
+                return
+
+            if circuit.state != CIRCUIT_STATE_CLOSED:
+                bambou_logger.info('[NURESTCircuitBreaker] Circuit %s is now closed' % key)
+
+            circuit.state = CIRCUIT_STATE_CLOSED
+            circuit.failures = 0
+            circuit.opened_at = None
+
+    def record_failure(self, key):
+        """ Records a failed request
+
+            Args:
+                key (string): the endpoint key
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+
+            if circuit is None:
+                circuit = _NURESTCircuit()
+                self._circuits[key] = circuit
+
+            circuit.failures += 1
+
+            if circuit.state == CIRCUIT_STATE_HALF_OPEN or circuit.failures >= self.failure_threshold:
+                if circuit.state != CIRCUIT_STATE_OPEN:
+                    bambou_logger.warning('[NURESTCircuitBreaker] Circuit %s is now open after %s failures' % (key, circuit.failures))
+
+                circuit.state = CIRCUIT_STATE_OPEN
+                circuit.opened_at = time()
+
+    def record_response(self, key, status_code):
+        """ Records the result of a request according to its status code
+
+            Args:
+                key (string): the endpoint key
+                status_code (int): the received status code
+        """
+
+        if status_code in self.failure_status_codes:
+            self.record_failure(key)
+        else:
+            self.record_success(key)
+
+    def get_state(self, key):
+        """ Get the state of the circuit of an endpoint
+
+            Args:
+                key (string): the endpoint key
+
+            Returns:
+                Returns `closed`, `open` or `half_open`
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit.state if circuit else CIRCUIT_STATE_CLOSED
+
+    def get_states(self):
+        """ Get the state of all known circuits
+
+            Returns:
+                dict: information about each circuit, by endpoint key
+        """
+
+        with self._lock:
+            return dict((key, circuit.to_dict()) for key, circuit in self._circuits.items())
+
+    def reset(self):
+        """ Close all circuits """
+
+        with self._lock:
+            self._circuits = dict()
@@ -25,15 +25,24 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import binascii
 import json
+import os
 import requests
 import threading
-import uuid
 import logging
 
+from time import sleep, time
+
+from .exceptions import BambouCircuitOpenError
+from .nurest_metrics import NURESTMetrics
+from .nurest_profiler import NURESTProfiler
 from .nurest_response import NURESTResponse
+from .nurest_tracer import NURESTTracer
+from .utils.resource_path import get_resource_name
 
 from bambou import bambou_logger
+from bambou.config import BambouConfig
 
 
 HTTP_CODE_ZERO = 0
@@ -41,6 +50,7 @@ HTTP_CODE_SUCCESS = 200
 HTTP_CODE_CREATED = 201
 HTTP_CODE_EMPTY = 204
 HTTP_CODE_MULTIPLE_CHOICES = 300
+HTTP_CODE_NOT_MODIFIED = 304
 HTTP_CODE_BAD_REQUEST = 400
 HTTP_CODE_UNAUTHORIZED = 401
 HTTP_CODE_PERMISSION_DENIED = 403
@@ -53,6 +63,9 @@ HTTP_CODE_AUTHENTICATION_EXPIRED = 419
 HTTP_CODE_INTERNAL_SERVER_ERROR = 500
 HTTP_CODE_SERVICE_UNAVAILABLE = 503
 
+# Result of a request refused by the circuit breaker
+CIRCUIT_OPEN = object()
+
 
 HTTP_METHOD_HEAD = 'HEAD'
 HTTP_METHOD_POST = 'POST'
@@ -82,7 +95,7 @@ class NURESTConnection(object):
         self._xhr_timeout = 3000
         self._response = None
         self._error_message = None
-        self._transaction_id = uuid.uuid4().hex
+        self._transaction_id = binascii.hexlify(os.urandom(16))
 
         self._request = request
         self._async = async
@@ -91,6 +104,13 @@ class NURESTConnection(object):
         self._user_info = None
         self._object_last_action_timer = None
         self._root_object = root_object
+        self._sent_api_key = None
+        self._retry_policy = None
+        self._rate_limiter = None
+        self._resource_name = None
+        self._metrics = None
+        self._span = None
+        self._parent_span = NURESTTracer.get_default_tracer().get_current_span()
 
     # Properties
 
@@ -165,6 +185,28 @@ class NURESTConnection(object):
 
         self._user_info = info
 
+    @property
+    def span(self):
+        """ Get the span of the operation
+
+            Returns:
+                The NURESTSpan of the operation that sends the request, or None
+        """
+
+        return self._span
+
+    @span.setter
+    def span(self, span):
+        """ Set the span of the operation
+
+            The span is ended when the callbacks of an asynchronous call have been called.
+
+            Args:
+                span: the NURESTSpan of the operation
+        """
+
+        self._span = span
+
     @property
     def timeout(self):
         """ Get timeout
@@ -237,7 +279,7 @@ class NURESTConnection(object):
         """
         status_code = self._response.status_code
 
-        if status_code in [HTTP_CODE_ZERO, HTTP_CODE_SUCCESS, HTTP_CODE_CREATED, HTTP_CODE_EMPTY, HTTP_CODE_MULTIPLE_CHOICES]:
+        if status_code in [HTTP_CODE_ZERO, HTTP_CODE_SUCCESS, HTTP_CODE_CREATED, HTTP_CODE_EMPTY, HTTP_CODE_MULTIPLE_CHOICES, HTTP_CODE_NOT_MODIFIED]:
             return True
 
         if status_code in [HTTP_CODE_BAD_REQUEST, HTTP_CODE_UNAUTHORIZED, HTTP_CODE_PERMISSION_DENIED, HTTP_CODE_NOT_FOUND, HTTP_CODE_METHOD_NOT_ALLOWED, HTTP_CODE_CONNECTION_TIMEOUT, HTTP_CODE_CONFLICT, HTTP_CODE_PRECONDITION_FAILED, HTTP_CODE_INTERNAL_SERVER_ERROR, HTTP_CODE_SERVICE_UNAVAILABLE]:
@@ -306,19 +348,15 @@ class NURESTConnection(object):
     def _did_receive_response(self, response):
         """ Called when a response is received """
 
-        try:
-            data = response.json()
-
-        except:
-            data = None
-
-        self._response = NURESTResponse(status_code=response.status_code, headers=response.headers, data=data, reason=response.reason)
+        self._response = response
 
         level = logging.WARNING if self._response.status_code >= 300 else logging.DEBUG
 
         bambou_logger.info('< %s %s %s [%s] ' % (self._request.method, self._request.url, self._request.params if self._request.params else "", self._response.status_code))
         bambou_logger.log(level, '< headers: %s' % self._response.headers)
-        bambou_logger.log(level, '< data:\n%s' % json.dumps(self._response.data, indent=4))
+
+        if bambou_logger.isEnabledFor(level):
+            bambou_logger.log(level, '< data:\n%s' % json.dumps(self._response.data, indent=4))
 
         self._callback(self)
 
@@ -335,6 +373,21 @@ class NURESTConnection(object):
         else:
             return self
 
+    def _did_reject_request(self, circuit_key):
+        """ Called when the circuit breaker refuses to send the request """
+
+        bambou_logger.warning('Bambou %s on %s has been rejected because circuit %s is open' % (self._request.method, self._request.url, circuit_key))
+
+        self._response = NURESTResponse(status_code=HTTP_CODE_SERVICE_UNAVAILABLE, headers=dict(), reason='Circuit Open')
+        self._response.errors = [{'property': '', 'descriptions': [{'title': 'Circuit Open', 'description': 'Requests to %s are suspended' % circuit_key}]}]
+
+        if not self.async and BambouConfig._should_raise_bambou_http_error:
+            raise BambouCircuitOpenError(connection=self, endpoint_key=circuit_key)
+
+        self._callback(self)
+
+        return self
+
     def _make_request(self, session=None):
         """ Make a synchronous request """
 
@@ -345,32 +398,181 @@ class NURESTConnection(object):
 
         # Add specific headers
         controller = session.login_controller
+        self._retry_policy = session.retry_policy
+        self._rate_limiter = session.rate_limiter
+        self._metrics = NURESTMetrics.get_default_metrics() if NURESTMetrics.is_enabled() else None
+        self._resource_name = get_resource_name(self._request.url, controller.url)
+
+        certificate = controller.certificate
+
+        if self._uses_authentication:
+            self._set_authentication_headers(controller)
+        elif controller.is_impersonating:
+            self._request.set_header('X-Nuage-ProxyUser', controller.impersonation)
+
+        middlewares = session.middlewares
+
+        for middleware in middlewares:
+            response = middleware.pre_send(self)
+
+            if response is not None:
+                bambou_logger.debug('Bambou %s on %s has been answered by %s' % (self._request.method, self._request.url, middleware))
+                return self._did_receive_response(response)
+
+        headers = self._request.headers
+        data = self._request.encoded_data
+
+        if data is None:
+            data = json.dumps(self._request.data)
+
+        bambou_logger.info('> %s %s %s' % (self._request.method, self._request.url, self._request.params if self._request.params else ""))
+        bambou_logger.debug('> headers: %s' % headers)
+
+        if bambou_logger.isEnabledFor(logging.DEBUG):
+            bambou_logger.debug('> data:\n  %s' % json.dumps(self._request.data, indent=4))
+
+        circuit_breaker = session.circuit_breaker
+        circuit_key = circuit_breaker.get_endpoint_key(method=self._request.method, url=self._request.url, base_url=controller.url) if circuit_breaker else None
+
+        tracer = NURESTTracer.get_default_tracer()
+        state = {'performed': False}
+
+        def perform_request():
+            # Only the request actually sent asks the circuit breaker: coalesced requests share its outcome
+            if circuit_breaker and not circuit_breaker.allow_request(circuit_key):
+                return CIRCUIT_OPEN
+
+            state['performed'] = True
+
+            with tracer.start_span('http', method=self._request.method, url=self._request.url, resource=self._resource_name, transaction_id=self._transaction_id) as span:
+                try:
+                    return self.__perform_request(data=data, headers=headers, certificate=certificate, circuit_breaker=circuit_breaker, circuit_key=circuit_key, span=span)
+                except Exception:
+                    if circuit_breaker:
+                        circuit_breaker.release_request(circuit_key)
+                    raise
+
+        request_coalescer = session.request_coalescer
+        started_at = time()
+
+        try:
+            if request_coalescer and self._request.method in [HTTP_METHOD_GET, HTTP_METHOD_HEAD]:
+                response = request_coalescer.perform(request_coalescer.get_key(self._request), perform_request)
+            else:
+                response = perform_request()
+        except Exception as exc:
+            for middleware in reversed(middlewares):
+                middleware.on_error(self, exc, time() - started_at)
+            raise
+
+        if response is CIRCUIT_OPEN:
+            return self._did_reject_request(circuit_key)
+
+        # Coalesced requests get their own copy of the shared response
+        if response is not None and not state['performed']:
+            response = response.copy()
+
+        if response is None:
+            for middleware in reversed(middlewares):
+                middleware.on_timeout(self, time() - started_at)
+
+            return self._did_timeout()
+
+        count_cache = session.count_cache
+
+        if count_cache and self._request.method not in [HTTP_METHOD_GET, HTTP_METHOD_HEAD] and response.status_code < 400:
+            count_cache.clear()
+
+        if middlewares:
+            elapsed = time() - started_at
+            self._response = response
+
+            for middleware in reversed(middlewares):
+                self._response = middleware.post_receive(self, elapsed) or self._response
+
+            response = self._response
+
+        return self._did_receive_response(response)
+
+    def _make_async_request(self, session=None):
+        """ Make a request from a thread
+
+            The span of the operation, or the span that was current when the connection
+            was created, is the current span of the thread while the request is sent and
+            the callbacks are called. The span of the operation is then ended.
+        """
+
+        tracer = NURESTTracer.get_default_tracer()
+
+        try:
+            with tracer.activate(self._span or self._parent_span):
+                return self._make_request(session=session)
+        except Exception as exc:
+            if self._span:
+                self._span.set_error(exc)
+            raise
+        finally:
+            if self._span:
+                self._span.end()
+
+    def _set_authentication_headers(self, controller):
+        """ Sets the organization, authorization and impersonation headers of the request
+
+            Args:
+                controller: the login controller of the current session
+        """
 
         enterprise = controller.enterprise
         user_name = controller.user
         api_key = controller.api_key
-        certificate = controller.certificate
 
         if self._root_object:
             enterprise = self._root_object.enterprise_name
             user_name = self._root_object.user_name
             api_key = self._root_object.api_key
 
-        if self._uses_authentication:
-            self._request.set_header('X-Nuage-Organization', enterprise)
-            self._request.set_header('Authorization', controller.get_authentication_header(user_name, api_key))
+        self._sent_api_key = api_key
+        self._request.headers.update(controller.get_authentication_headers(enterprise=enterprise, user=user_name, api_key=api_key))
 
-        if controller.is_impersonating:
-            self._request.set_header('X-Nuage-ProxyUser', controller.impersonation)
+    def __perform_request(self, data, headers, certificate, circuit_breaker, circuit_key, span):
+        """ Send the request, deal with response choice and session expiration, and decode the response
 
-        headers = self._request.headers
-        data = json.dumps(self._request.data)
+            Returns:
+                Returns the NURESTResponse, or None if the request has timeout
+        """
 
-        bambou_logger.info('> %s %s %s' % (self._request.method, self._request.url, self._request.params if self._request.params else ""))
-        bambou_logger.debug('> headers: %s' % headers)
-        bambou_logger.debug('> data:\n  %s' % json.dumps(self._request.data, indent=4))
+        from .nurest_session import _NURESTSessionCurrentContext
+
+        metrics = self._metrics
+        started_at = time()
+
+        if metrics:
+            metrics.add_to_gauge('bambou_http_requests_in_flight', 1)
+
+        try:
+            response = self.__make_request(method=self._request.method, url=self._request.url, params=self._request.params, data=data, headers=headers, certificate=certificate)
+            network_time = time() - started_at
+            span.set_attribute('network_time', network_time)
+        except requests.exceptions.RequestException as exc:
+            if circuit_breaker:
+                circuit_breaker.record_failure(circuit_key)
 
-        response = self.__make_request(method=self._request.method, url=self._request.url, params=self._request.params, data=data, headers=headers, certificate=certificate)
+            if metrics:
+                metrics.increment('bambou_http_errors_total', method=self._request.method, resource=self._resource_name, error=exc.__class__.__name__)
+            raise
+        finally:
+            if metrics:
+                metrics.add_to_gauge('bambou_http_requests_in_flight', -1)
+
+        if response is None:
+            if circuit_breaker:
+                circuit_breaker.record_failure(circuit_key)
+
+            if metrics:
+                metrics.increment('bambou_http_timeouts_total', method=self._request.method, resource=self._resource_name)
+
+            span.set_error('Timeout')
+            return None
 
         retry_request = False
 
@@ -381,47 +583,129 @@ class NURESTConnection(object):
 
         elif response.status_code == HTTP_CODE_AUTHENTICATION_EXPIRED and _NURESTSessionCurrentContext.session:
             bambou_logger.debug('Bambou got [%s] response . Trying to reconnect your session that has expired' % HTTP_CODE_AUTHENTICATION_EXPIRED)
-            _NURESTSessionCurrentContext.session.reset()
-            _NURESTSessionCurrentContext.session.start()
+            session = _NURESTSessionCurrentContext.session
+            session.reauthenticate(expired_api_key=self._sent_api_key)
+
+            if self._uses_authentication:
+                self._set_authentication_headers(session.login_controller)
+                headers = self._request.headers
+
             retry_request = True
 
         if retry_request:
+            retried_at = time()
             response = self.__make_request(method=self._request.method, url=self._request.url, params=self._request.params, data=data, headers=headers, certificate=certificate)
+            network_time += time() - retried_at
+            span.set_attribute('network_time', network_time)
 
-        return self._did_receive_response(response)
+            if response is None:
+                if circuit_breaker:
+                    circuit_breaker.record_failure(circuit_key)
+
+                span.set_error('Timeout')
+                return None
+
+        if circuit_breaker:
+            circuit_breaker.record_response(circuit_key, response.status_code)
+
+        if metrics:
+            metrics.observe_request(method=self._request.method,
+                                    resource_name=self._resource_name,
+                                    status_code=response.status_code,
+                                    elapsed=time() - started_at,
+                                    request_size=len(data) if data else 0,
+                                    response_size=len(response.content) if response.content else 0)
+
+        decoded_at = time()
+
+        try:
+            response_data = response.json()
+        except:
+            response_data = None
+
+        decode_time = time() - decoded_at
+
+        span.set_attributes(status_code=response.status_code,
+                            request_size=len(data) if data else 0,
+                            response_size=len(response.content) if response.content else 0,
+                            decode_time=decode_time)
+
+        if BambouConfig._profiling_enabled and NURESTProfiler.should_sample():
+            profiler = NURESTProfiler.get_default_profiler()
+            profiler.record('http', network_time)
+            profiler.record('json_decode', decode_time)
+
+        return NURESTResponse(status_code=response.status_code, headers=response.headers, data=response_data, reason=response.reason)
 
     def __make_request(self, method, url, params, data, headers, certificate):
-        """ Encapsulate requests call
+        """ Encapsulate requests call and retry it according to the session retry policy
+
+            Returns:
+                Returns the requests response, or None if the request has timeout
+        """
+        retry_policy = self._retry_policy
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            if retry_policy:
+                retry_policy.did_attempt(attempt)
+
+            if self._rate_limiter:
+                self._rate_limiter.acquire(self._resource_name)
+
+            try:
+                response = self.__send_request(method=method, url=url, params=params, data=data, headers=headers, certificate=certificate)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as exc:
+                delay = retry_policy.get_retry_delay(method=method, attempt=attempt, exception=exc) if retry_policy else None
+
+                if delay is None:
+                    if isinstance(exc, requests.exceptions.Timeout):
+                        return None
+                    raise
+
+                bambou_logger.debug('Bambou %s on %s failed with %s. Retrying in %.2fs (attempt %s)' % (method, url, exc.__class__.__name__, delay, attempt))
+
+                if self._metrics:
+                    self._metrics.increment('bambou_http_retries_total', method=method, resource=self._resource_name, reason=exc.__class__.__name__)
+            else:
+                delay = retry_policy.get_retry_delay(method=method, attempt=attempt, response=response) if retry_policy else None
+
+                if delay is None:
+                    return response
+
+                bambou_logger.debug('Bambou %s on %s got [%s] response. Retrying in %.2fs (attempt %s)' % (method, url, response.status_code, delay, attempt))
+
+                if self._metrics:
+                    self._metrics.increment('bambou_http_retries_total', method=method, resource=self._resource_name, reason=str(response.status_code))
+
+            sleep(delay)
+
+    def __send_request(self, method, url, params, data, headers, certificate):
+        """ Send a single HTTP request
         """
         verify = False
         timeout = self.timeout
 
         try:  # TODO : Remove this ugly try/except after fixing Java issue: http://mvjira.mv.usa.alcatel.com/browse/VSD-546
-            response = requests.request(method=method,
-                                        url=url,
-                                        data=data,
-                                        headers=headers,
-                                        verify=verify,
-                                        timeout=timeout,
-                                        params=params,
-                                        cert=certificate)
+            return requests.request(method=method,
+                                    url=url,
+                                    data=data,
+                                    headers=headers,
+                                    verify=verify,
+                                    timeout=timeout,
+                                    params=params,
+                                    cert=certificate)
         except requests.exceptions.SSLError:
-            try:
-                response = requests.request(method=method,
-                                            url=url,
-                                            data=data,
-                                            headers=headers,
-                                            verify=verify,
-                                            timeout=timeout,
-                                            params=params,
-                                            cert=certificate)
-            except requests.exceptions.Timeout:
-                return self._did_timeout()
-
-        except requests.exceptions.Timeout:
-            return self._did_timeout()
-
-        return response
+            return requests.request(method=method,
+                                    url=url,
+                                    data=data,
+                                    headers=headers,
+                                    verify=verify,
+                                    timeout=timeout,
+                                    params=params,
+                                    cert=certificate)
 
     def start(self):
         """ Make an HTTP request with a specific method """
@@ -431,7 +715,7 @@ class NURESTConnection(object):
         session = NURESTSession.get_current_session()
 
         if self.async:
-            thread = threading.Thread(target=self._make_request, kwargs={'session': session})
+            thread = threading.Thread(target=self._make_async_request, kwargs={'session': session})
             thread.is_daemon = False
             thread.start()
             return self.transaction_id
@@ -444,4 +728,4 @@ class NURESTConnection(object):
         """
         self._request = None
         self._response = None
-        self._transaction_id = uuid.uuid4().hex
+        self._transaction_id = binascii.hexlify(os.urandom(16))
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import threading
+
+from time import time
+
+from .nurest_metrics import NURESTMetrics
+
+
+class NURESTCountCache(object):
+    """ Short-lived cache of the number of objects matching a filter
+
+        Each list response carries the total number of objects matching its
+        filter in `X-Nuage-Count`. The cache keeps these counts for a few
+        seconds, keyed by url, filter and query parameters, so that counting
+        the same objects again within that window does not send a HEAD request.
+
+        Counts are only cached for successful GET and HEAD requests without
+        grouping. The whole cache is cleared each time the session creates,
+        updates or deletes an object, and when it starts or stops impersonating a user.
+
+        Example:
+            >>> session = NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443", count_cache=NURESTCountCache(ttl=5))
+            >>> (domains, total_count) = enterprise.domains.get_page(page=0, page_size=50)
+            >>> enterprise.domains.get_count()  # served from the cache
+            1250
+    """
+
+    def __init__(self, ttl=5, max_size=1024):
+        """ Initializes a count cache
+
+            Args:
+                ttl (float): number of seconds a count is kept
+                max_size (int): maximum number of counts kept. The oldest counts are dropped first
+        """
+
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._counts = dict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._counts)
+
+    # Methods
+
+    @classmethod
+    def get_key(cls, request):
+        """ Get the key identifying the counted objects of a request
+
+            Args:
+                request (bambou.NURESTRequest): the request
+
+            Returns:
+                Returns a tuple identifying the counted objects, or None if the count cannot be cached
+        """
+
+        headers = request.headers
+
+        if 'X-Nuage-GroupBy' in headers:
+            return None
+
+        params = request.params
+
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+
+        return (request.url, headers.get('X-Nuage-Filter'), params)
+
+    def get(self, key):
+        """ Get a cached count
+
+            Args:
+                key (tuple): the key of the counted objects
+
+            Returns:
+                Returns the count, or None if it is not cached or has expired
+        """
+
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._counts.get(key)
+
+            if entry is not None and entry[1] < time():
+                del self._counts[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if NURESTMetrics.is_enabled():
+            NURESTMetrics.get_default_metrics().increment('bambou_count_cache_hits_total' if entry is not None else 'bambou_count_cache_misses_total')
+
+        return entry[0] if entry is not None else None
+
+    def set(self, key, count):
+        """ Caches a count
+
+            Args:
+                key (tuple): the key of the counted objects
+                count (int): the number of objects
+        """
+
+        if key is None:
+            return
+
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= self.max_size:
+                del self._counts[min(self._counts, key=lambda cached_key: self._counts[cached_key][1])]
+
+            self._counts[key] = (count, time() + self.ttl)
+
+    def clear(self):
+        """ Removes all cached counts """
+
+        with self._lock:
+            self._counts.clear()
+
+    def get_stats(self):
+        """ Get the cache counters
+
+            Returns:
+                dict: the number of hits, the number of misses, and the number of cached counts
+        """
+
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': len(self._counts)}
@@ -27,9 +27,17 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import weakref
+
+from time import time
+
 from .exceptions import BambouHTTPError, InternalConsitencyError
 from .nurest_request import NURESTRequest
+from .nurest_change_set import NURESTChangeSet
 from .nurest_connection import HTTP_METHOD_GET, HTTP_METHOD_HEAD
+from .nurest_filter import NURESTFilter
+from .nurest_metrics import NURESTMetrics
+from .nurest_profiler import profiled
+from .nurest_tracer import NURESTTracer
 
 from bambou.config import BambouConfig
 
@@ -53,10 +61,152 @@ class NURESTFetcher(list):
         self.current_ordered_by = ''
         self.current_page = 0
         self.current_total_count = 0
+        self.current_changes = None
+        self.current_watermark = None
         self._parent_object = None
+        self._snapshot = None
+        self._snapshot_owner_id = None
+        self._store = None
 
     def __repr__(self):
-        return "<%s: %s>" % (self.__class__.__name__, super(NURESTFetcher, self).__repr__())
+        return "<%s: %s>" % (self.__class__.__name__, list.__repr__(self._get_objects()))
+
+    def __iter__(self):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return (self._get_stored_object(id) for id in self._store.get_ids(*self._get_store_key()))
+
+        return super(NURESTFetcher, self).__iter__()
+
+    def __len__(self):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._store.count(*self._get_store_key())
+
+        return super(NURESTFetcher, self).__len__()
+
+    def __getitem__(self, index):
+        self._load_snapshot()
+
+        if self._store is not None:
+            ids = self._store.get_id(index, *self._get_store_key())
+
+            if isinstance(index, slice):
+                return [self._get_stored_object(id) for id in ids]
+
+            return self._get_stored_object(ids)
+
+        return super(NURESTFetcher, self).__getitem__(index)
+
+    def __getslice__(self, start, end):
+        return self.__getitem__(slice(start, end))
+
+    def __setslice__(self, start, end, objects):
+        self.__setitem__(slice(start, end), objects)
+
+    def __setitem__(self, index, value):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._update_stored_objects(lambda objects: objects.__setitem__(index, value))
+
+        return super(NURESTFetcher, self).__setitem__(index, value)
+
+    def __delslice__(self, start, end):
+        self.__delitem__(slice(start, end))
+
+    def __delitem__(self, index):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._update_stored_objects(lambda objects: objects.__delitem__(index))
+
+        return super(NURESTFetcher, self).__delitem__(index)
+
+    def __reversed__(self):
+        return reversed(self._get_objects())
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return self._get_objects() == list(other)
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+
+        return equal if equal is NotImplemented else not equal
+
+    def __add__(self, objects):
+        return self._get_objects() + list(objects)
+
+    def __iadd__(self, objects):
+        self.extend(objects)
+
+        return self
+
+    def append(self, nurest_object):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._store.put(nurest_object, *self._get_store_key())
+
+        return super(NURESTFetcher, self).append(nurest_object)
+
+    def extend(self, nurest_objects):
+        self._load_snapshot()
+
+        if self._store is not None:
+            for nurest_object in nurest_objects:
+                self._store.put(nurest_object, *self._get_store_key())
+            return
+
+        return super(NURESTFetcher, self).extend(nurest_objects)
+
+    def insert(self, index, nurest_object):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._update_stored_objects(lambda objects: objects.insert(index, nurest_object))
+
+        return super(NURESTFetcher, self).insert(index, nurest_object)
+
+    def pop(self, index=-1):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._update_stored_objects(lambda objects: objects.pop(index))
+
+        return super(NURESTFetcher, self).pop(index)
+
+    def sort(self, *args, **kwargs):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._update_stored_objects(lambda objects: objects.sort(*args, **kwargs))
+
+        return super(NURESTFetcher, self).sort(*args, **kwargs)
+
+    def reverse(self):
+        self._load_snapshot()
+
+        if self._store is not None:
+            return self._update_stored_objects(lambda objects: objects.reverse())
+
+        return super(NURESTFetcher, self).reverse()
+
+    def remove(self, nurest_object):
+        self._load_snapshot()
+
+        if self._store is not None:
+            if not self._store.remove(nurest_object.id, *self._get_store_key()):
+                raise ValueError("%s is  not in %s" % (nurest_object, self))
+
+            return
+
+        return super(NURESTFetcher, self).remove(nurest_object)
 
     def __contains__(self, nurest_object):
         """ Verify if the fetcher contains the given NURESTObject
@@ -68,6 +218,9 @@ class NURESTFetcher(list):
                 Returns True if the object has been found. False otherwise
 
         """
+        if self._store is not None and nurest_object is not None and nurest_object.id:
+            return self._store.has_child(nurest_object.id, *self._get_store_key())
+
         for obj in self:
             if obj.equals(nurest_object):
                 return True
@@ -85,6 +238,12 @@ class NURESTFetcher(list):
             Raises:
                 Raise a ValueError exception if object is not present
         """
+        if self._store is not None and nurest_object.id:
+            index = self._store.get_index(nurest_object.id, *self._get_store_key())
+
+            if index is not None:
+                return index
+
         for index, obj in enumerate(self):
             if obj.equals(nurest_object):
                 return index
@@ -115,6 +274,37 @@ class NURESTFetcher(list):
 
         self._parent_object = weakref.ref(parent_object) if parent_object else None
 
+    @property
+    def store(self):
+        """ Get the store holding the fetched objects
+
+            Returns:
+                Returns the bambou.NURESTObjectStore, or None if objects are kept in memory
+        """
+
+        return self._store
+
+    @store.setter
+    def store(self, store):
+        """ Set the store holding the fetched objects
+
+            Objects already fetched are moved to the new store, or back in memory.
+            Objects read from a store are new instances built each time they are read.
+
+            Args:
+                store (bambou.NURESTObjectStore): the store, or None to keep objects in memory
+        """
+
+        objects = self._get_objects()
+
+        if self._store is not None:
+            self._store.clear_children(*self._get_store_key())
+        else:
+            list.__delslice__(self, 0, list.__len__(self))
+
+        self._store = store
+        self.extend(objects)
+
     @property
     def transaction_id(self):
         """ Get the transaction ID of the current connection
@@ -206,8 +396,301 @@ class NURESTFetcher(list):
             It will clear attribute of the served object
         """
         self.current_connection = None
+        self.current_watermark = None
+        self._snapshot = None
+        self._snapshot_owner_id = None
+
+        if self._store is not None:
+            self._store.clear_children(*self._get_store_key())
+
         del self[:]
 
+    def _load_snapshot(self):
+        """ Builds the objects restored from a snapshot the first time the fetcher is used """
+
+        if self._snapshot is not None:
+            self._snapshot.materialize(self)
+
+    def _get_objects(self):
+        """ Get a list of the fetched objects """
+
+        return list(self.__iter__())
+
+    def _update_stored_objects(self, update):
+        """ Applies a list operation to the stored objects and stores the result
+
+            Args:
+                update (function): called with the list of stored objects, which it can modify
+
+            Returns:
+                Returns the value returned by update
+        """
+
+        objects = self._get_objects()
+        result = update(objects)
+        self._store.set_children(objects, *self._get_store_key())
+
+        return result
+
+    def _get_store_key(self):
+        """ Get the parent id and children ReST name used to index the objects in the store """
+
+        parent_object = self.parent_object
+
+        return (parent_object.id if parent_object else None, self.managed_object_rest_name())
+
+    def _get_stored_object(self, id):
+        """ Builds an object from the store """
+
+        nurest_object = self.new()
+        nurest_object.from_dict(self._store.get_dict(id, *self._get_store_key()))
+        nurest_object._reset_dirty_attributes()
+        nurest_object.parent = self.parent_object
+
+        return nurest_object
+
+    def _commit(self, fetched_objects, changes=None, remove_missing=True):
+        """ Merges fetched objects in the fetcher
+
+            Existing objects are updated in place, new objects are appended, and
+            objects that have not been fetched are removed, in a single pass.
+
+            Args:
+                fetched_objects (list): the fetched objects
+                changes (bambou.NURESTChangeSet): the change set to fill, if any
+                remove_missing (bool): remove the objects that have not been fetched
+        """
+
+        current_objects = dict()
+
+        for current_object in self:
+            if current_object.id and current_object.id not in current_objects:
+                current_objects[current_object.id] = current_object
+
+        for nurest_object in fetched_objects:
+            current_object = current_objects.get(nurest_object.id)
+
+            if current_object is None:
+                self.append(nurest_object)
+
+                if changes is not None:
+                    changes.added.append(nurest_object)
+
+                continue
+
+            dictionary = nurest_object.to_dict()
+
+            if changes is not None and self._has_changed(current_object.to_dict(), dictionary):
+                changes.updated.append(current_object)
+
+            current_object.from_dict(dictionary)
+            current_object._reset_dirty_attributes()
+
+        if remove_missing:
+            self._keep_only(set(nurest_object.id for nurest_object in fetched_objects), changes)
+
+    def _commit_to_store(self, fetched_objects, changes=None, remove_missing=True):
+        """ Merges fetched objects in the store
+
+            Args:
+                fetched_objects (list): the fetched objects
+                changes (bambou.NURESTChangeSet): the change set to fill, if any
+                remove_missing (bool): remove the objects that have not been fetched
+        """
+
+        key = self._get_store_key()
+
+        if changes is not None:
+            current_ids = set(self._store.get_ids(*key))
+
+            for nurest_object in fetched_objects:
+                if nurest_object.id not in current_ids:
+                    changes.added.append(nurest_object)
+
+                elif self._has_changed(self._store.get_dict(nurest_object.id, *key), nurest_object.to_dict()):
+                    changes.updated.append(nurest_object)
+
+        if remove_missing:
+            self._keep_only(set(nurest_object.id for nurest_object in fetched_objects), changes)
+
+        for nurest_object in fetched_objects:
+            self._store.put(nurest_object, *key)
+
+    def _keep_only(self, ids, changes=None):
+        """ Removes the objects whose id is not one of the given ids
+
+            Args:
+                ids (set): the ids of the objects to keep
+                changes (bambou.NURESTChangeSet): the change set to fill, if any
+        """
+
+        if self._store is not None:
+            removed_ids = [id for id in self._store.get_ids(*self._get_store_key()) if id not in ids]
+
+            if changes is not None:
+                changes.removed.extend(self._get_stored_object(id) for id in removed_ids)
+
+            self._store.remove_children(removed_ids, *self._get_store_key())
+            return
+
+        kept_objects = list()
+
+        for current_object in self:
+            if current_object.id in ids:
+                kept_objects.append(current_object)
+
+            elif changes is not None:
+                changes.removed.append(current_object)
+
+        if len(kept_objects) != len(self):
+            self[:] = kept_objects
+
+    def _fetch_all_pages(self, filter=None, page_size=None):
+        """ Fetch all pages of objects without committing them
+
+            Returns:
+                tuple: the fetched objects, or None if a page could not be fetched, and the number of requests sent
+        """
+
+        page_size = page_size or self.PAGE_SIZE
+        objects = list()
+        page = 0
+
+        while True:
+            fetched = self.fetch(filter=filter, page=page, page_size=page_size, commit=False)[2]
+            page += 1
+
+            if fetched is None:
+                return (None, page)
+
+            objects.extend(fetched)
+
+            total_count = self.current_connection.response.headers.get('X-Nuage-Count') if self.current_connection else None
+
+            if self._is_last_page(len(fetched), len(objects), total_count, page_size):
+                return (objects, page)
+
+    def _is_last_page(self, page_length, fetched_count, total_count, page_size):
+        """ Check if the last page has been fetched
+
+            Servers can return smaller pages than requested, so when the total
+            number of objects is known, pages are fetched until it is reached.
+
+            Args:
+                page_length (int): the number of objects of the page
+                fetched_count (int): the number of objects fetched so far
+                total_count (string): the X-Nuage-Count header, if any
+                page_size (int): the requested number of objects per page
+
+            Returns:
+                Returns True if there is no page left to fetch
+        """
+
+        if page_length == 0:
+            return True
+
+        if total_count:
+            return fetched_count >= int(total_count)
+
+        return page_length < page_size
+
+    def _fetch_ids(self, filter, page_size):
+        """ Fetch the ids of all objects, without building objects
+
+            Returns:
+                list: the ids, or None if a request failed
+        """
+
+        id_remote_name = BambouConfig.get_id_remote_name()
+        ids = list()
+        page = 0
+
+        while True:
+            request = NURESTRequest(method=HTTP_METHOD_GET, url=self._prepare_url())
+            self._prepare_headers(request=request, filter=filter, page=page, page_size=page_size)
+
+            connection = self.parent_object.send_request(request=request)
+            response = connection.response
+
+            if response.status_code >= 400 and BambouConfig._should_raise_bambou_http_error:
+                raise BambouHTTPError(connection=connection)
+
+            if response.status_code != 200:
+                return None
+
+            results = response.data or list()
+            ids.extend(result.get(id_remote_name) for result in results)
+            page += 1
+
+            total_count = response.headers.get('X-Nuage-Count')
+
+            if self._is_last_page(len(results), len(ids), total_count, page_size):
+                return ids
+
+    def _reconcile(self, filter, page_size, changes):
+        """ Removes the objects deleted on the server, if the number of objects differs
+
+            The count is always requested, as a cached count could hide deletions.
+        """
+
+        request = NURESTRequest(method=HTTP_METHOD_HEAD, url=self._prepare_url())
+        self._prepare_headers(request=request, filter=filter)
+
+        connection = self.parent_object.send_request(request=request)
+        (_, _, count) = self._did_count(connection)
+
+        if connection.response.status_code != 200 or count == len(self):
+            return
+
+        ids = self._fetch_ids(filter=filter, page_size=page_size)
+
+        if ids is not None:
+            self._keep_only(set(ids), changes)
+
+    def _get_watermark_filter(self, since, filter=None):
+        """ Get the filter of the objects updated since a watermark """
+
+        watermark = '%d' % since if float(since).is_integer() else repr(float(since))
+        watermark_filter = 'lastUpdatedDate >= %s' % watermark
+
+        return '(%s) and %s' % (filter, watermark_filter) if filter else watermark_filter
+
+    def _has_changed(self, previous_dictionary, dictionary):
+        """ Check if an object changed, by its last update date if known, or by its attributes """
+
+        previous_date = previous_dictionary.get('lastUpdatedDate')
+        date = dictionary.get('lastUpdatedDate')
+
+        if previous_date is not None and date is not None:
+            return previous_date != date
+
+        return previous_dictionary != dictionary
+
+    def _get_count_cache(self):
+        """ Get the count cache of the current session """
+
+        from .nurest_session import NURESTSession
+        session = NURESTSession.get_current_session()
+
+        return session.count_cache if session is not None else None
+
+    def _cache_count(self, request, count):
+        """ Caches the count of objects of a request in the count cache of the current session """
+
+        count_cache = self._get_count_cache()
+
+        if count_cache is not None:
+            count_cache.set(count_cache.get_key(request), count)
+
+    def _mirror_objects(self, nurest_objects):
+        """ Writes committed objects to the mirror of the current session """
+
+        from .nurest_session import NURESTSession
+        session = NURESTSession.get_current_session()
+
+        if session is not None and session.mirror is not None:
+            session.mirror.add(nurest_objects)
+
     def new(self):
         """ Create an instance of the managed class
 
@@ -252,7 +735,7 @@ class NURESTFetcher(list):
 
         return self.parent_object.get_resource_url_for_child_type(self.__class__.managed_class())
 
-    def fetch(self, filter=None, order_by=None, group_by=[], page=None, page_size=None, query_parameters=None, commit=True, async=False, callback=None):
+    def fetch(self, filter=None, order_by=None, group_by=[], page=None, page_size=None, query_parameters=None, commit=True, async=False, callback=None, changes=False):
         """ Fetch objects according to given filter and page.
 
             Note:
@@ -270,6 +753,7 @@ class NURESTFetcher(list):
                 page_size (int): number of results per page
                 commit (bool): boolean to update current object
                 callback (function): Callback that should be called in case of a async request
+                changes (bool): compute the objects added, updated and removed by the commit in `current_changes`
 
             Returns:
                 tuple: Returns a tuple of information (fetcher, served object, fetched objects, connection)
@@ -283,12 +767,16 @@ class NURESTFetcher(list):
 
         self._prepare_headers(request=request, filter=filter, order_by=order_by, group_by=group_by, page=page, page_size=page_size)
 
+        span = NURESTTracer.get_default_tracer().start_span('fetch', resource=self.managed_class().resource_name, filter=filter, page=page, page_size=page_size)
+
         if async:
-            return self.parent_object.send_request(request=request, async=async, local_callback=self._did_fetch, remote_callback=callback, user_info={'commit': commit})
+            return self.parent_object.send_request(request=request, async=async, local_callback=self._did_fetch, remote_callback=callback, user_info={'commit': commit, 'changes': changes}, span=span)
 
-        connection = self.parent_object.send_request(request=request, user_info={'commit': commit})
-        return self._did_fetch(connection=connection)
+        with span:
+            connection = self.parent_object.send_request(request=request, user_info={'commit': commit, 'changes': changes}, span=span)
+            return self._did_fetch(connection=connection)
 
+    @profiled('did_fetch')
     def _did_fetch(self, connection):
         """ Fetching objects has been done """
 
@@ -305,12 +793,15 @@ class NURESTFetcher(list):
                 self.current_total_count = 0
                 self.current_page = 0
                 self.current_ordered_by = ''
+                self.current_changes = None
 
             return self._send_content(content=None, connection=connection)
 
         results = response.data
         fetched_objects = list()
-        current_ids = list()
+
+        if 'X-Nuage-Count' in response.headers and response.headers['X-Nuage-Count']:
+            self._cache_count(connection.request, int(response.headers['X-Nuage-Count']))
 
         if should_commit:
             if 'X-Nuage-Count' in response.headers and response.headers['X-Nuage-Count']:
@@ -322,33 +813,132 @@ class NURESTFetcher(list):
             if 'X-Nuage-OrderBy' in response.headers and response.headers['X-Nuage-OrderBy']:
                 self.current_ordered_by = response.headers['X-Nuage-OrderBy']
 
+        started_at = time()
+
+        if should_commit:
+            self.current_changes = NURESTChangeSet() if connection.user_info.get('changes') else None
+
         if results:
             for result in results:
                 nurest_object = self.new()
                 nurest_object.from_dict(result)
+                nurest_object._reset_dirty_attributes()
                 nurest_object.parent = self.parent_object
 
                 fetched_objects.append(nurest_object)
 
-                if not should_commit:
-                    continue
+            if should_commit and self._store is not None:
+                self._commit_to_store(fetched_objects, self.current_changes)
 
-                current_ids.append(nurest_object.id)
-
-                if nurest_object in self:
-                    idx = self.index(nurest_object)
-                    current_object = self[idx]
-                    current_object.from_dict(nurest_object.to_dict())
-                else:
-                    self.append(nurest_object)
+            elif should_commit:
+                self._commit(fetched_objects, self.current_changes)
 
             if should_commit:
-                for obj in self:
-                    if obj.id not in current_ids:
-                        self.remove(obj)
+                self._mirror_objects(fetched_objects)
+
+        elapsed = time() - started_at
+
+        if NURESTMetrics.is_enabled():
+            NURESTMetrics.get_default_metrics().observe_fetch(resource_name=self.managed_class().resource_name, count=len(fetched_objects), elapsed=elapsed)
+
+        if connection.span is not None:
+            connection.span.set_attributes(count=len(fetched_objects), build_time=elapsed)
 
         return self._send_content(content=fetched_objects, connection=connection)
 
+    def fetch_changes(self, filter=None, order_by=None, group_by=[], page=None, page_size=None, query_parameters=None):
+        """ Fetch and commit objects, and return what changed in the fetcher
+
+            Args:
+                filter (string): string that represents a predicate filter
+                order_by (string): string that represents an order by clause
+                group_by (string): list of names for grouping
+                page (int): number of the page to load
+                page_size (int): number of results per page
+
+            Returns:
+                bambou.NURESTChangeSet: the objects added, updated and removed
+
+            Example:
+                >>> print entity.children.fetch_changes()
+                <NURESTChangeSet added=0 updated=1 removed=2>
+        """
+
+        self.fetch(filter=filter, order_by=order_by, group_by=group_by, page=page, page_size=page_size, query_parameters=query_parameters, commit=True, changes=True)
+        return self.current_changes if self.current_changes is not None else NURESTChangeSet()
+
+    def sync(self, since=None, filter=None, reconcile=True, page_size=None):
+        """ Fetch the objects updated since a watermark, and merge them in the fetcher
+
+            The first sync fetches all objects. The following ones only fetch
+            the objects whose `lastUpdatedDate` is not older than the watermark,
+            and `current_watermark` moves to the latest date fetched, so each
+            sync costs requests proportional to the number of changes.
+
+            Deleted objects do not appear in these fetches. To detect them, the
+            number of objects on the server is compared with the number of
+            objects in the fetcher, and only when they differ, the ids of all
+            objects are fetched without building objects.
+
+            The watermark is only kept in memory. It is saved with the fetcher
+            by :class:`bambou.NURESTSnapshot`, or can be stored by the caller
+            and given back with `since`.
+
+            Args:
+                since (float): the watermark in milliseconds. Default is the `current_watermark` of the fetcher
+                filter (string): string that represents a predicate filter, applied to every sync of the fetcher
+                reconcile (bool): detect the objects deleted on the server
+                page_size (int): number of results per page
+
+            Returns:
+                bambou.NURESTChangeSet: the objects added, updated and removed, or None if
+                a page could not be fetched. Nothing is merged in that case.
+
+            Example:
+                >>> entity.children.sync()
+                <NURESTChangeSet added=1250 updated=0 removed=0>
+                >>> entity.children.sync()
+                <NURESTChangeSet added=1 updated=2 removed=1>
+        """
+
+        if since is None:
+            since = self.current_watermark
+
+        page_size = page_size or self.PAGE_SIZE
+        changes = NURESTChangeSet()
+
+        with NURESTTracer.get_default_tracer().start_span('sync', resource=self.managed_class().resource_name, since=since) as span:
+            if since is None:
+                (objects, _) = self._fetch_all_pages(filter=filter, page_size=page_size)
+            else:
+                (objects, _) = self._fetch_all_pages(filter=self._get_watermark_filter(since, filter), page_size=page_size)
+
+            if objects is None:
+                self.current_changes = None
+                return None
+
+            if self._store is not None:
+                self._commit_to_store(objects, changes, remove_missing=since is None)
+            else:
+                self._commit(objects, changes, remove_missing=since is None)
+
+            if since is not None and reconcile:
+                self._reconcile(filter=filter, page_size=page_size, changes=changes)
+
+            self._mirror_objects(objects)
+
+            span.set_attributes(fetched=len(objects), added=len(changes.added), updated=len(changes.updated), removed=len(changes.removed))
+
+        dates = [nurest_object.last_updated_date for nurest_object in objects if nurest_object.last_updated_date is not None]
+
+        if since is not None:
+            dates.append(since)
+
+        self.current_watermark = max(dates) if dates else None
+        self.current_changes = changes
+
+        return changes
+
     def get(self, filter=None, order_by=None, group_by=[], page=None, page_size=None, query_parameters=None, commit=True, async=False, callback=None):
         """ Fetch object and directly return them
 
@@ -376,6 +966,63 @@ class NURESTFetcher(list):
         """
         return self.fetch(filter=filter, order_by=order_by, group_by=group_by, page=page, page_size=page_size, query_parameters=query_parameters, commit=commit)[2]
 
+    def get_page(self, filter=None, order_by=None, group_by=[], page=None, page_size=None, query_parameters=None, commit=True):
+        """ Fetch a page of objects and directly return them with the total count of objects
+
+            The total count is read from the response of the fetch, so that
+            pagers do not have to send a separate count request.
+
+            Args:
+                filter (string): string that represents a predicate filter
+                order_by (string): string that represents an order by clause
+                group_by (string): list of names for grouping
+                page (int): number of the page to load
+                page_size (int): number of results per page
+                commit (bool): boolean to update current object
+
+            Returns:
+                tuple: the list of fetched objects, and the total count of objects matching the filter
+
+            Example:
+                >>> print entity.children.get_page(page=2, page_size=2)
+                ([<NUChildren at xxx>, <NUChildren at yyyy>], 42)
+        """
+
+        request = NURESTRequest(method=HTTP_METHOD_GET, url=self._prepare_url(), params=query_parameters)
+
+        self._prepare_headers(request=request, filter=filter, order_by=order_by, group_by=group_by, page=page, page_size=page_size)
+
+        with NURESTTracer.get_default_tracer().start_span('fetch', resource=self.managed_class().resource_name, filter=filter, page=page, page_size=page_size) as span:
+            connection = self.parent_object.send_request(request=request, user_info={'commit': commit}, span=span)
+            objects = self._did_fetch(connection=connection)[2] or list()
+
+        total_count = connection.response.headers.get('X-Nuage-Count')
+
+        return (objects, int(total_count) if total_count else len(objects))
+
+    def filter_local(self, filter):
+        """ Get the fetched objects that match a filter, without sending any request
+
+            Args:
+                filter (string): string that represents a predicate filter, using the `X-Nuage-Filter` grammar
+
+            Returns:
+                list: the matching objects, in the order of the fetcher
+
+            Raises:
+                InternalConsitencyError: if the filter is not valid
+
+            Example:
+                >>> entity.children.fetch()
+                >>> entity.children.filter_local('name startswith "prod" and priority > 10')
+                [<NUChildren at ccc>]
+        """
+
+        if not isinstance(filter, NURESTFilter):
+            filter = NURESTFilter.compile(filter)
+
+        return filter.filter(self)
+
     def get_first(self, filter=None, order_by=None, group_by=[], query_parameters=None, commit=False, async=False, callback=None):
         """ Fetch object and directly return the first one
 
@@ -427,12 +1074,23 @@ class NURESTFetcher(list):
 
         self._prepare_headers(request=request, filter=filter, order_by=order_by, group_by=group_by, page=page, page_size=page_size)
 
+        count_cache = self._get_count_cache()
+
+        if count_cache is not None and not async:
+            count = count_cache.get(count_cache.get_key(request))
+
+            if count is not None:
+                return (self, self.parent_object, count)
+
+        span = NURESTTracer.get_default_tracer().start_span('count', resource=self.managed_class().resource_name, filter=filter)
+
         if async:
-            return self.parent_object.send_request(request=request, async=async, local_callback=self._did_count, remote_callback=callback)
+            return self.parent_object.send_request(request=request, async=async, local_callback=self._did_count, remote_callback=callback, span=span)
 
         else:
-            connection = self.parent_object.send_request(request=request)
-            return self._did_count(connection)
+            with span:
+                connection = self.parent_object.send_request(request=request, span=span)
+                return self._did_count(connection)
 
     def get_count(self, filter=None, order_by=None, group_by=[], page=None, page_size=None, query_parameters=None):
         """ Get the total count of objects that can be fetched according to filter
@@ -461,6 +1119,9 @@ class NURESTFetcher(list):
         if 'X-Nuage-Count' in response.headers:
             count = int(response.headers['X-Nuage-Count'])
 
+            if response.status_code == 200:
+                self._cache_count(connection.request, count)
+
         if 'remote' in connection.callbacks:
             callback = connection.callbacks['remote']
 
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import re
+
+from .exceptions import InternalConsitencyError
+
+
+TOKEN_REGEX = re.compile(r'''(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|(?P<number>-?\d+(?:\.\d+)?(?![\w.]))|(?P<operator>==|!=|<=|>=|<|>|&&|\|\||\(|\))|(?P<word>[A-Za-z_][\w.]*)''')
+ESCAPE_REGEX = re.compile(r'\\(.)')
+WHITESPACE_REGEX = re.compile(r'\s*')
+
+KEYWORDS = ('and', 'or', 'not', 'contains', 'startswith', 'endswith', 'true', 'false', 'null')
+LITERALS = {'true': True, 'false': False, 'null': None}
+COMPARISON_OPERATORS = ('==', '!=', '<', '>', '<=', '>=', 'contains', 'startswith', 'endswith')
+
+MAX_COMPILED_FILTERS = 256
+
+
+class NURESTFilter(object):
+    """ Predicate compiled from an `X-Nuage-Filter` expression
+
+        The filter grammar supports comparisons of an attribute with a
+        literal using `==`, `!=`, `<`, `>`, `<=`, `>=`, `contains`,
+        `startswith` and `endswith`, combined with `and`, `or`, `not` and
+        parentheses. Literals are quoted strings, numbers, `true`, `false`
+        and `null`. A lone literal searches its text in all attribute values.
+
+        Attributes are named by their remote name, like in the requests
+        sent to the VSD, or by their local name. Filters evaluate objects
+        and dictionaries of remote attributes, so that queries can be
+        answered from the objects already fetched.
+
+        Example:
+            >>> predicate = NURESTFilter('name startswith "prod" and (priority > 10 or description contains "web")')
+            >>> predicate.matches(domain)
+            True
+    """
+
+    _compiled_filters = dict()
+
+    def __init__(self, expression):
+        """ Parses a filter expression
+
+            Args:
+                expression (string): the filter expression
+
+            Raises:
+                InternalConsitencyError: if the expression is not valid
+        """
+
+        self.expression = expression
+
+        self._tokens = self._tokenize(expression)
+        self._position = 0
+        self._predicate = self._parse_or()
+
+        if self._position < len(self._tokens):
+            self._raise_unexpected()
+
+        del self._tokens
+
+    def __repr__(self):
+        return '<NURESTFilter %s>' % self.expression
+
+    # Class methods
+
+    @classmethod
+    def compile(cls, expression):
+        """ Get the filter of an expression, parsing each expression once
+
+            Args:
+                expression (string): the filter expression
+
+            Returns:
+                (bambou.NURESTFilter): the filter
+        """
+
+        nurest_filter = cls._compiled_filters.get(expression)
+
+        if nurest_filter is None:
+            nurest_filter = cls(expression)
+
+            if len(cls._compiled_filters) >= MAX_COMPILED_FILTERS:
+                cls._compiled_filters.clear()
+
+            cls._compiled_filters[expression] = nurest_filter
+
+        return nurest_filter
+
+    # Methods
+
+    def matches(self, nurest_object):
+        """ Evaluates the filter
+
+            Args:
+                nurest_object (bambou.NURESTObject or dict): an object, or a dictionary of remote attributes
+
+            Returns:
+                (bool): True if the object matches the filter
+        """
+
+        return self._predicate(_AttributeGetter(nurest_object))
+
+    def filter(self, nurest_objects):
+        """ Get the objects that match the filter
+
+            Args:
+                nurest_objects (iterable): objects, or dictionaries of remote attributes
+
+            Returns:
+                (list): the matching objects, in their original order
+        """
+
+        return [nurest_object for nurest_object in nurest_objects if self.matches(nurest_object)]
+
+    # Parsing
+
+    def _tokenize(self, expression):
+        """ Splits the expression in (kind, value) tokens """
+
+        tokens = list()
+        position = WHITESPACE_REGEX.match(expression).end()
+
+        while position < len(expression):
+            match = TOKEN_REGEX.match(expression, position)
+
+            if match is None:
+                raise InternalConsitencyError('Invalid filter %r: unexpected character at position %s' % (expression, position))
+
+            kind = match.lastgroup
+            value = match.group(kind)
+
+            if kind == 'string':
+                value = ESCAPE_REGEX.sub(r'\1', value[1:-1])
+            elif kind == 'number':
+                value = float(value) if '.' in value else int(value)
+            elif kind == 'word' and value.lower() in KEYWORDS:
+                kind = 'keyword'
+                value = value.lower()
+            elif kind == 'operator' and value in ('&&', '||'):
+                kind = 'keyword'
+                value = 'and' if value == '&&' else 'or'
+
+            tokens.append((kind, value))
+            position = WHITESPACE_REGEX.match(expression, match.end()).end()
+
+        return tokens
+
+    def _peek(self):
+        """ Get the current token, or None at the end of the expression """
+
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _accept(self, *values):
+        """ Consumes the current token if it is one of the given operators or keywords """
+
+        (kind, value) = self._peek()
+
+        if kind in ('operator', 'keyword') and value in values:
+            self._position += 1
+            return value
+
+        return None
+
+    def _raise_unexpected(self):
+        """ Raises an error about the current token """
+
+        (kind, value) = self._peek()
+
+        if kind is None:
+            raise InternalConsitencyError('Invalid filter %r: unexpected end of expression' % self.expression)
+
+        raise InternalConsitencyError('Invalid filter %r: unexpected %r' % (self.expression, value))
+
+    def _parse_or(self):
+        """ or_expression := and_expression ('or' and_expression)* """
+
+        predicates = [self._parse_and()]
+
+        while self._accept('or'):
+            predicates.append(self._parse_and())
+
+        if len(predicates) == 1:
+            return predicates[0]
+
+        return lambda getter: any(predicate(getter) for predicate in predicates)
+
+    def _parse_and(self):
+        """ and_expression := not_expression ('and' not_expression)* """
+
+        predicates = [self._parse_not()]
+
+        while self._accept('and'):
+            predicates.append(self._parse_not())
+
+        if len(predicates) == 1:
+            return predicates[0]
+
+        return lambda getter: all(predicate(getter) for predicate in predicates)
+
+    def _parse_not(self):
+        """ not_expression := 'not' not_expression | primary """
+
+        if self._accept('not'):
+            predicate = self._parse_not()
+            return lambda getter: not predicate(getter)
+
+        return self._parse_primary()
+
+    def _parse_primary(self):
+        """ primary := '(' or_expression ')' | attribute operator literal | literal """
+
+        if self._accept('('):
+            predicate = self._parse_or()
+
+            if not self._accept(')'):
+                self._raise_unexpected()
+
+            return predicate
+
+        (kind, value) = self._peek()
+
+        if kind == 'word':
+            self._position += 1
+            operator = self._accept(*COMPARISON_OPERATORS)
+
+            if operator is None:
+                self._raise_unexpected()
+
+            return _compile_comparison(value, operator, self._parse_literal())
+
+        literal = self._parse_literal()
+
+        if literal is None:
+            self._raise_unexpected()
+
+        return lambda getter: getter.contains_text('%s' % literal)
+
+    def _parse_literal(self):
+        """ literal := string | number | 'true' | 'false' | 'null' """
+
+        (kind, value) = self._peek()
+
+        if kind in ('string', 'number'):
+            self._position += 1
+            return value
+
+        if kind == 'keyword' and value in LITERALS:
+            self._position += 1
+            return LITERALS[value]
+
+        self._raise_unexpected()
+
+
+class _AttributeGetter(object):
+    """ Reads attribute values of an object or of a dictionary """
+
+    _local_names_by_class = dict()
+
+    def __init__(self, nurest_object):
+        self._object = nurest_object
+        self._local_names = None if isinstance(nurest_object, dict) else self._get_local_names(nurest_object)
+
+    def get(self, name):
+        """ Get the value of an attribute by remote or local name """
+
+        if self._local_names is None:
+            return self._object.get(name)
+
+        local_name = self._local_names.get(name)
+        return getattr(self._object, local_name, None) if local_name else None
+
+    def contains_text(self, text):
+        """ Check if the text is in the value of any attribute """
+
+        if self._local_names is None:
+            values = self._object.values()
+        else:
+            values = [getattr(self._object, local_name, None) for local_name in set(self._local_names.values())]
+
+        return any(text in '%s' % value for value in values if value is not None)
+
+    @classmethod
+    def _get_local_names(cls, nurest_object):
+        """ Get the local names of the attributes of an object by remote and local name """
+
+        local_names = cls._local_names_by_class.get(nurest_object.__class__)
+
+        if local_names is None:
+            local_names = dict()
+
+            for attribute in nurest_object.get_attributes():
+                local_names[attribute.local_name] = attribute.local_name
+                local_names[attribute.remote_name] = attribute.local_name
+
+            cls._local_names_by_class[nurest_object.__class__] = local_names
+
+        return local_names
+
+
+def _coerce(value, literal):
+    """ Converts an attribute value to the type of the literal it is compared to """
+
+    if value is None or literal is None:
+        return value
+
+    if isinstance(literal, bool):
+        return value if isinstance(value, bool) else ('%s' % value).lower() == 'true'
+
+    if isinstance(literal, (int, long, float)):
+        if isinstance(value, (int, long, float)) and not isinstance(value, bool):
+            return value
+
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    return value if isinstance(value, basestring) else '%s' % value
+
+
+def _is_equal(value, literal):
+    """ Check if a value equals a literal """
+
+    return _coerce(value, literal) == literal
+
+
+def _is_ordered(value, literal, comparison):
+    """ Check if a value and a literal are ordered, ignoring missing values """
+
+    value = _coerce(value, literal)
+
+    if value is None or literal is None:
+        return False
+
+    return comparison(value, literal)
+
+
+def _contains(value, literal):
+    """ Check if a list contains the literal, or if a text contains the literal text """
+
+    if value is None or literal is None:
+        return False
+
+    if isinstance(value, (list, tuple, set)):
+        return any(_is_equal(item, literal) for item in value)
+
+    return '%s' % literal in _coerce(value, '')
+
+
+COMPARISONS = {
+    '==': _is_equal,
+    '!=': lambda value, literal: not _is_equal(value, literal),
+    '<': lambda value, literal: _is_ordered(value, literal, lambda a, b: a < b),
+    '>': lambda value, literal: _is_ordered(value, literal, lambda a, b: a > b),
+    '<=': lambda value, literal: _is_ordered(value, literal, lambda a, b: a <= b),
+    '>=': lambda value, literal: _is_ordered(value, literal, lambda a, b: a >= b),
+    'contains': _contains,
+    'startswith': lambda value, literal: value is not None and literal is not None and _coerce(value, '').startswith('%s' % literal),
+    'endswith': lambda value, literal: value is not None and literal is not None and _coerce(value, '').endswith('%s' % literal),
+}
+
+
+def _compile_comparison(name, operator, literal):
+    """ Get the predicate comparing an attribute with a literal """
+
+    comparison = COMPARISONS[operator]
+    return lambda getter: comparison(getter.get(name), literal)
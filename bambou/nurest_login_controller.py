@@ -47,6 +47,7 @@ class NURESTLoginController(object):
             self._enterprise = None
             self._url = None
             self._async = True
+            self._authentication_headers_cache = dict()
 
     def __str__(self):
         """ Prints information """
@@ -155,6 +156,7 @@ class NURESTLoginController(object):
         """
 
         self._api_key = api_key
+        self._authentication_headers_cache = dict()
 
     @property
     def enterprise(self):
@@ -255,6 +257,35 @@ class NURESTLoginController(object):
 
         return "XREST %s" % urlsafe_b64encode("%s:%s" % (user, password))
 
+    def get_authentication_headers(self, enterprise=None, user=None, api_key=None):
+        """ Return the organization, authorization and impersonation headers
+
+            Header sets are cached until the credentials or the impersonation
+            change, so the returned dictionary is shared and must not be modified.
+
+            Returns:
+                Returns a dictionary of headers to add to the request
+        """
+
+        if not enterprise:
+            enterprise = self.enterprise
+
+        key = (enterprise, user, api_key, self._user, self._api_key, self._password, self._certificate, self._impersonation)
+        headers = self._authentication_headers_cache.get(key)
+
+        if headers is None:
+            headers = {'X-Nuage-Organization': enterprise, 'Authorization': self.get_authentication_header(user, api_key)}
+
+            if self._is_impersonating:
+                headers['X-Nuage-ProxyUser'] = self._impersonation
+
+            if len(self._authentication_headers_cache) >= 16:
+                self._authentication_headers_cache = dict()
+
+            self._authentication_headers_cache[key] = headers
+
+        return headers
+
     def reset(self):
         """ Reset controller
 
@@ -283,6 +314,7 @@ class NURESTLoginController(object):
 
         self._is_impersonating = True
         self._impersonation = "%s@%s" % (user, enterprise)
+        self._authentication_headers_cache = dict()
 
     def stop_impersonate(self):
         """ Stop impersonization """
@@ -290,6 +322,7 @@ class NURESTLoginController(object):
         if self._is_impersonating:
             self._is_impersonating = False
             self._impersonation = None
+            self._authentication_headers_cache = dict()
 
     def equals(self, controller):
         """ Verify if the controller corresponds
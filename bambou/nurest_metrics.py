@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+
+from bambou.config import BambouConfig
+
+
+class _NURESTHistogram(object):
+    """ Histogram with fixed buckets """
+
+    def __init__(self, buckets):
+        """ Initializes an empty histogram
+
+            Args:
+                buckets (list): sorted upper bounds of the buckets
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """ Records a value """
+
+        self.sum += value
+        self.count += 1
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def to_dict(self):
+        """ Converts the histogram into a dictionary with cumulative bucket counts """
+
+        buckets = list()
+        cumulated = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            cumulated += count
+            buckets.append((bound, cumulated))
+
+        return {'buckets': buckets, 'sum': self.sum, 'count': self.count}
+
+
+class NURESTMetrics(object):
+    """ In process metrics registry
+
+        Metrics are populated by :class:`bambou.NURESTConnection`, :class:`bambou.NURESTFetcher`
+        and :class:`bambou.NURESTPushCenter` into the default registry. They can be read as a
+        dictionary with `snapshot`, or in the Prometheus text exposition format with `to_text`.
+
+        Collection is disabled by default. It can be enabled with :func:`bambou.BambouConfig.set_metrics_enabled`
+        or with the `BAMBOU_METRICS` environment variable.
+
+        Example:
+            >>> metrics = NURESTMetrics.get_default_metrics()
+            >>> print metrics.snapshot()['counters']['bambou_http_requests_total']
+            {(('method', 'GET'), ('resource', 'enterprises'), ('status', '200')): 12}
+            >>> print metrics.to_text()
+            # TYPE bambou_http_requests_total counter
+            bambou_http_requests_total{method="GET",resource="enterprises",status="200"} 12
+            ...
+
+        Environment variables:
+            BAMBOU_METRICS: set to 1 to enable metrics collection
+    """
+
+    DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+    DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, float('inf'))
+
+    __default_metrics = None
+
+    def __init__(self):
+        """ Initializes an empty registry """
+
+        self._lock = threading.Lock()
+        self._counters = dict()
+        self._gauges = dict()
+        self._histograms = dict()
+        self._collectors = list()
+
+    # Class Methods
+
+    @classmethod
+    def get_default_metrics(cls):
+        """ Get the registry populated by bambou
+
+            Returns:
+                (bambou.NURESTMetrics): the default registry
+        """
+
+        if NURESTMetrics.__default_metrics is None:
+            NURESTMetrics.__default_metrics = cls()
+
+        return NURESTMetrics.__default_metrics
+
+    @classmethod
+    def is_enabled(cls):
+        """ Check if metrics should be collected
+
+            Returns:
+                Returns True if metrics collection is enabled in BambouConfig
+        """
+
+        return BambouConfig._metrics_enabled
+
+    # Generic metrics
+
+    def increment(self, name, value=1, **labels):
+        """ Increments a counter
+
+            Args:
+                name (string): the name of the counter
+                value (float): the value to add
+                labels: labels of the counter
+        """
+
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            counter = self._counters.setdefault(name, dict())
+            counter[key] = counter.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """ Sets a gauge
+
+            Args:
+                name (string): the name of the gauge
+                value (float): the value of the gauge
+                labels: labels of the gauge
+        """
+
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            self._gauges.setdefault(name, dict())[key] = value
+
+    def add_to_gauge(self, name, value, **labels):
+        """ Adds a value to a gauge
+
+            Args:
+                name (string): the name of the gauge
+                value (float): the value to add, that can be negative
+                labels: labels of the gauge
+        """
+
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            gauge = self._gauges.setdefault(name, dict())
+            gauge[key] = gauge.get(key, 0) + value
+
+    def observe(self, name, value, buckets=DEFAULT_LATENCY_BUCKETS, **labels):
+        """ Records a value in a histogram
+
+            Args:
+                name (string): the name of the histogram
+                value (float): the value to record
+                buckets (list): upper bounds of the buckets, used when the histogram is created
+                labels: labels of the histogram
+        """
+
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            histograms = self._histograms.setdefault(name, dict())
+            histogram = histograms.get(key)
+
+            if histogram is None:
+                histogram = _NURESTHistogram(buckets)
+                histograms[key] = histogram
+
+            histogram.observe(value)
+
+    def add_collector(self, collector):
+        """ Registers a function called before reading the metrics
+
+            Collectors are used to refresh gauges that are expensive or
+            impossible to keep up to date, like queue sizes.
+
+            Args:
+                collector (function): function called with the registry as argument
+        """
+
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        """ Unregisters a collector
+
+            Args:
+                collector (function): the collector to remove
+        """
+
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    # Bambou metrics
+
+    def observe_request(self, method, resource_name, status_code, elapsed, request_size, response_size):
+        """ Records a completed HTTP request
+
+            Args:
+                method (string): the HTTP method
+                resource_name (string): the resource name
+                status_code (int): the received status code
+                elapsed (float): the number of seconds spent
+                request_size (int): the number of bytes sent
+                response_size (int): the number of bytes received
+        """
+
+        self.increment('bambou_http_requests_total', method=method, resource=resource_name, status=str(status_code))
+        self.observe('bambou_http_request_duration_seconds', elapsed, method=method, resource=resource_name)
+        self.observe('bambou_http_request_size_bytes', request_size, buckets=self.DEFAULT_SIZE_BUCKETS, method=method, resource=resource_name)
+        self.observe('bambou_http_response_size_bytes', response_size, buckets=self.DEFAULT_SIZE_BUCKETS, method=method, resource=resource_name)
+
+    def observe_fetch(self, resource_name, count, elapsed):
+        """ Records the objects built from a fetch
+
+            Args:
+                resource_name (string): the resource name of the fetched objects
+                count (int): the number of objects
+                elapsed (float): the number of seconds spent building the objects
+        """
+
+        self.increment('bambou_fetched_objects_total', count, resource=resource_name)
+        self.observe('bambou_fetch_decode_duration_seconds', elapsed, resource=resource_name)
+
+    # Reading
+
+    def reset(self):
+        """ Removes all metrics """
+
+        with self._lock:
+            self._counters = dict()
+            self._gauges = dict()
+            self._histograms = dict()
+
+    def snapshot(self):
+        """ Get all metrics
+
+            Returns:
+                dict: counters, gauges and histograms by name, then by labels
+        """
+
+        for collector in list(self._collectors):
+            collector(self)
+
+        with self._lock:
+            return {'counters': dict((name, dict(values)) for name, values in self._counters.items()),
+                    'gauges': dict((name, dict(values)) for name, values in self._gauges.items()),
+                    'histograms': dict((name, dict((key, histogram.to_dict()) for key, histogram in values.items())) for name, values in self._histograms.items())}
+
+    def to_text(self):
+        """ Get all metrics in the Prometheus text exposition format
+
+            Returns:
+                string: the metrics
+        """
+
+        snapshot = self.snapshot()
+        lines = list()
+
+        for kind, type_name in (('counters', 'counter'), ('gauges', 'gauge')):
+            for name in sorted(snapshot[kind]):
+                lines.append('# TYPE %s %s' % (name, type_name))
+
+                for key, value in sorted(snapshot[kind][name].items()):
+                    lines.append('%s%s %s' % (name, self._format_labels(key), self._format_value(value)))
+
+        for name in sorted(snapshot['histograms']):
+            lines.append('# TYPE %s histogram' % name)
+
+            for key, histogram in sorted(snapshot['histograms'][name].items()):
+                for bound, count in histogram['buckets']:
+                    lines.append('%s_bucket%s %s' % (name, self._format_labels(key + (('le', self._format_value(bound)),)), count))
+
+                lines.append('%s_sum%s %s' % (name, self._format_labels(key), self._format_value(histogram['sum'])))
+                lines.append('%s_count%s %s' % (name, self._format_labels(key), histogram['count']))
+
+        return '\n'.join(lines) + '\n'
+
+    # Private methods
+
+    def _format_labels(self, key):
+        """ Formats labels """
+
+        if not key:
+            return ''
+
+        return '{%s}' % ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in key)
+
+    def _format_value(self, value):
+        """ Formats a value """
+
+        if value == float('inf'):
+            return '+Inf'
+
+        return repr(value) if isinstance(value, float) else str(value)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+class NURESTMiddleware(object):
+    """ Hooks called by :class:`bambou.NURESTConnection` around each request
+
+        Middlewares are registered on a :class:`bambou.NURESTSession` and are called in
+        order before sending a request, and in reverse order after receiving the response.
+        Subclasses override the hooks they need. All hooks receive the connection, giving
+        access to its `request`, `response` and `transaction_id`.
+
+        Example:
+            >>> class LoggingMiddleware(NURESTMiddleware):
+            ...     def post_receive(self, connection, elapsed):
+            ...         print "%s %s took %.3fs" % (connection.request.method, connection.request.url, elapsed)
+            >>>
+            >>> session.add_middleware(LoggingMiddleware())
+    """
+
+    def pre_send(self, connection):
+        """ Called before sending the request
+
+            The request can be modified through `connection.request`. Returning a
+            :class:`bambou.NURESTResponse` skips the HTTP call and the following middlewares,
+            and uses the returned response instead.
+
+            Args:
+                connection (bambou.NURESTConnection): the connection
+
+            Returns:
+                Returns None, or a NURESTResponse to use instead of sending the request
+        """
+
+        return None
+
+    def post_receive(self, connection, elapsed):
+        """ Called after receiving the response
+
+            The response is available as `connection.response`. Returning a
+            :class:`bambou.NURESTResponse` replaces it.
+
+            Args:
+                connection (bambou.NURESTConnection): the connection
+                elapsed (float): number of seconds spent sending the request and receiving the response
+
+            Returns:
+                Returns None, or a NURESTResponse to use instead of the received one
+        """
+
+        return None
+
+    def on_error(self, connection, exception, elapsed):
+        """ Called when sending the request raised an exception
+
+            The exception is raised again after all middlewares have been called.
+
+            Args:
+                connection (bambou.NURESTConnection): the connection
+                exception (Exception): the raised exception
+                elapsed (float): number of seconds spent before the exception
+        """
+
+        pass
+
+    def on_timeout(self, connection, elapsed):
+        """ Called when the request has timeout
+
+            Args:
+                connection (bambou.NURESTConnection): the connection
+                elapsed (float): number of seconds spent before the timeout
+        """
+
+        pass
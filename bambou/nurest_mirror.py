@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import json
+import sqlite3
+import threading
+
+from .exceptions import InternalConsitencyError
+from .nurest_modelcontroller import NURESTModelController
+
+
+COLUMN_TYPES = {bool: 'INTEGER', int: 'INTEGER', long: 'INTEGER', float: 'REAL'}
+JSON_TYPES = (list, dict, object)
+INDEXED_COLUMNS = ('parent_id', 'name')
+
+
+class NURESTMirror(object):
+    """ Local SQLite copy of fetched objects
+
+        The mirror keeps one table per ReST name, with one column per exposed
+        attribute of the model, named after its local name. Lists, dictionaries
+        and objects are stored as JSON. Tables are created the first time an
+        object of their ReST name is written, with indexes on `id`, `parent_id`
+        and `name`.
+
+        Set the mirror of a session to copy every committed fetch, and listen
+        to a push center to apply the pushed creations, updates and deletions.
+        Queries run against the local database and return new model objects.
+
+        Example:
+            >>> mirror = NURESTMirror('/var/cache/vsd.db')
+            >>> session.mirror = mirror
+            >>> enterprise.domains.fetch()
+            >>> mirror.query(NUDomain, where='name LIKE ?', parameters=('prod-%',))
+            [<NUDomain at ...>, <NUDomain at ...>]
+    """
+
+    def __init__(self, path=':memory:'):
+        """ Initializes a mirror
+
+            Args:
+                path (string): the path of the SQLite database. Default is an in-memory database
+        """
+
+        self.path = path
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._columns = dict()
+        self._push_center = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Properties
+
+    @property
+    def rest_names(self):
+        """ Get the ReST names that have a table in the mirror """
+
+        with self._lock:
+            cursor = self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+            return [str(row[0]) for row in cursor]
+
+    # Methods
+
+    def add(self, nurest_objects):
+        """ Writes objects, replacing the mirrored objects with the same id
+
+            All objects are written in a single transaction. Objects that
+            do not have an id are ignored.
+
+            Args:
+                nurest_objects (list): the objects to write
+
+            Returns:
+                (int): the number of objects written
+        """
+
+        rows_by_rest_name = dict()
+
+        for nurest_object in nurest_objects:
+            if nurest_object.id is None:
+                continue
+
+            rows_by_rest_name.setdefault(nurest_object.rest_name, list()).append(nurest_object)
+
+        count = 0
+
+        with self._lock:
+            with self._connection:
+                for rest_name, rest_objects in rows_by_rest_name.iteritems():
+                    columns = self._get_columns(rest_name, model=rest_objects[0].__class__)
+                    rows = [[self._encode(getattr(nurest_object, name, None), attribute_type) for (name, attribute_type) in columns] for nurest_object in rest_objects]
+
+                    self._connection.executemany('INSERT OR REPLACE INTO "%s" (%s) VALUES (%s)' % (rest_name, ', '.join('"%s"' % name for (name, attribute_type) in columns), ', '.join('?' * len(columns))), rows)
+                    count += len(rows)
+
+        return count
+
+    def remove(self, model, ids):
+        """ Removes objects
+
+            Args:
+                model (class or string): the model class or ReST name of the objects
+                ids (list): the ids of the objects to remove
+
+            Returns:
+                (int): the number of objects removed
+        """
+
+        rest_name = self._get_rest_name(model)
+
+        with self._lock:
+            if rest_name not in self._columns and not self._has_table(rest_name):
+                return 0
+
+            with self._connection:
+                cursor = self._connection.executemany('DELETE FROM "%s" WHERE id = ?' % rest_name, [(id,) for id in ids])
+                return cursor.rowcount
+
+    def query(self, model, where=None, parameters=(), order_by=None, limit=None):
+        """ Queries mirrored objects
+
+            Args:
+                model (class or string): the model class or ReST name of the objects
+                where (string): a SQL condition on the local names of the attributes, using `?` placeholders
+                parameters (tuple): the values of the placeholders
+                order_by (string): a SQL ordering, like `name DESC`
+                limit (int): the maximum number of objects to return
+
+            Returns:
+                (list): new objects of the model, without parent object
+        """
+
+        rest_name = self._get_rest_name(model)
+        model = self._get_model(model)
+
+        with self._lock:
+            if not self._has_table(rest_name):
+                return list()
+
+            columns = self._get_columns(rest_name, model=model)
+            statement = 'SELECT %s FROM "%s"' % (', '.join('"%s"' % name for (name, attribute_type) in columns), rest_name)
+            statement += self._get_clauses(where=where, order_by=order_by, limit=limit)
+
+            rows = self._connection.execute(statement, parameters).fetchall()
+
+        nurest_objects = list()
+
+        for row in rows:
+            nurest_object = model()
+
+            for ((name, attribute_type), value) in zip(columns, row):
+                setattr(nurest_object, name, self._decode(value, attribute_type))
+
+            nurest_object._reset_dirty_attributes()
+            nurest_objects.append(nurest_object)
+
+        return nurest_objects
+
+    def get(self, model, id):
+        """ Get a mirrored object
+
+            Args:
+                model (class or string): the model class or ReST name of the object
+                id (string): the id of the object
+
+            Returns:
+                (bambou.NURESTObject): a new object of the model, or None if it is not mirrored
+        """
+
+        objects = self.query(model, where='id = ?', parameters=(id,))
+        return objects[0] if objects else None
+
+    def count(self, model, where=None, parameters=()):
+        """ Counts mirrored objects
+
+            Args:
+                model (class or string): the model class or ReST name of the objects
+                where (string): a SQL condition on the local names of the attributes, using `?` placeholders
+                parameters (tuple): the values of the placeholders
+
+            Returns:
+                (int): the number of matching objects
+        """
+
+        rest_name = self._get_rest_name(model)
+
+        with self._lock:
+            if not self._has_table(rest_name):
+                return 0
+
+            statement = 'SELECT COUNT(*) FROM "%s"' % rest_name + self._get_clauses(where=where)
+            return self._connection.execute(statement, parameters).fetchone()[0]
+
+    def clear(self):
+        """ Removes all tables """
+
+        with self._lock:
+            with self._connection:
+                for rest_name in self.rest_names:
+                    self._connection.execute('DROP TABLE "%s"' % rest_name)
+
+            self._columns = dict()
+
+    def close(self):
+        """ Stops listening to push notifications and closes the database """
+
+        self.stop_listening()
+
+        with self._lock:
+            self._connection.close()
+
+    # Push notifications
+
+    def start_listening(self, push_center):
+        """ Applies the events received by a push center
+
+            The mirror is registered as a delegate of the push center. Events
+            about models that are not registered are ignored.
+
+            Args:
+                push_center (bambou.NURESTPushCenter): the push center
+        """
+
+        self.stop_listening()
+        push_center.add_delegate(self.did_receive_push)
+        self._push_center = push_center
+
+    def stop_listening(self):
+        """ Stops applying the events received by the push center """
+
+        if self._push_center is not None:
+            self._push_center.remove_delegate(self.did_receive_push)
+            self._push_center = None
+
+    def did_receive_push(self, data):
+        """ Applies the events of a push notification
+
+            Args:
+                data (dict): the push notification, with its `events`
+        """
+
+        if not data:
+            return
+
+        for event in data.get('events', list()):
+            model = NURESTModelController.get_first_model_with_rest_name(event.get('entityType'))
+
+            if model is None:
+                continue
+
+            entities = event.get('entities', list())
+
+            if event.get('type') == 'DELETE':
+                self.remove(model, [entity.get('ID') for entity in entities])
+                continue
+
+            nurest_objects = list()
+
+            for entity in entities:
+                nurest_object = model()
+                nurest_object.from_dict(entity)
+                nurest_objects.append(nurest_object)
+
+            self.add(nurest_objects)
+
+    # Private methods
+
+    def _get_rest_name(self, model):
+        """ Get the ReST name of a model class or ReST name """
+
+        return model if isinstance(model, basestring) else model.rest_name
+
+    def _get_model(self, model):
+        """ Get the model class of a model class or ReST name """
+
+        if not isinstance(model, basestring):
+            return model
+
+        model_class = NURESTModelController.get_first_model_with_rest_name(model)
+
+        if model_class is None:
+            raise InternalConsitencyError('No model is registered with ReST name %s' % model)
+
+        return model_class
+
+    def _has_table(self, rest_name):
+        """ Check if the table of a ReST name exists """
+
+        if rest_name in self._columns:
+            return True
+
+        cursor = self._connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (rest_name,))
+        return cursor.fetchone() is not None
+
+    def _get_columns(self, rest_name, model):
+        """ Get the columns of a ReST name table, and creates the table if needed
+
+            Returns:
+                (list): the local names and attribute types of the columns
+        """
+
+        columns = self._columns.get(rest_name)
+
+        if columns is not None:
+            return columns
+
+        attributes = sorted(model().get_attributes(), key=lambda attribute: (not attribute.is_identifier, attribute.local_name))
+        columns = [(attribute.local_name, attribute.attribute_type) for attribute in attributes]
+        definitions = list()
+
+        for attribute in attributes:
+            definition = '"%s" %s' % (attribute.local_name, COLUMN_TYPES.get(attribute.attribute_type, 'TEXT'))
+
+            if attribute.is_identifier:
+                definition += ' PRIMARY KEY'
+
+            definitions.append(definition)
+
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS "%s" (%s)' % (rest_name, ', '.join(definitions)))
+
+            for (name, attribute_type) in columns:
+                if name in INDEXED_COLUMNS:
+                    self._connection.execute('CREATE INDEX IF NOT EXISTS "%s_%s" ON "%s" ("%s")' % (rest_name, name, rest_name, name))
+
+        self._columns[rest_name] = columns
+        return columns
+
+    def _get_clauses(self, where=None, order_by=None, limit=None):
+        """ Get the WHERE, ORDER BY and LIMIT clauses of a statement """
+
+        clauses = ''
+
+        if where:
+            clauses += ' WHERE %s' % where
+
+        if order_by:
+            clauses += ' ORDER BY %s' % order_by
+
+        if limit is not None:
+            clauses += ' LIMIT %d' % limit
+
+        return clauses
+
+    def _encode(self, value, attribute_type):
+        """ Encodes an attribute value for its column """
+
+        if value is None or (attribute_type not in JSON_TYPES and not isinstance(value, (list, dict))):
+            return value
+
+        return json.dumps(value, default=lambda nurest_object: nurest_object.to_dict())
+
+    def _decode(self, value, attribute_type):
+        """ Decodes a column value for its attribute """
+
+        if value is None:
+            return None
+
+        if attribute_type in JSON_TYPES:
+            return json.loads(value)
+
+        if attribute_type is bool:
+            return bool(value)
+
+        return value
@@ -26,6 +26,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+import json
 import weakref
 import datetime
 from uuid import uuid4
@@ -33,9 +34,14 @@ from copy import deepcopy
 
 from bambou import bambou_logger
 from .exceptions import BambouHTTPError, InternalConsitencyError
-from .nurest_connection import NURESTConnection, HTTP_METHOD_DELETE, HTTP_METHOD_PUT, HTTP_METHOD_POST, HTTP_METHOD_GET
+from .nurest_connection import NURESTConnection, HTTP_METHOD_DELETE, HTTP_METHOD_PUT, HTTP_METHOD_POST, HTTP_METHOD_GET, HTTP_CODE_NOT_MODIFIED
 from .nurest_request import NURESTRequest
+from .nurest_response import NURESTResponse
+from .nurest_profiler import profiled
 from .nurest_session import _NURESTSessionCurrentContext
+from .nurest_tracer import NURESTTracer
+from .nurest_tree_fetcher import NURESTTreeFetcher
+from .nurest_validator import NURESTValidator
 from .utils import NURemoteAttribute
 from .config import BambouConfig
 
@@ -68,6 +74,49 @@ class NUMetaRESTObject(type):  # pragma: no cover
         return cls.__resource_name__
 
 
+_IMMUTABLE_TYPES = (type(None), bool, int, long, float, str, unicode)
+
+
+def _snapshot_container(value):
+    """ Returns a copy of a list or dict attribute value that can be compared later
+
+        A shallow copy is enough when the container only holds immutable values.
+    """
+
+    items = value.itervalues() if isinstance(value, dict) else value
+
+    for item in items:
+        if not isinstance(item, _IMMUTABLE_TYPES):
+            return deepcopy(value)
+
+    return value.copy() if isinstance(value, dict) else list(value)
+
+
+class _NURESTSerializationCache(object):
+    """ Remembers the result of to_dict until an exposed attribute changes
+
+        Attribute writes are caught by NURESTObject.__setattr__. Lists and
+        dicts can also be changed in place, so they are compared against
+        a snapshot before the cache is used.
+    """
+
+    def __init__(self, dictionary, containers):
+        """ Initializes the cache """
+
+        self.dictionary = dictionary
+        self.containers = containers
+        self.json = None
+
+    def is_valid(self):
+        """ Returns True if no list or dict attribute has been changed in place """
+
+        for value, snapshot in self.containers:
+            if value != snapshot:
+                return False
+
+        return True
+
+
 class NURESTObject(object):
     """ Determines an object as a NURESTObject one
         Provides basic saving and fetching utilities
@@ -97,9 +146,12 @@ class NURESTObject(object):
         self._parent_id = None
         self._parent_type = None
         self._parent = None
-        self._is_dirty = False
+        self._dirty_attributes = set()
+        self._serialization_cache = None
+        self._resource_url_cache = None
 
         self._attribute_errors = dict()
+        self._validation_failures = list()
         self._attributes = dict()
 
         self.expose_attribute(local_name='id', remote_name=BambouConfig.get_id_remote_name(), attribute_type=BambouConfig.get_id_type(), is_identifier=True)
@@ -126,6 +178,8 @@ class NURESTObject(object):
             default_value = BambouConfig.get_default_attribute_value(self.__class__, name, remote_attribute.attribute_type)
             setattr(self, name, default_value)
 
+        self._reset_dirty_attributes()
+
         if len(data) > 0:
             self.from_dict(data)
 
@@ -133,6 +187,19 @@ class NURESTObject(object):
             if hasattr(self, key):
                 setattr(self, key, value)
 
+    def __setattr__(self, name, value):
+        """ Sets an attribute and marks it as dirty if it is exposed """
+
+        attributes = self.__dict__.get('_attributes')
+
+        if attributes and name in attributes:
+            self.__dict__['_serialization_cache'] = None
+
+            if not attributes[name].is_identifier:
+                self._dirty_attributes.add(name)
+
+        super(NURESTObject, self).__setattr__(name, value)
+
     # Properties
 
     @property
@@ -225,6 +292,28 @@ class NURESTObject(object):
 
         self._parent = weakref.ref(parent) if parent else None
 
+    @property
+    def is_dirty(self):
+        """ Check if some exposed attributes have been changed since
+            the last successful fetch or save
+
+            Returns:
+                Returns True if the object has pending changes
+        """
+
+        return len(self._dirty_attributes) > 0
+
+    @property
+    def dirty_attributes(self):
+        """ Get the local names of the attributes changed since
+            the last successful fetch or save
+
+            Returns:
+                list: list of local attribute names
+        """
+
+        return list(self._dirty_attributes)
+
     @property
     def rest_name(self):
         """ Returns the current ReST name of the object.
@@ -304,21 +393,56 @@ class NURESTObject(object):
 
     # URL and resource management
 
+    def _get_resource_url_cache(self):
+        """ Get the resource urls cached for the current base url and id
+
+            Returns:
+                Returns a tuple (base_url, id, resource_url, child_resource_urls)
+        """
+
+        base_url = self.__class__.rest_base_url()
+        id = self.id
+        cache = self._resource_url_cache
+
+        if cache is None or cache[0] != base_url or cache[1] != id:
+            name = self.__class__.resource_name
+
+            if id is not None:
+                url = "%s/%s/%s" % (base_url, name, id)
+            else:
+                url = "%s/%s" % (base_url, name)
+
+            cache = (base_url, id, url, dict())
+            self._resource_url_cache = cache
+
+        return cache
+
     def get_resource_url(self):
         """ Get resource complete url """
 
-        name = self.__class__.resource_name
-        url = self.__class__.rest_base_url()
+        return self._get_resource_url_cache()[2]
+
+    def get_resource_url_for_child_type(self, nurest_object_type):
+        """ Get the resource url for the nurest_object type
+
+            Child urls are only cached when they derive from the default
+            resource url, as subclasses can override `get_resource_url`.
+        """
 
-        if self.id is not None:
-            return "%s/%s/%s" % (url, name, self.id)
+        resource_url = self.get_resource_url()
+        resource_name = nurest_object_type.resource_name
+        cache = self._get_resource_url_cache()
 
-        return "%s/%s" % (url, name)
+        if cache[2] != resource_url:
+            return "%s/%s" % (resource_url, resource_name)
 
-    def get_resource_url_for_child_type(self, nurest_object_type):
-        """ Get the resource url for the nurest_object type """
+        url = cache[3].get(resource_name)
 
-        return "%s/%s" % (self.get_resource_url(), nurest_object_type.resource_name)
+        if url is None:
+            url = "%s/%s" % (cache[2], resource_name)
+            cache[3][resource_name] = url
+
+        return url
 
     def __str__(self):
         """ Prints a NURESTObject """
@@ -328,7 +452,9 @@ class NURESTObject(object):
     def validate(self):
         """ Validate the current object attributes.
 
-            Check all attributes and store errors
+            Check all attributes and store errors. The validation rules are
+            compiled once per class, and error messages are only built when
+            errors are read.
 
             Returns:
                 Returns True if all attibutes of the object
@@ -336,57 +462,46 @@ class NURESTObject(object):
                 store error in errors dict.
 
         """
-        self._attribute_errors = dict()  # Reset validation errors
-
-        for local_name, attribute in self._attributes.iteritems():
+        self._validation_failures = NURESTValidator.get_validator(self).get_failures(self)
+        self._attribute_errors = None
 
-            value = getattr(self, local_name, None)
+        return self.is_valid()
 
-            if attribute.is_required and (value is None or value == ""):
-                self._attribute_errors[local_name] = {'title': 'Invalid input',
-                                                      'description': 'This value is mandatory.',
-                                                      'remote_name': attribute.remote_name}
-                continue
+    @classmethod
+    def validate_many(cls, objects):
+        """ Validate several objects
 
-            if value is None:
-                continue  # without error
+            Args:
+                objects (list): the NURESTObject objects to validate
 
-            if type(value) != attribute.attribute_type:
-                if attribute.attribute_type != str or type(value) != unicode:
-                    self._attribute_errors[local_name] = {'title': 'Wrong type',
-                                                          'description': 'Attribute %s type should be %s but is %s' % (attribute.remote_name, attribute.attribute_type, type(value)),
-                                                          'remote_name': attribute.remote_name}
-                    continue
+            Returns:
+                list: a (object, errors) tuple for each invalid object
 
-            if attribute.min_length and len(value) < attribute.min_length:
-                self._attribute_errors[local_name] = {'title': 'Invalid lenght',
-                                                      'description': 'Attribute %s minimum size should be %s but is %s' % (attribute.remote_name, attribute.min_length, len(value)),
-                                                      'remote_name': attribute.remote_name}
-                continue
+            Example:
+                >>> for (enterprise, errors) in NUEnterprise.validate_many(enterprises):
+                ...     print "%s: %s" % (enterprise.name, errors.keys())
+        """
 
-            if attribute.max_length and len(value) > attribute.max_length:
-                self._attribute_errors[local_name] = {'title': 'Invalid lenght',
-                                                      'description': 'Attribute %s maximum size should be %s but is %s' % (attribute.remote_name, attribute.max_length, len(value)),
-                                                      'remote_name': attribute.remote_name}
-                continue
+        invalid_objects = list()
 
-            if attribute.choices and value not in attribute.choices:
-                self._attribute_errors[local_name] = {'title': 'Invalid input',
-                                                      'description': 'Invalid input',
-                                                      'remote_name': attribute.remote_name}
-                continue
+        for nurest_object in objects:
+            if not nurest_object.validate():
+                invalid_objects.append((nurest_object, nurest_object.errors))
 
-        return self.is_valid()
+        return invalid_objects
 
     def is_valid(self):
         """
         """
-        return len(self.errors) == 0
+        return len(self._validation_failures) == 0
 
     @property
     def errors(self):
         """
         """
+        if self._attribute_errors is None:
+            self._attribute_errors = NURESTValidator.format_errors(self._validation_failures)
+
         return self._attribute_errors
 
     def expose_attribute(self, local_name, attribute_type, remote_name=None, display_name=None, is_required=False, is_readonly=False, max_length=None, min_length=None, is_identifier=False, choices=None, is_unique=False, is_email=False, is_login=False, is_editable=True, is_password=False, can_order=False, can_search=False):
@@ -419,6 +534,7 @@ class NURESTObject(object):
         attribute.can_search = can_search
 
         self._attributes[local_name] = attribute
+        self._serialization_cache = None
 
     def get_attributes(self):
         """ Get all attributes information
@@ -607,20 +723,69 @@ class NURESTObject(object):
 
     # Compression / Decompression
 
-    def copy(self):
+    def copy(self, deep=False):
         """ Returns a copy of the current object
 
+            Attribute values are copied directly, without running the
+            constructor again. The copy gets a new local id, no parent,
+            new empty children fetchers, and all its attributes are dirty.
+
+            Args:
+                deep (bool): also copy list, dict and NURESTObject attribute values. Default is False
+
             Returns:
                 A copy of the given object
 
             Example::
-                >>> print entity.to_dict()
+                >>> print entity.copy()
                 <Entity object at 0x10b9d4910>
 
         """
 
-        return self.__class__(data=self.to_dict())
+        clone = self.__class__.__new__(self.__class__)
+        state = clone.__dict__
+        state.update(self.__dict__)
 
+        state['_local_id'] = str(uuid4())
+        state['_parent'] = None
+        state['_attributes'] = dict(self._attributes)
+        state['_dirty_attributes'] = set()
+        state['_serialization_cache'] = None
+        state['_resource_url_cache'] = None
+        state['_attribute_errors'] = dict()
+        state['_validation_failures'] = list()
+        state['_fetchers_registry'] = dict()
+
+        fetchers = dict((id(fetcher), fetcher) for fetcher in self._fetchers_registry.itervalues())
+
+        for name, value in self.__dict__.iteritems():
+            if id(value) in fetchers:
+                state[name] = value.__class__.fetcher_with_object(parent_object=clone, relationship=value.relationship)
+                del fetchers[id(value)]
+
+        for fetcher in fetchers.itervalues():
+            fetcher.__class__.fetcher_with_object(parent_object=clone, relationship=fetcher.relationship)
+
+        if deep:
+            for local_name in self._attributes:
+                value = getattr(self, local_name)
+
+                if isinstance(value, NURESTObject):
+                    value = value.copy(deep=True)
+                elif isinstance(value, list):
+                    value = [item.copy(deep=True) if isinstance(item, NURESTObject) else deepcopy(item) for item in value]
+                elif isinstance(value, dict):
+                    value = deepcopy(value)
+                else:
+                    continue
+
+                setattr(clone, local_name, value)
+
+        state['_dirty_attributes'] = set(name for name, attribute in self._attributes.iteritems() if not attribute.is_identifier)
+
+        return clone
+
+    @profiled('to_dict')
     def to_dict(self):
         """ Converts the current object into a Dictionary using all exposed ReST attributes.
 
@@ -630,9 +795,21 @@ class NURESTObject(object):
             Example::
                 >>> print entity.to_dict()
                 {"name": "my entity", "description": "Hello World", "ID": "xxxx-xxx-xxxx-xxx", ...}
+
+            Note:
+                The result is cached until an exposed attribute is changed,
+                so each call returns a new copy of the cached dictionary.
+                Objects holding other NURESTObject instances are never cached.
         """
 
+        cache = self._serialization_cache
+
+        if cache is not None and cache.is_valid():
+            return dict(cache.dictionary)
+
         dictionary = dict()
+        containers = list()
+        is_cacheable = True
 
         for local_name, attribute in self._attributes.iteritems():
             remote_name = attribute.remote_name
@@ -646,6 +823,7 @@ class NURESTObject(object):
 
                 if isinstance(value, NURESTObject):
                     value = value.to_dict()
+                    is_cacheable = False
 
                 if isinstance(value, list) and len(value) > 0 and isinstance(value[0], NURESTObject):
                     tmp = list()
@@ -653,13 +831,74 @@ class NURESTObject(object):
                         tmp.append(obj.to_dict())
 
                     value = tmp
+                    is_cacheable = False
+
+                elif isinstance(value, (list, dict)):
+                    containers.append((value, _snapshot_container(value)))
 
                 dictionary[remote_name] = value
             else:
                 pass  # pragma: no cover
 
+        self._serialization_cache = _NURESTSerializationCache(dict(dictionary), containers) if is_cacheable else None
+
         return dictionary
 
+    def to_json(self):
+        """ Converts the current object into a JSON string using all exposed ReST attributes.
+
+            The encoded string is cached along with to_dict, so sending the
+            same unchanged object several times only encodes it once.
+
+            Returns:
+                str: the JSON representation of the exposed ReST attributes.
+        """
+
+        dictionary = self.to_dict()
+        cache = self._serialization_cache
+
+        if cache is None:
+            return json.dumps(dictionary)
+
+        if cache.json is None:
+            cache.json = json.dumps(dictionary)
+
+        return cache.json
+
+    def get_changes(self):
+        """ Converts the attributes changed since the last successful fetch or save into a Dictionary.
+
+            Returns:
+                dict: the dictionary containing the changed ReST attributes and their values.
+
+            Example::
+                >>> entity.name = "my entity"
+                >>> print entity.get_changes()
+                {"name": "my entity"}
+        """
+
+        dictionary = self.to_dict()
+        changes = dict()
+
+        for local_name in self._dirty_attributes:
+            remote_name = self._attributes[local_name].remote_name
+            changes[remote_name] = dictionary[remote_name]
+
+        return changes
+
+    def _reset_dirty_attributes(self, local_names=None):
+        """ Marks the given attributes, or all of them, as clean
+
+            Args:
+                local_names: the list of local names to mark as clean. Default is all attributes
+        """
+
+        if local_names is None:
+            self._dirty_attributes.clear()
+        else:
+            self._dirty_attributes.difference_update(local_names)
+
+    @profiled('from_dict')
     def from_dict(self, dictionary):
         """ Sets all the exposed ReST attribues from the given dictionary
 
@@ -703,6 +942,11 @@ class NURESTObject(object):
     def save(self, response_choice=None, async=False, callback=None):
         """ Update object and call given callback in case of async call
 
+            Only the attributes changed since the last successful fetch or save
+            are sent to the server. If nothing has changed, no request is sent:
+            the returned connection, also given to the callback, is already
+            complete with a 304 Not Modified response.
+
             Args:
                 async (bool): Boolean to make an asynchronous call. Default is False
                 callback (function): Callback method that will be triggered in case of asynchronous call
@@ -711,7 +955,25 @@ class NURESTObject(object):
                 >>> entity.name = "My Super Object"
                 >>> entity.save() # will save the new name in the server
         """
-        return self._manage_child_object(nurest_object=self, method=HTTP_METHOD_PUT, async=async, callback=callback, response_choice=response_choice)
+
+        if not self.is_dirty:
+            bambou_logger.debug("%s has no pending changes. Skipping save." % self)
+
+            request = NURESTRequest(method=HTTP_METHOD_PUT, url=self.get_resource_url())
+            connection = NURESTConnection(request=request, async=async, callbacks={'remote': callback} if callback else dict())
+            connection.response = NURESTResponse(status_code=HTTP_CODE_NOT_MODIFIED, headers=dict(), reason='Not Modified')
+
+            if async:
+                if callback:
+                    callback(self, connection)
+                return connection.transaction_id
+
+            return (self, connection)
+
+        data = self.get_changes()
+        data[BambouConfig.get_id_remote_name()] = self.id
+
+        return self._manage_child_object(nurest_object=self, method=HTTP_METHOD_PUT, async=async, callback=callback, handler=self._did_save, response_choice=response_choice, data=data)
 
     def fetch(self, async=False, callback=None):
         """ Fetch all information about the current object
@@ -734,16 +996,45 @@ class NURESTObject(object):
             raise InternalConsitencyError("Cannot fetch an object that does not have an ID")
 
         request = NURESTRequest(method=HTTP_METHOD_GET, url=self.get_resource_url())
+        span = NURESTTracer.get_default_tracer().start_span('retrieve', rest_name=self.rest_name, id=self.id)
 
         if async:
-            return self.send_request(request=request, async=async, local_callback=self._did_retrieve, remote_callback=callback)
+            return self.send_request(request=request, async=async, local_callback=self._did_retrieve, remote_callback=callback, span=span)
         else:
-            connection = self.send_request(request=request)
-            return self._did_retrieve(connection)
+            with span:
+                connection = self.send_request(request=request, span=span)
+                return self._did_retrieve(connection)
+
+    def fetch_tree(self, child_types=None, depth=None, concurrency=4, page_size=None, progress_callback=None):
+        """ Fetch the children of the object, level by level, with concurrent requests
+
+            All pages of each selected children fetcher are fetched, and stored
+            in the fetcher, as a complete fetch would do.
+
+            Args:
+                child_types (list): ReST names or classes of the children to fetch. Default fetches all children
+                depth (int): maximum number of levels to fetch. Default fetches until no children are found
+                concurrency (int): maximum number of concurrent requests
+                page_size (int): number of objects per page. Default is NURESTFetcher.PAGE_SIZE
+                progress_callback (function): called as progress_callback(level, fetched, total) each time a fetcher is complete
+
+            Returns:
+                list: statistics of each level, as dictionaries with `level`, `parents`, `requests`, `objects` and `seconds` keys
+
+            Example:
+                >>> enterprise.fetch_tree(child_types=['domain', 'zone', 'subnet', 'vport'], concurrency=8)
+                [{'level': 1, 'parents': 1, 'requests': 1, 'objects': 12, 'seconds': 0.02}, ...]
+                >>> print enterprise.domains[0].zones
+                [<NUZone at 1>, <NUZone at 2>]
+        """
+
+        tree_fetcher = NURESTTreeFetcher(child_types=child_types, depth=depth, concurrency=concurrency, page_size=page_size, progress_callback=progress_callback)
+
+        return tree_fetcher.fetch(self)
 
     # REST HTTP Calls
 
-    def send_request(self, request, async=False, local_callback=None, remote_callback=None, user_info=None):
+    def send_request(self, request, async=False, local_callback=None, remote_callback=None, user_info=None, span=None):
         """ Sends a request, calls the local callback, then the remote callback in case of async call
 
             Args:
@@ -751,6 +1042,7 @@ class NURESTObject(object):
                 local_callback: local method that will be triggered in case of async call
                 remote_callback: remote moethd that will be triggered in case of async call
                 user_info: contains additionnal information to carry during the request
+                span: the NURESTSpan of the operation, ended after the callbacks in case of async call
 
             Returns:
                 Returns the object and connection (object, connection)
@@ -766,10 +1058,11 @@ class NURESTObject(object):
 
         connection = NURESTConnection(request=request, async=async, callback=self._did_receive_response, callbacks=callbacks)
         connection.user_info = user_info
+        connection.span = span
 
         return connection.start()
 
-    def _manage_child_object(self, nurest_object, method=HTTP_METHOD_GET, async=False, callback=None, handler=None, response_choice=None, commit=False):
+    def _manage_child_object(self, nurest_object, method=HTTP_METHOD_GET, async=False, callback=None, handler=None, response_choice=None, commit=False, data=None):
         """ Low level child management. Send given HTTP method with given nurest_object to given ressource of current object
 
             Args:
@@ -778,6 +1071,7 @@ class NURESTObject(object):
                 callback: the callback to call at the end
                 handler: a custom handler to call when complete, before calling the callback
                 commit: True to auto commit changes in the current object
+                data: the dictionary to send. Default is nurest_object.to_dict()
 
             Returns:
                 Returns the object and connection (object, connection)
@@ -792,18 +1086,27 @@ class NURESTObject(object):
         if response_choice is not None:
             url += '?responseChoice=%s' % response_choice
 
-        request = NURESTRequest(method=method, url=url, data=nurest_object.to_dict())
-        user_info = {'nurest_object': nurest_object, 'commit': commit}
+        encoded_data = None
+
+        if data is None:
+            data = nurest_object.to_dict()
+            encoded_data = nurest_object.to_json()
+
+        request = NURESTRequest(method=method, url=url, data=data)
+        request.encoded_data = encoded_data
+        user_info = {'nurest_object': nurest_object, 'commit': commit, 'dirty_attributes': list(nurest_object._dirty_attributes)}
+        span = NURESTTracer.get_default_tracer().start_span(method.lower(), rest_name=nurest_object.rest_name, id=nurest_object.id, parent_rest_name=self.rest_name)
 
         if not handler:
             handler = self._did_perform_standard_operation
 
         if async:
 
-            return self.send_request(request=request, async=async, local_callback=handler, remote_callback=callback, user_info=user_info)
+            return self.send_request(request=request, async=async, local_callback=handler, remote_callback=callback, user_info=user_info, span=span)
         else:
-            connection = self.send_request(request=request, user_info=user_info)
-            return handler(connection)
+            with span:
+                connection = self.send_request(request=request, user_info=user_info, span=span)
+                return handler(connection)
 
     # REST Operation handlers
 
@@ -828,11 +1131,20 @@ class NURESTObject(object):
 
         try:
             self.from_dict(response.data[0])
+            self._reset_dirty_attributes()
         except:
             pass
 
         return self._did_perform_standard_operation(connection)
 
+    def _did_save(self, connection):
+        """ Callback called after saving the object """
+
+        if not connection.has_timeouted and connection.response.status_code < 300:
+            self._reset_dirty_attributes(connection.user_info['dirty_attributes'])
+
+        return self._did_perform_standard_operation(connection)
+
     def _did_perform_standard_operation(self, connection):
         """ Performs standard opertions """
 
@@ -937,6 +1249,7 @@ class NURESTObject(object):
         response = connection.response
         try:
             connection.user_info['nurest_object'].from_dict(response.data[0])
+            connection.user_info['nurest_object']._reset_dirty_attributes()
         except Exception:
             pass
 
@@ -965,18 +1278,22 @@ class NURESTObject(object):
         url = self.get_resource_url_for_child_type(nurest_object_type)
         request = NURESTRequest(method=HTTP_METHOD_PUT, url=url, data=ids)
         user_info = {'nurest_objects': objects, 'commit': commit}
+        span = NURESTTracer.get_default_tracer().start_span('assign', rest_name=nurest_object_type.rest_name, parent_rest_name=self.rest_name, count=len(ids))
 
         if async:
             return self.send_request(request=request,
                                      async=async,
                                      local_callback=self._did_perform_standard_operation,
                                      remote_callback=callback,
-                                     user_info=user_info)
+                                     user_info=user_info,
+                                     span=span)
         else:
-            connection = self.send_request(request=request,
-                                           user_info=user_info)
+            with span:
+                connection = self.send_request(request=request,
+                                               user_info=user_info,
+                                               span=span)
 
-            return self._did_perform_standard_operation(connection)
+                return self._did_perform_standard_operation(connection)
 
     # Comparison
 
@@ -992,9 +1309,6 @@ class NURESTObject(object):
     def equals(self, rest_object):
         """ Compare with another object """
 
-        if self._is_dirty:
-            return False
-
         if rest_object is None:
             return False
 
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from .exceptions import InternalConsitencyError
+
+
+RECORD_LENGTH = struct.Struct('>I')
+
+
+class NURESTObjectStore(object):
+    """ File backed store of serialized objects
+
+        Objects are appended to a file as length-prefixed JSON records and
+        read back through a memory map. Only the indexes are kept in memory:
+        the offset of each record, and the ids of the children of each
+        parent, by parent id and children ReST name.
+
+        Records are identified by parent id, children ReST name and object id,
+        so the same object can be stored as the child of several parents.
+
+        A store can back the contents of any number of fetchers, so that
+        large inventories do not have to be kept in memory. Replaced and
+        removed objects leave unused records in the file until compact is called.
+
+        Example:
+            >>> store = NURESTObjectStore()
+            >>> enterprise.domains.store = store
+            >>> enterprise.domains.fetch()
+            >>> print len(store)
+            12000
+    """
+
+    def __init__(self, path=None):
+        """ Initializes a store
+
+            Args:
+                path (string): the path of the store file. Its content is replaced. Default is a temporary file removed on close
+        """
+
+        self._is_temporary = path is None
+
+        if path is None:
+            (descriptor, path) = tempfile.mkstemp(prefix='bambou-', suffix='.store')
+            os.close(descriptor)
+
+        self.path = path
+
+        self._lock = threading.RLock()
+        self._file = open(path, 'w+b')
+        self._map = None
+        self._size = 0
+        self._offsets = dict()
+        self._references = dict()
+        self._children = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, id):
+        return id in self._references
+
+    # Properties
+
+    @property
+    def size(self):
+        """ Get the size of the store file in bytes """
+
+        return self._size
+
+    # Methods
+
+    def put(self, nurest_object, parent_id=None, rest_name=None):
+        """ Stores an object, replacing the stored child of the parent with the same id
+
+            Args:
+                nurest_object (bambou.NURESTObject): the object to store. It must have an id
+                parent_id (string): the id of the parent whose children include the object
+                rest_name (string): the ReST name of the children. Default is the object ReST name
+        """
+
+        self.put_dict(nurest_object.id, nurest_object.to_dict(), parent_id=parent_id, rest_name=rest_name or nurest_object.rest_name)
+
+    def put_dict(self, id, dictionary, parent_id=None, rest_name=None):
+        """ Stores the dictionary of an object, replacing the stored child of the parent with the same id
+
+            Args:
+                id (string): the id of the object
+                dictionary (dict): the remote attributes of the object
+                parent_id (string): the id of the parent whose children include the object
+                rest_name (string): the ReST name of the children
+        """
+
+        if id is None:
+            raise InternalConsitencyError('Cannot store an object that does not have an ID')
+
+        payload = json.dumps(dictionary, separators=(',', ':'))
+        record_key = (parent_id, rest_name, id)
+
+        with self._lock:
+            self._file.seek(self._size)
+            self._file.write(RECORD_LENGTH.pack(len(payload)) + payload)
+
+            if record_key not in self._offsets:
+                self._references[id] = self._references.get(id, 0) + 1
+                self._children.setdefault((parent_id, rest_name), list()).append(id)
+
+            self._offsets[record_key] = (self._size + RECORD_LENGTH.size, len(payload))
+            self._size += RECORD_LENGTH.size + len(payload)
+
+    def get_dict(self, id, parent_id=None, rest_name=None):
+        """ Get the stored dictionary of a child
+
+            Args:
+                id (string): the id of the object
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (dict): the remote attributes of the object, or None if it is not stored
+        """
+
+        with self._lock:
+            location = self._offsets.get((parent_id, rest_name, id))
+
+            if location is None:
+                return None
+
+            (offset, length) = location
+
+            if self._map is None or len(self._map) < offset + length:
+                self._remap()
+
+            return json.loads(self._map[offset:offset + length])
+
+    def get_ids(self, parent_id=None, rest_name=None):
+        """ Get a copy of the ids of the children of a parent
+
+            Use get_id or get_index to access children by position without copying.
+
+            Args:
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (list): the ids, in the order they were first stored
+        """
+
+        with self._lock:
+            return list(self._children.get((parent_id, rest_name), list()))
+
+    def get_id(self, index, parent_id=None, rest_name=None):
+        """ Get the id of the child of a parent at a given position
+
+            Args:
+                index (int or slice): the position of the child, or a slice
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (string): the id of the child, or a list of ids for a slice
+
+            Raises:
+                IndexError: if there is no child at this position
+        """
+
+        with self._lock:
+            return self._children.get((parent_id, rest_name), list())[index]
+
+    def get_index(self, id, parent_id=None, rest_name=None):
+        """ Get the position of a child of a parent
+
+            Args:
+                id (string): the id of the child
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (int): the position of the child, or None if it is not a child of the parent
+        """
+
+        with self._lock:
+            if (parent_id, rest_name, id) not in self._offsets:
+                return None
+
+            return self._children[(parent_id, rest_name)].index(id)
+
+    def count(self, parent_id=None, rest_name=None):
+        """ Get the number of children of a parent
+
+            Args:
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (int): the number of children
+        """
+
+        return len(self._children.get((parent_id, rest_name), list()))
+
+    def has_child(self, id, parent_id=None, rest_name=None):
+        """ Check if an object is stored as a child of a parent
+
+            Returns:
+                (bool): True if the object is one of the children
+        """
+
+        return (parent_id, rest_name, id) in self._offsets
+
+    def remove(self, id, parent_id=None, rest_name=None):
+        """ Removes a child of a parent
+
+            Args:
+                id (string): the id of the object
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (bool): True if the object was stored
+        """
+
+        return self.remove_children([id], parent_id=parent_id, rest_name=rest_name) == 1
+
+    def remove_children(self, ids, parent_id=None, rest_name=None):
+        """ Removes some children of a parent, updating its index once
+
+            Args:
+                ids (list): the ids of the children to remove
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+
+            Returns:
+                (int): the number of children removed
+        """
+
+        with self._lock:
+            removed_ids = set()
+
+            for id in ids:
+                if self._offsets.pop((parent_id, rest_name, id), None) is None:
+                    continue
+
+                removed_ids.add(id)
+                self._references[id] -= 1
+
+                if not self._references[id]:
+                    del self._references[id]
+
+            if removed_ids:
+                key = (parent_id, rest_name)
+                children = [id for id in self._children[key] if id not in removed_ids]
+
+                if children:
+                    self._children[key] = children
+                else:
+                    del self._children[key]
+
+            return len(removed_ids)
+
+    def set_children(self, nurest_objects, parent_id=None, rest_name=None):
+        """ Replaces the children of a parent, in the given order
+
+            Args:
+                nurest_objects (list): the new children
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+        """
+
+        with self._lock:
+            ids = set(nurest_object.id for nurest_object in nurest_objects)
+            self.remove_children([id for id in self._children.get((parent_id, rest_name), list()) if id not in ids], parent_id, rest_name)
+
+            for nurest_object in nurest_objects:
+                self.put(nurest_object, parent_id=parent_id, rest_name=rest_name)
+
+            if nurest_objects:
+                ordered_ids = list()
+                seen_ids = set()
+
+                for nurest_object in nurest_objects:
+                    if nurest_object.id not in seen_ids:
+                        seen_ids.add(nurest_object.id)
+                        ordered_ids.append(nurest_object.id)
+
+                self._children[(parent_id, rest_name)] = ordered_ids
+
+    def clear_children(self, parent_id=None, rest_name=None):
+        """ Removes the children of a parent
+
+            Args:
+                parent_id (string): the id of the parent
+                rest_name (string): the ReST name of the children
+        """
+
+        with self._lock:
+            self.remove_children(self.get_ids(parent_id, rest_name), parent_id, rest_name)
+
+    def compact(self):
+        """ Rewrites the file without the records of replaced and removed objects """
+
+        with self._lock:
+            dictionaries = [(id, self.get_dict(id, *key), key) for key, ids in self._children.items() for id in ids]
+
+            self._close_map()
+            self._file.seek(0)
+            self._file.truncate()
+            self._size = 0
+            self._offsets = dict()
+            self._references = dict()
+            self._children = dict()
+
+            for (id, dictionary, (parent_id, rest_name)) in dictionaries:
+                self.put_dict(id, dictionary, parent_id=parent_id, rest_name=rest_name)
+
+    def close(self):
+        """ Closes the store, and removes its file if it is temporary """
+
+        with self._lock:
+            self._close_map()
+            self._file.close()
+
+            if self._is_temporary and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _remap(self):
+        """ Maps the whole file after new records have been written """
+
+        self._close_map()
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+
+    def _close_map(self):
+        """ Closes the current memory map """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import atexit
+import cProfile
+import json
+import os
+import random
+import signal
+import threading
+
+from contextlib import contextmanager
+from functools import wraps
+from time import time
+
+from bambou import bambou_logger
+from bambou.config import BambouConfig
+from bambou.exceptions import InternalConsitencyError
+
+
+class NURESTProfiler(object):
+    """ Aggregates the time spent in bambou hot paths
+
+        When profiling is enabled, the time spent in each phase is recorded:
+
+            * `from_dict` and `to_dict` of :class:`bambou.NURESTObject`
+            * `did_fetch`, the processing of a fetch response by :class:`bambou.NURESTFetcher`
+            * `http`, the time spent sending requests and receiving responses
+            * `json_decode`, the decoding of response bodies
+
+        Phases are inclusive: the `did_fetch` time includes the `from_dict` calls it makes.
+
+        Profiling can be enabled with :func:`bambou.BambouConfig.set_profiling_enabled`,
+        with the `BAMBOU_PROFILING` environment variable, for a `with` block using `profile`,
+        or at runtime with a signal using `install_signal_handler`. Only a fraction of the
+        calls can be timed by setting a sample rate.
+
+        Example:
+            >>> with NURESTProfiler.profile(cprofile_path='/tmp/bambou.prof') as profiler:
+            ...     enterprise.domains.fetch()
+            >>> print profiler.get_stats()['from_dict']
+            {'count': 50, 'total': 0.0074, 'min': 0.0001, 'max': 0.0004, 'mean': 0.00015}
+
+        Environment variables:
+            BAMBOU_PROFILING: set to 1 to enable profiling
+            BAMBOU_PROFILING_SAMPLE_RATE: fraction of the calls to time. Default is 1
+            BAMBOU_PROFILING_STATS: file where the timing aggregates are written as JSON when the process exits,
+            once the default profiler has been used. See `dump_stats_at_exit`
+    """
+
+    __default_profiler = None
+
+    def __init__(self):
+        """ Initializes a profiler without recorded timing """
+
+        self._lock = threading.Lock()
+        self._phases = dict()
+
+    # Class Methods
+
+    @classmethod
+    def get_default_profiler(cls):
+        """ Get the profiler used by bambou
+
+            Returns:
+                (bambou.NURESTProfiler): the default profiler
+        """
+
+        if NURESTProfiler.__default_profiler is None:
+            NURESTProfiler.__default_profiler = cls()
+
+            if os.environ.get('BAMBOU_PROFILING_STATS'):
+                cls.dump_stats_at_exit(os.environ['BAMBOU_PROFILING_STATS'])
+
+        return NURESTProfiler.__default_profiler
+
+    @classmethod
+    def dump_stats_at_exit(cls, path):
+        """ Writes the timing aggregates of the default profiler when the process exits
+
+            Nothing is written if profiling is disabled when the process exits.
+
+            Args:
+                path (string): file where the timing aggregates are written as JSON
+        """
+
+        def dump_stats():
+            if BambouConfig._profiling_enabled:
+                cls.get_default_profiler().dump_stats(path)
+
+        atexit.register(dump_stats)
+
+    @classmethod
+    def is_enabled(cls):
+        """ Check if profiling is enabled
+
+            Returns:
+                Returns True if profiling is enabled in BambouConfig
+        """
+
+        return BambouConfig._profiling_enabled
+
+    @classmethod
+    def should_sample(cls):
+        """ Check if the current call should be timed
+
+            Returns:
+                Returns True if profiling is enabled and the call is part of the sample
+        """
+
+        if not BambouConfig._profiling_enabled:
+            return False
+
+        sample_rate = BambouConfig._profiling_sample_rate
+
+        return sample_rate >= 1 or random.random() < sample_rate
+
+    @classmethod
+    @contextmanager
+    def profile(cls, cprofile_path=None, sample_rate=None):
+        """ Enables profiling inside a `with` block
+
+            Args:
+                cprofile_path (string): file where cProfile stats of the current thread are written. Default does not run cProfile
+                sample_rate (float): fraction of the calls to time. Default keeps the configured sample rate
+
+            Returns:
+                (bambou.NURESTProfiler): the default profiler
+        """
+
+        was_enabled = BambouConfig._profiling_enabled
+        previous_sample_rate = BambouConfig._profiling_sample_rate
+        BambouConfig.set_profiling_enabled(True, sample_rate=sample_rate)
+
+        profile = cProfile.Profile() if cprofile_path else None
+
+        if profile:
+            profile.enable()
+
+        try:
+            yield cls.get_default_profiler()
+        finally:
+            if profile:
+                profile.disable()
+                profile.dump_stats(cprofile_path)
+
+            BambouConfig.set_profiling_enabled(was_enabled, sample_rate=previous_sample_rate)
+
+    @classmethod
+    def install_signal_handler(cls, signum=None, stats_path=None, cprofile_path=None):
+        """ Toggles profiling when the process receives a signal
+
+            The first signal enables profiling, the next one disables it and writes the
+            timing aggregates to `stats_path`, and the cProfile stats of the main thread
+            to `cprofile_path`. This allows to profile a running worker with `kill -USR2 <pid>`.
+
+            Args:
+                signum (int): the signal number. Default is SIGUSR2
+                stats_path (string): file where the timing aggregates are written as JSON
+                cprofile_path (string): file where the cProfile stats are written. Default does not run cProfile
+
+            Raises:
+                InternalConsitencyError: if no signal is given and the platform has no SIGUSR2
+        """
+
+        if signum is None:
+            signum = getattr(signal, 'SIGUSR2', None)
+
+            if signum is None:
+                raise InternalConsitencyError('SIGUSR2 is not available on this platform. Please give the signal to use')
+
+        state = {'profile': None}
+
+        def handler(signum, frame):
+            profiler = cls.get_default_profiler()
+
+            if not BambouConfig._profiling_enabled:
+                bambou_logger.info('Profiling enabled by signal %s' % signum)
+                profiler.reset()
+                BambouConfig.set_profiling_enabled(True)
+
+                if cprofile_path:
+                    state['profile'] = cProfile.Profile()
+                    state['profile'].enable()
+                return
+
+            BambouConfig.set_profiling_enabled(False)
+
+            if state['profile']:
+                state['profile'].disable()
+                state['profile'].dump_stats(cprofile_path)
+                state['profile'] = None
+
+            if stats_path:
+                profiler.dump_stats(stats_path)
+
+            bambou_logger.info('Profiling disabled by signal %s:\n%s' % (signum, json.dumps(profiler.get_stats(), indent=4, sort_keys=True)))
+
+        signal.signal(signum, handler)
+
+    # Methods
+
+    def record(self, phase, elapsed):
+        """ Records the time spent in a phase
+
+            Args:
+                phase (string): the name of the phase
+                elapsed (float): the number of seconds spent
+        """
+
+        with self._lock:
+            stats = self._phases.get(phase)
+
+            if stats is None:
+                self._phases[phase] = [1, elapsed, elapsed, elapsed]
+                return
+
+            stats[0] += 1
+            stats[1] += elapsed
+
+            if elapsed < stats[2]:
+                stats[2] = elapsed
+
+            if elapsed > stats[3]:
+                stats[3] = elapsed
+
+    def reset(self):
+        """ Removes all recorded timing """
+
+        with self._lock:
+            self._phases = dict()
+
+    def get_stats(self):
+        """ Get the timing aggregates
+
+            Returns:
+                dict: count, total, min, max and mean number of seconds by phase
+        """
+
+        with self._lock:
+            return dict((phase, {'count': count, 'total': total, 'min': minimum, 'max': maximum, 'mean': total / count})
+                        for phase, (count, total, minimum, maximum) in self._phases.items())
+
+    def dump_stats(self, path):
+        """ Writes the timing aggregates as JSON
+
+            Args:
+                path (string): the path of the file
+        """
+
+        with open(path, 'w') as f:
+            json.dump(self.get_stats(), f, indent=4, sort_keys=True)
+
+
+def profiled(phase):
+    """ Decorator recording the time spent in a method when profiling is enabled
+
+        Args:
+            phase (string): the name of the phase
+    """
+
+    def decorator(method):
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if not BambouConfig._profiling_enabled or not NURESTProfiler.should_sample():
+                return method(*args, **kwargs)
+
+            started_at = time()
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                NURESTProfiler.get_default_profiler().record(phase, time() - started_at)
+
+        return wrapper
+
+    return decorator
@@ -32,6 +32,7 @@ import threading
 from time import time
 
 from .nurest_connection import NURESTConnection
+from .nurest_metrics import NURESTMetrics
 from .nurest_request import NURESTRequest
 
 from bambou import pushcenter_logger
@@ -165,6 +166,10 @@ class NURESTPushCenter(object):
 
         events = self._last_events
         self._last_events = list()
+
+        if NURESTMetrics.is_enabled():
+            NURESTMetrics.get_default_metrics().set_gauge('bambou_push_events_queued', 0)
+
         return events
 
     # Private methods
@@ -187,6 +192,11 @@ class NURESTPushCenter(object):
         else:
             data = response.data
 
+            if NURESTMetrics.is_enabled() and data:
+                metrics = NURESTMetrics.get_default_metrics()
+                metrics.increment('bambou_push_received_total')
+                metrics.increment('bambou_push_events_total', len(data.get('events', [])))
+
             if len(self._delegate_methods) > 0:
                 for m in self._delegate_methods:
                     try:
@@ -201,6 +211,9 @@ class NURESTPushCenter(object):
                 pushcenter_logger.info("[NURESTPushCenter] Received Push #%s (total=%s, latest=%s)\n%s" % (self.nb_push_received, self.nb_events_received, len(events), json.dumps(events, indent=4)))
                 self._last_events.extend(events)
 
+                if NURESTMetrics.is_enabled():
+                    NURESTMetrics.get_default_metrics().set_gauge('bambou_push_events_queued', len(self._last_events))
+
         if self._is_running:
             uuid = None
             if data and 'uuid' in data:
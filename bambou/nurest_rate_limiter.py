@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+
+from time import time, sleep
+
+from .exceptions import BambouRateLimitError
+
+
+class _NURESTTokenBucket(object):
+    """ Token bucket refilled at a constant rate """
+
+    def __init__(self, rate, burst=None):
+        """ Initializes a full bucket
+
+            Args:
+                rate (float): number of tokens added per second
+                burst (float): maximum number of tokens. Default is max(1, rate)
+        """
+
+        self.rate = float(rate)
+        self.capacity = float(burst) if burst else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.last_refill = time()
+
+    def get_wait_time(self, now):
+        """ Refill the bucket and get the number of seconds to wait for a token """
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+        if self.tokens >= 1:
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """ Take a token, possibly in advance """
+
+        self.tokens -= 1
+
+
+class NURESTRateLimiter(object):
+    """ Client side rate limiter used by :class:`bambou.NURESTConnection`
+
+        Each request takes a token from the global bucket, and from the bucket
+        of its resource name when an override has been given for it. When no token is
+        available, the request either waits for it, or raises a
+        :class:`bambou.exceptions.BambouRateLimitError`.
+
+        Example:
+            >>> limiter = NURESTRateLimiter(rate=50, resource_rates={'vports': 5})
+            >>> session = NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443", rate_limiter=limiter)
+            >>> print limiter.get_stats()
+            {'requests': 120, 'waits': 10, 'wait_time': 1.8, 'rejected': 0, 'resources': {'vports': {...}}}
+    """
+
+    def __init__(self, rate, burst=None, resource_rates=None, blocking=True, max_wait=None):
+        """ Initializes a rate limiter
+
+            Args:
+                rate (float): maximum number of requests per second. None for no global limit
+                burst (float): maximum number of requests sent at once. Default is max(1, rate)
+                resource_rates (dict): maximum number of requests per second by resource name. Values can also be a tuple (rate, burst)
+                blocking (bool): wait for a token when True, raise a BambouRateLimitError when False
+                max_wait (float): maximum number of seconds to wait for a token before raising a BambouRateLimitError
+        """
+
+        self.blocking = blocking
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._bucket = _NURESTTokenBucket(rate, burst) if rate else None
+        self._resource_buckets = dict()
+        self._stats = dict()
+
+        self._create_stats(None)
+
+        if resource_rates:
+            for resource_name, resource_rate in resource_rates.items():
+                self.set_resource_rate(resource_name, resource_rate)
+
+    # Methods
+
+    def set_resource_rate(self, resource_name, rate, burst=None):
+        """ Sets the rate of a given resource
+
+            Args:
+                resource_name (string): the resource name, like `domains`
+                rate (float): maximum number of requests per second, or a tuple (rate, burst)
+                burst (float): maximum number of requests sent at once
+        """
+
+        if isinstance(rate, tuple):
+            rate, burst = rate
+
+        with self._lock:
+            self._resource_buckets[resource_name] = _NURESTTokenBucket(rate, burst)
+            self._create_stats(resource_name)
+
+    def acquire(self, resource_name=None):
+        """ Wait for the right to send a request
+
+            Args:
+                resource_name (string): the resource name of the request
+
+            Returns:
+                Returns the number of seconds spent waiting
+
+            Raises:
+                BambouRateLimitError: if the limiter is not blocking, or if the wait would exceed max_wait
+        """
+
+        with self._lock:
+            now = time()
+            buckets = [bucket for bucket in (self._bucket, self._resource_buckets.get(resource_name)) if bucket]
+            wait_time = max([bucket.get_wait_time(now) for bucket in buckets] + [0])
+
+            stats = self._stats[resource_name] if resource_name in self._resource_buckets else None
+
+            if wait_time > 0 and (not self.blocking or (self.max_wait is not None and wait_time > self.max_wait)):
+                self._record(stats, 'rejected', 1)
+                raise BambouRateLimitError(resource_name=resource_name, retry_after=wait_time)
+
+            for bucket in buckets:
+                bucket.consume()
+
+            self._record(stats, 'requests', 1)
+
+            if wait_time > 0:
+                self._record(stats, 'waits', 1)
+                self._record(stats, 'wait_time', wait_time)
+
+        if wait_time > 0:
+            sleep(wait_time)
+
+        return wait_time
+
+    def get_stats(self):
+        """ Get the rate limiter counters
+
+            Returns:
+                dict: the number of requests, waits, total wait time and rejected requests,
+                globally and by resource name under `resources`
+        """
+
+        with self._lock:
+            stats = dict(self._stats[None])
+            stats['resources'] = dict((name, dict(value)) for name, value in self._stats.items() if name is not None)
+            return stats
+
+    # Private methods
+
+    def _create_stats(self, resource_name):
+        """ Creates the counters of a resource """
+
+        if resource_name not in self._stats:
+            self._stats[resource_name] = {'requests': 0, 'waits': 0, 'wait_time': 0.0, 'rejected': 0}
+
+    def _record(self, stats, name, value):
+        """ Increments a global counter and the one of the resource """
+
+        self._stats[None][name] += value
+
+        if stats is not None:
+            stats[name] += value
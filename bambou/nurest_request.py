@@ -35,10 +35,9 @@ class NURESTRequest(object):
         self._method = method
         self._url = url
         self._data = data
+        self._encoded_data = None
         self._params = params
-        self._headers = dict()
-
-        self.set_header('Content-Type', 'application/json')
+        self._headers = {'Content-Type': 'application/json'}
 
         if filter:
             self.set_header('X-Nuage-Filter', filter)
@@ -91,6 +90,23 @@ class NURESTRequest(object):
         """ Set data """
 
         self._data = data
+        self._encoded_data = None
+
+    @property
+    def encoded_data(self):
+        """ Get the JSON encoded data
+
+            When None, the connection encodes data itself. Setting data
+            resets it.
+        """
+
+        return self._encoded_data
+
+    @encoded_data.setter
+    def encoded_data(self, encoded_data):
+        """ Set the JSON encoded data """
+
+        self._encoded_data = encoded_data
 
     @property
     def params(self):
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+
+
+class _NURESTInFlightCall(object):
+    """ A call shared by identical concurrent requests """
+
+    def __init__(self):
+        """ Initializes an in flight call """
+
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class NURESTRequestCoalescer(object):
+    """ Single flight coalescing of identical concurrent requests
+
+        When several threads send the same GET or HEAD request at the same time,
+        only the first one actually goes to the server. The other ones wait for
+        it and get the same decoded :class:`bambou.NURESTResponse`.
+
+        Requests are identical when they have the same method, url, query parameters
+        and headers. Headers include the filter, ordering, paging and authentication
+        information, so requests made by different users are never coalesced.
+
+        Example:
+            >>> session = NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443", request_coalescer=NURESTRequestCoalescer())
+            >>> print session.request_coalescer.get_stats()
+            {'requests': 120, 'coalesced': 80, 'in_flight': 0}
+    """
+
+    def __init__(self):
+        """ Initializes a request coalescer """
+
+        self._lock = threading.Lock()
+        self._calls = dict()
+
+        self.requests = 0
+        self.coalesced = 0
+
+    # Methods
+
+    @classmethod
+    def get_key(cls, request):
+        """ Get the key identifying identical requests
+
+            Args:
+                request (bambou.NURESTRequest): the request
+
+            Returns:
+                Returns a string identifying the request
+        """
+
+        params = request.params
+
+        if isinstance(params, dict):
+            params = sorted(params.items())
+
+        return '%s %s %r %r' % (request.method, request.url, params, sorted(request.headers.items()))
+
+    def perform(self, key, function):
+        """ Call the function, unless an identical call is in flight
+
+            Args:
+                key (string): the key identifying the call
+                function (function): the function performing the call
+
+            Returns:
+                Returns the result of the function, shared with all the identical calls
+        """
+
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            is_leader = call is None
+
+            if is_leader:
+                call = _NURESTInFlightCall()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.event.wait()
+
+            if call.exception is not None:
+                raise call.exception
+
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as exc:
+            call.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.event.set()
+
+        return call.result
+
+    def get_stats(self):
+        """ Get the coalescer counters
+
+            Returns:
+                dict: the number of requests, the number of coalesced requests, and the number of calls in flight
+        """
+
+        with self._lock:
+            return {'requests': self.requests,
+                    'coalesced': self.coalesced,
+                    'in_flight': len(self._calls)}
@@ -25,6 +25,8 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from copy import deepcopy
+
 
 class NURESTResponse(object):
     """ Response that will be received via the connection """
@@ -63,3 +65,17 @@ class NURESTResponse(object):
         """ Get headers """
 
         return self._headers
+
+    # Methods
+
+    def copy(self):
+        """ Get a copy of the response that can be modified without changing this one
+
+            Returns:
+                (bambou.NURESTResponse): the copy
+        """
+
+        response = NURESTResponse(status_code=self._status_code, headers=self._headers.copy() if self._headers is not None else None, data=deepcopy(self._data), reason=self._reason)
+        response.errors = deepcopy(self.errors)
+
+        return response
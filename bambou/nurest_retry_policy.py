@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import random
+import threading
+
+from email.utils import parsedate_tz, mktime_tz
+from time import time
+
+import requests
+
+from .nurest_connection import HTTP_METHOD_GET, HTTP_METHOD_HEAD, HTTP_METHOD_PUT, HTTP_METHOD_DELETE
+
+
+class NURESTRetryPolicy(object):
+    """ Retry policy used by :class:`bambou.NURESTConnection`
+
+        A retry policy decides whether a failed request should be sent again,
+        and how long to wait before doing so. Each :class:`bambou.NURESTSession`
+        holds its own retry policy, so the retry budget is shared by all the
+        requests of a session.
+
+        Example:
+            >>> policy = NURESTRetryPolicy(max_attempts=5, backoff_factor=0.2)
+            >>> session = NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443", retry_policy=policy)
+            >>> session.start()
+            >>> print policy.get_stats()
+            {'attempts': 1, 'retries': 0, 'give_ups': 0, 'budget_exhausted': 0}
+    """
+
+    DEFAULT_RETRY_STATUS_CODES = (502, 503, 504)
+    DEFAULT_IDEMPOTENT_METHODS = (HTTP_METHOD_GET, HTTP_METHOD_HEAD, HTTP_METHOD_PUT, HTTP_METHOD_DELETE)
+
+    def __init__(self, max_attempts=3, backoff_factor=0.5, max_backoff=30, jitter=True, retry_status_codes=DEFAULT_RETRY_STATUS_CODES,
+                 idempotent_methods=DEFAULT_IDEMPOTENT_METHODS, retry_on_timeout=True, respect_retry_after=True,
+                 budget_ratio=0.2, budget_min_retries=10, budget_window=10):
+        """ Initializes a retry policy
+
+            Args:
+                max_attempts (int): maximum number of attempts for a request, including the first one
+                backoff_factor (float): base number of seconds of the exponential backoff
+                max_backoff (float): maximum number of seconds to wait between two attempts
+                jitter (bool): randomize the backoff between 0 and its computed value
+                retry_status_codes (list): status codes that can be retried
+                idempotent_methods (list): HTTP methods that can be retried
+                retry_on_timeout (bool): retry requests that have timeout or could not connect
+                respect_retry_after (bool): wait for the delay given in the Retry-After header, if any. Requests asking for more than max_backoff are not retried
+                budget_ratio (float): maximum ratio of retries per request sent during a budget window
+                budget_min_retries (int): number of retries always allowed during a budget window
+                budget_window (float): duration in seconds of a budget window
+        """
+
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_status_codes = retry_status_codes
+        self.idempotent_methods = idempotent_methods
+        self.retry_on_timeout = retry_on_timeout
+        self.respect_retry_after = respect_retry_after
+        self.budget_ratio = budget_ratio
+        self.budget_min_retries = budget_min_retries
+        self.budget_window = budget_window
+
+        self._lock = threading.Lock()
+        self._window_start = time()
+        self._window_requests = 0
+        self._window_retries = 0
+
+        self.attempts = 0
+        self.retries = 0
+        self.give_ups = 0
+        self.budget_exhausted = 0
+
+    # Methods
+
+    def get_stats(self):
+        """ Get the retry counters
+
+            Give ups only count retryable failures that are not retried again,
+            because of the maximum number of attempts, the budget or a Retry-After
+            longer than max_backoff. Failures that cannot be retried are excluded.
+
+            Returns:
+                dict: the number of attempts, retries, give ups and retries refused by the budget
+        """
+
+        return {'attempts': self.attempts,
+                'retries': self.retries,
+                'give_ups': self.give_ups,
+                'budget_exhausted': self.budget_exhausted}
+
+    def reset_stats(self):
+        """ Reset the retry counters """
+
+        with self._lock:
+            self.attempts = 0
+            self.retries = 0
+            self.give_ups = 0
+            self.budget_exhausted = 0
+
+    def did_attempt(self, attempt):
+        """ Records an attempt
+
+            Args:
+                attempt (int): the number of the attempt, starting at 1
+        """
+
+        with self._lock:
+            self._roll_budget_window()
+            self.attempts += 1
+
+            if attempt == 1:
+                self._window_requests += 1
+
+    def is_retryable(self, method, response=None, exception=None):
+        """ Check if a failure could be fixed by sending the request again
+
+            Args:
+                method (string): the HTTP method of the request
+                response: the received response, if any
+                exception: the raised exception, if any
+
+            Returns:
+                Returns True if the request can be retried
+        """
+
+        if method not in self.idempotent_methods:
+            return False
+
+        if exception is not None:
+            return self.retry_on_timeout and isinstance(exception, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+        return response is not None and response.status_code in self.retry_status_codes
+
+    def get_retry_delay(self, method, attempt, response=None, exception=None):
+        """ Get the number of seconds to wait before sending the request again
+
+            Args:
+                method (string): the HTTP method of the request
+                attempt (int): the number of the attempt that failed, starting at 1
+                response: the received response, if any
+                exception: the raised exception, if any
+
+            Returns:
+                Returns the delay in seconds, or None if the request should not be retried
+        """
+
+        if not self.is_retryable(method=method, response=response, exception=exception):
+            return None
+
+        retry_after = None
+
+        if self.respect_retry_after and response is not None:
+            retry_after = self._parse_retry_after(response.headers.get('Retry-After') if response.headers else None)
+
+        with self._lock:
+            if attempt >= self.max_attempts or (retry_after is not None and retry_after > self.max_backoff):
+                self.give_ups += 1
+                return None
+
+            self._roll_budget_window()
+
+            if self._window_retries >= max(self.budget_min_retries, self.budget_ratio * self._window_requests):
+                self.budget_exhausted += 1
+                self.give_ups += 1
+                return None
+
+            self._window_retries += 1
+            self.retries += 1
+
+        delay = self.get_backoff(attempt)
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+    def get_backoff(self, attempt):
+        """ Compute the exponential backoff after a given attempt
+
+            Args:
+                attempt (int): the number of the attempt that failed, starting at 1
+
+            Returns:
+                Returns the delay in seconds
+        """
+
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+
+        if self.jitter:
+            return random.uniform(0, backoff)
+
+        return backoff
+
+    # Private methods
+
+    def _roll_budget_window(self):
+        """ Start a new budget window if the current one is over """
+
+        now = time()
+
+        if now - self._window_start >= self.budget_window:
+            self._window_start = now
+            self._window_requests = 0
+            self._window_retries = 0
+
+    def _parse_retry_after(self, value):
+        """ Parse a Retry-After header value
+
+            Args:
+                value (string): number of seconds or HTTP date
+
+            Returns:
+                Returns the number of seconds to wait or None
+        """
+
+        if not value:
+            return None
+
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+
+        date = parsedate_tz(value)
+
+        if date is None:
+            return None
+
+        return max(0, mktime_tz(date) - time())
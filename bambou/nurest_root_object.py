@@ -152,6 +152,9 @@ class NURESTRootObject(NURESTObject):
 
         self._new_password = None
 
+        if not connection.has_timeouted and connection.response.status_code < 300:
+            self._reset_dirty_attributes()
+
         controller = _NURESTSessionCurrentContext.session.login_controller
         controller.password = None
         controller.api_key = self.api_key
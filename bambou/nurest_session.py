@@ -3,13 +3,19 @@
 
 # Copyright 2014 Alcatel-Lucent USA Inc.
 
+from .nurest_api_key_renewer import NURESTAPIKeyRenewer
 from .nurest_login_controller import NURESTLoginController
+from .nurest_metrics import NURESTMetrics
 from .nurest_push_center import NURESTPushCenter
+from .nurest_snapshot import NURESTSnapshot
+from .exceptions import InternalConsitencyError
 from bambou.contextual import context
 from bambou import bambou_logger
 from contextlib import contextmanager
+from copy import copy
 from opcode import opname
 import inspect
+import threading
 
 
 class NURESTSession(object):
@@ -38,7 +44,7 @@ class NURESTSession(object):
             [<NUEntity at 2>]
     """
 
-    def __init__(self, username, password, enterprise, api_url, api_prefix, version, certificate=None):
+    def __init__(self, username, password, enterprise, api_url, api_prefix, version, certificate=None, retry_policy=None, circuit_breaker=None, rate_limiter=None, request_coalescer=None, count_cache=None):
         """ Initializes a new sesssion
 
             Args:
@@ -47,6 +53,11 @@ class NURESTSession(object):
                 enterprise (string): the enterprise
                 api_url (string): the url to the api
                 version (string): the version of the api to target
+                retry_policy (bambou.NURESTRetryPolicy): the policy used to retry failed requests. Default is no retry
+                circuit_breaker (bambou.NURESTCircuitBreaker): the circuit breaker protecting each endpoint. Default is none
+                rate_limiter (bambou.NURESTRateLimiter): the rate limiter applied to all requests. Default is none
+                request_coalescer (bambou.NURESTRequestCoalescer): the coalescer sharing identical concurrent GET requests. Default is none
+                count_cache (bambou.NURESTCountCache): the cache of the counts of objects matching a filter. Default is none
 
             Example:
                 >>> mainsession =  NUMySession(username="csproot", password="csproot", enterprise="csp", api_url="https://vsd:8443")
@@ -64,6 +75,19 @@ class NURESTSession(object):
         self._push_center = NURESTPushCenter()
         self._push_center.url = self._login_controller.url
 
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
+        self._rate_limiter = rate_limiter
+        self._request_coalescer = request_coalescer
+        self._count_cache = count_cache
+        self._middlewares = tuple()
+        self._mirror = None
+
+        self._reauthentication_lock = threading.RLock()
+        self._is_reauthenticating = False
+        self._reauthentication_count = 0
+        self._api_key_renewer = None
+
     # Class Methods
 
     @classmethod
@@ -89,6 +113,156 @@ class NURESTSession(object):
         """
         return self._push_center
 
+    @property
+    def retry_policy(self):
+        """
+            Returns the :class:`bambou.NURESTRetryPolicy` of the current session
+
+            Returns:
+                (bambou.NURESTRetryPolicy): the retry policy, or None if failed requests are not retried
+        """
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, retry_policy):
+        """
+            Sets the :class:`bambou.NURESTRetryPolicy` of the current session
+
+            Args:
+                retry_policy (bambou.NURESTRetryPolicy): the retry policy, or None to disable retries
+        """
+        self._retry_policy = retry_policy
+
+    @property
+    def circuit_breaker(self):
+        """
+            Returns the :class:`bambou.NURESTCircuitBreaker` of the current session
+
+            Returns:
+                (bambou.NURESTCircuitBreaker): the circuit breaker, or None if endpoints are not protected
+        """
+        return self._circuit_breaker
+
+    @circuit_breaker.setter
+    def circuit_breaker(self, circuit_breaker):
+        """
+            Sets the :class:`bambou.NURESTCircuitBreaker` of the current session
+
+            Args:
+                circuit_breaker (bambou.NURESTCircuitBreaker): the circuit breaker, or None to disable it
+        """
+        self._circuit_breaker = circuit_breaker
+
+    @property
+    def rate_limiter(self):
+        """
+            Returns the :class:`bambou.NURESTRateLimiter` of the current session
+
+            Returns:
+                (bambou.NURESTRateLimiter): the rate limiter, or None if requests are not limited
+        """
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter):
+        """
+            Sets the :class:`bambou.NURESTRateLimiter` of the current session
+
+            Args:
+                rate_limiter (bambou.NURESTRateLimiter): the rate limiter, or None to disable it
+        """
+        self._rate_limiter = rate_limiter
+
+    @property
+    def request_coalescer(self):
+        """
+            Returns the :class:`bambou.NURESTRequestCoalescer` of the current session
+
+            Returns:
+                (bambou.NURESTRequestCoalescer): the request coalescer, or None if requests are not coalesced
+        """
+        return self._request_coalescer
+
+    @request_coalescer.setter
+    def request_coalescer(self, request_coalescer):
+        """
+            Sets the :class:`bambou.NURESTRequestCoalescer` of the current session
+
+            Args:
+                request_coalescer (bambou.NURESTRequestCoalescer): the request coalescer, or None to disable it
+        """
+        self._request_coalescer = request_coalescer
+
+    @property
+    def count_cache(self):
+        """
+            Returns the :class:`bambou.NURESTCountCache` of the current session
+
+            Returns:
+                (bambou.NURESTCountCache): the count cache, or None if counts are not cached
+        """
+        return self._count_cache
+
+    @count_cache.setter
+    def count_cache(self, count_cache):
+        """
+            Sets the :class:`bambou.NURESTCountCache` of the current session
+
+            Args:
+                count_cache (bambou.NURESTCountCache): the count cache, or None to disable it
+        """
+        self._count_cache = count_cache
+
+    @property
+    def mirror(self):
+        """
+            Returns the :class:`bambou.NURESTMirror` of the current session
+
+            Returns:
+                (bambou.NURESTMirror): the mirror receiving the committed fetches, or None
+        """
+        return self._mirror
+
+    @mirror.setter
+    def mirror(self, mirror):
+        """
+            Sets the :class:`bambou.NURESTMirror` of the current session
+
+            Args:
+                mirror (bambou.NURESTMirror): the mirror receiving the committed fetches, or None to disable it
+        """
+        self._mirror = mirror
+
+    @property
+    def middlewares(self):
+        """
+            Returns the :class:`bambou.NURESTMiddleware` registered on the current session
+
+            Returns:
+                (tuple): the middlewares, in the order they are called before sending requests
+        """
+        return self._middlewares
+
+    @property
+    def reauthentication_count(self):
+        """
+            Returns the number of times the session logged in again after its API key expired
+
+            Returns:
+                (int): the number of re-authentications
+        """
+        return self._reauthentication_count
+
+    @property
+    def api_key_renewer(self):
+        """
+            Returns the :class:`bambou.NURESTAPIKeyRenewer` of the current session
+
+            Returns:
+                (bambou.NURESTAPIKeyRenewer): the API key renewer, or None if the key is only renewed after a 419 response
+        """
+        return self._api_key_renewer
+
     @property
     def login_controller(self):
         """
@@ -181,6 +355,182 @@ class NURESTSession(object):
         self._root_object = None
         self.login_controller.api_key = None
 
+    def reauthenticate(self, expired_api_key):
+        """
+            Logs in again after the server reported that the API key has expired.
+
+            Only one thread logs in at a time. Threads that got the same expired
+            key wait for it and then reuse the new key instead of logging in again.
+            The current key is kept until the new one replaces it in one step, so
+            concurrent requests never send an empty key.
+
+            Args:
+                expired_api_key (string): the API key that was sent with the rejected request
+
+            Returns:
+                (bool): True if this call logged in again, False if the key had already been renewed
+        """
+        with self._reauthentication_lock:
+            if self._is_reauthenticating:
+                return False
+
+            api_key = self.login_controller.api_key
+
+            if api_key is not None and api_key != expired_api_key:
+                bambou_logger.debug("[NURESTSession] API key already renewed by another request")
+                return False
+
+            self._is_reauthenticating = True
+
+            try:
+                self._renew_root_object()
+            finally:
+                self._is_reauthenticating = False
+
+            self._reauthentication_count += 1
+
+            if NURESTMetrics.is_enabled():
+                NURESTMetrics.get_default_metrics().increment('bambou_reauthentications_total')
+
+            return True
+
+    def renew_api_key(self):
+        """
+            Logs in again without dropping the current API key.
+
+            Other requests keep using the current key while a new root object is
+            fetched with the password. The new key and its expiry are then copied
+            at once to the login controller and to the current root object, which
+            keeps its fetched children.
+
+            Returns:
+                (bambou.NURESTRootObject): the root object of the session
+        """
+        with self._reauthentication_lock:
+            return self._renew_root_object()
+
+    def _renew_root_object(self):
+        """
+            Fetches a new root object with the password in a copy of the session,
+            then copies the new API key in one step. The caller must hold the
+            reauthentication lock.
+
+            Returns:
+                (bambou.NURESTRootObject): the root object of the session
+        """
+        renewal_session = copy(self)
+        renewal_session._login_controller = copy(self._login_controller)
+        renewal_session._login_controller.api_key = None
+        renewal_session._request_coalescer = None
+        renewal_session._is_reauthenticating = True
+
+        renewed_root_object = self.create_root_object()
+
+        with _NURESTSessionCurrentContext.new() as context:
+            context.session = renewal_session
+            renewed_root_object.fetch()
+
+        root_object = self._root_object
+
+        if root_object is None:
+            self._root_object = root_object = renewed_root_object
+        else:
+            local_names = [local_name for local_name in ('api_key', 'api_key_expiry') if root_object.get_attribute_infos(local_name) is not None]
+
+            for local_name in local_names:
+                setattr(root_object, local_name, getattr(renewed_root_object, local_name))
+
+            root_object._reset_dirty_attributes(local_names)
+
+        self.login_controller.api_key = renewed_root_object.api_key
+
+        return root_object
+
+    def start_api_key_renewal(self, lead_time=300, jitter=30, retry_interval=10, api_key_lifetime=None):
+        """
+            Starts renewing the API key in the background before it expires
+
+            Args:
+                lead_time (float): number of seconds before the expiry to renew the key
+                jitter (float): maximum number of random seconds to renew the key earlier
+                retry_interval (float): number of seconds to wait after a failed renewal
+                api_key_lifetime (float): number of seconds a key is valid when the root object has no expiry. Default is None
+
+            Returns:
+                (bambou.NURESTAPIKeyRenewer): the started renewer
+        """
+        self.stop_api_key_renewal()
+
+        self._api_key_renewer = NURESTAPIKeyRenewer(session=self, lead_time=lead_time, jitter=jitter, retry_interval=retry_interval, api_key_lifetime=api_key_lifetime)
+        self._api_key_renewer.start()
+
+        return self._api_key_renewer
+
+    def stop_api_key_renewal(self):
+        """
+            Stops renewing the API key in the background
+        """
+        if self._api_key_renewer is None:
+            return
+
+        self._api_key_renewer.stop()
+        self._api_key_renewer = None
+
+    def snapshot(self, path, compress=False):
+        """
+            Saves all the objects fetched under the root object to a file
+
+            Args:
+                path (string): the path of the snapshot file
+                compress (bool): gzip the file. Default is False
+
+            Returns:
+                (int): the number of saved objects
+        """
+        if self._root_object is None:
+            raise InternalConsitencyError('Start the session before saving a snapshot')
+
+        return NURESTSnapshot(path, compress=compress).save(self._root_object)
+
+    def restore(self, path):
+        """
+            Restores the objects saved by snapshot under the root object
+
+            Objects are only built when their fetcher is first used, so a warm
+            start does not have to fetch or decode the whole tree.
+
+            Args:
+                path (string): the path of the snapshot file
+
+            Returns:
+                (int): the number of restored objects
+        """
+        if self._root_object is None:
+            raise InternalConsitencyError('Start the session before restoring a snapshot')
+
+        return NURESTSnapshot(path).restore(self._root_object)
+
+    def add_middleware(self, middleware):
+        """
+            Registers a middleware that will be called around each request
+
+            Args:
+                middleware (bambou.NURESTMiddleware): the middleware to add at the end of the chain
+        """
+        if middleware in self._middlewares:
+            return
+
+        self._middlewares = self._middlewares + (middleware,)
+
+    def remove_middleware(self, middleware):
+        """
+            Unregisters a middleware
+
+            Args:
+                middleware (bambou.NURESTMiddleware): the middleware to remove
+        """
+        self._middlewares = tuple(registered for registered in self._middlewares if registered is not middleware)
+
     def impersonate(self, username, enterprise):
         """
             Change the session to impersonate a user within an enterprise
@@ -191,6 +541,9 @@ class NURESTSession(object):
         """
         self._login_controller.impersonate(username, enterprise)
 
+        if self._count_cache:
+            self._count_cache.clear()
+
     def stop_impersonate(self):
         """
             Stop impersonating a user
@@ -198,6 +551,9 @@ class NURESTSession(object):
         """
         self._login_controller.stop_impersonate()
 
+        if self._count_cache:
+            self._count_cache.clear()
+
     def equals(self, session):
         """ Verify if the current session equals the given parameter
 
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import gzip
+import json
+import os
+import struct
+import tempfile
+import threading
+
+from collections import defaultdict
+from time import time
+
+from .exceptions import InternalConsitencyError
+
+
+RECORD_HEADER = struct.Struct('>BIIHI')
+
+RECORD_METADATA = 0
+RECORD_OBJECT = 1
+RECORD_FETCHER = 2
+
+SNAPSHOT_MAGIC = 'BAMBOUSNAP'
+SNAPSHOT_FORMAT = 1
+GZIP_MAGIC = '\x1f\x8b'
+
+
+class NURESTSnapshot(object):
+    """ Saves the fetched objects of a tree to a file, and restores them
+
+        The file is a sequence of length-prefixed records, optionally gzip
+        compressed. Each object record holds the id of its parent record,
+        the ReST name of the fetcher it belongs to, and its JSON attributes.
+        Fetcher records hold the pagination state of the fetcher.
+
+        Restoring only reads the records. Objects of a fetcher are decoded
+        the first time the fetcher is used, so a large tree can be restored
+        in a few seconds and only the parts that are used are built.
+
+        Example:
+            >>> NURESTSnapshot('/var/cache/vsd.snap', compress=True).save(session.root_object)
+            12034
+            >>> NURESTSnapshot('/var/cache/vsd.snap').restore(session.root_object)
+            12034
+    """
+
+    def __init__(self, path, compress=False):
+        """ Initializes a snapshot
+
+            Args:
+                path (string): the path of the snapshot file
+                compress (bool): gzip the file when saving. Compressed files are detected when restoring
+        """
+
+        self.path = path
+        self.compress = compress
+
+        self._lock = threading.RLock()
+        self._objects = None
+        self._fetchers = None
+        self._metadata = None
+
+    def __deepcopy__(self, memo):
+        """ Snapshots are shared by the fetchers they fill, even when fetchers are copied """
+
+        return self
+
+    # Properties
+
+    @property
+    def metadata(self):
+        """ Get the metadata of the restored snapshot
+
+            Returns:
+                (dict): the root ReST name, the creation time and the number of objects, or None
+        """
+
+        return self._metadata
+
+    # Methods
+
+    def save(self, root_object):
+        """ Saves the objects of all fetchers under the root object
+
+            The snapshot is written to a temporary file next to the target, which
+            then replaces it, so a failed save keeps the previous snapshot.
+
+            Args:
+                root_object (bambou.NURESTObject): the root of the tree. Its own attributes are not saved
+
+            Returns:
+                (int): the number of saved objects
+        """
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        (descriptor, temporary_path) = tempfile.mkstemp(prefix='.%s.' % os.path.basename(self.path), suffix='.tmp', dir=directory)
+        os.close(descriptor)
+
+        try:
+            count = self._write(root_object, temporary_path)
+
+            # os.rename does not replace existing files on Windows
+            if os.name == 'nt' and os.path.exists(self.path):
+                os.remove(self.path)
+
+            os.rename(temporary_path, self.path)
+        except:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        return count
+
+    def _write(self, root_object, path):
+        """ Writes the snapshot of the tree under the root object to a file
+
+            Returns:
+                (int): the number of saved objects
+        """
+
+        stream = gzip.open(path, 'wb') if self.compress else open(path, 'wb')
+
+        try:
+            records = list()
+            parents = [(0, root_object)]
+            next_id = 1
+
+            while parents:
+                (parent_id, parent) = parents.pop(0)
+
+                for rest_name, fetcher in parent._fetchers_registry.iteritems():
+                    state = {'count': fetcher.current_total_count, 'page': fetcher.current_page, 'order_by': fetcher.current_ordered_by, 'watermark': fetcher.current_watermark}
+                    records.append(self._encode_record(RECORD_FETCHER, parent_id, 0, rest_name, state))
+
+                    for nurest_object in fetcher:
+                        records.append(self._encode_record(RECORD_OBJECT, next_id, parent_id, rest_name, nurest_object.to_dict()))
+                        parents.append((next_id, nurest_object))
+                        next_id += 1
+
+            metadata = {'magic': SNAPSHOT_MAGIC, 'format': SNAPSHOT_FORMAT, 'root': root_object.rest_name, 'created_at': time(), 'objects': next_id - 1}
+
+            stream.write(self._encode_record(RECORD_METADATA, 0, 0, '', metadata))
+            stream.write(''.join(records))
+        finally:
+            stream.close()
+
+        return next_id - 1
+
+    def restore(self, root_object):
+        """ Restores the saved objects under the root object
+
+            The fetchers of the root object are emptied, then filled
+            with the saved objects when they are first used.
+
+            Args:
+                root_object (bambou.NURESTObject): the root of the tree, of the same type as the saved one
+
+            Returns:
+                (int): the number of restored objects
+
+            Raises:
+                InternalConsitencyError: if the file is not a snapshot or was saved from another root
+        """
+
+        self._read()
+
+        if self._metadata['root'] != root_object.rest_name:
+            raise InternalConsitencyError('Snapshot %s was saved from a %s, not a %s' % (self.path, self._metadata['root'], root_object.rest_name))
+
+        self._attach(root_object, 0)
+
+        return self._metadata['objects']
+
+    def materialize(self, fetcher):
+        """ Builds the saved objects of a fetcher
+
+            Args:
+                fetcher (bambou.NURESTFetcher): a fetcher filled by this snapshot
+        """
+
+        with self._lock:
+            if fetcher._snapshot is not self:
+                return
+
+            owner_id = fetcher._snapshot_owner_id
+            fetcher._snapshot = None
+            fetcher._snapshot_owner_id = None
+
+            rest_name = fetcher.managed_object_rest_name()
+            parent = fetcher.parent_object
+            objects = list()
+
+            for (record_id, payload) in self._objects.pop((owner_id, rest_name), list()):
+                nurest_object = fetcher.new()
+                nurest_object.from_dict(json.loads(payload))
+                nurest_object._reset_dirty_attributes()
+                nurest_object.parent = parent
+
+                self._attach(nurest_object, record_id)
+                objects.append(nurest_object)
+
+            fetcher.extend(objects)
+
+    def _attach(self, nurest_object, record_id):
+        """ Makes the fetchers of an object load their saved objects on first use """
+
+        for rest_name, fetcher in nurest_object._fetchers_registry.iteritems():
+            key = (record_id, rest_name)
+
+            if key not in self._fetchers and key not in self._objects:
+                continue
+
+            fetcher.flush()
+
+            state = self._fetchers.get(key)
+
+            if state:
+                fetcher.current_total_count = state['count']
+                fetcher.current_page = state['page']
+                fetcher.current_ordered_by = state['order_by']
+                fetcher.current_watermark = state.get('watermark')
+
+            fetcher._snapshot = self
+            fetcher._snapshot_owner_id = record_id
+
+    def _read(self):
+        """ Reads all the records of the file without decoding the objects """
+
+        with open(self.path, 'rb') as stream:
+            is_compressed = stream.read(2) == GZIP_MAGIC
+
+        stream = gzip.open(self.path, 'rb') if is_compressed else open(self.path, 'rb')
+
+        try:
+            data = stream.read()
+        finally:
+            stream.close()
+
+        objects = defaultdict(list)
+        fetchers = dict()
+        metadata = None
+        offset = 0
+
+        try:
+            while offset < len(data):
+                (kind, record_id, parent_id, name_length, payload_length) = RECORD_HEADER.unpack_from(data, offset)
+                offset += RECORD_HEADER.size
+                name = data[offset:offset + name_length]
+                offset += name_length
+                payload = data[offset:offset + payload_length]
+                offset += payload_length
+
+                if kind == RECORD_OBJECT:
+                    objects[(parent_id, name)].append((record_id, payload))
+                elif kind == RECORD_FETCHER:
+                    fetchers[(record_id, name)] = json.loads(payload)
+                elif kind == RECORD_METADATA and metadata is None and offset == RECORD_HEADER.size + payload_length:
+                    metadata = json.loads(payload)
+
+                if metadata is None:
+                    break
+        except (struct.error, ValueError):
+            metadata = None
+
+        if not isinstance(metadata, dict) or metadata.get('magic') != SNAPSHOT_MAGIC or metadata.get('format') != SNAPSHOT_FORMAT or offset != len(data):
+            raise InternalConsitencyError('%s is not a bambou snapshot' % self.path)
+
+        self._objects = objects
+        self._fetchers = fetchers
+        self._metadata = metadata
+
+    def _encode_record(self, kind, record_id, parent_id, name, value):
+        """ Encodes a record with its header """
+
+        name = str(name)
+        payload = json.dumps(value, separators=(',', ':'))
+
+        return RECORD_HEADER.pack(kind, record_id, parent_id, len(name), len(payload)) + name + payload
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import json
+import threading
+import uuid
+
+from contextlib import contextmanager
+from time import time
+
+
+class NURESTSpan(object):
+    """ Timed operation of a trace
+
+        Spans are created by :func:`bambou.NURESTTracer.start_span`. Using a span
+        in a `with` statement makes it the current span of the thread, so that
+        spans started inside the block become its children, and ends it when
+        leaving the block.
+    """
+
+    def __init__(self, tracer, name, trace_id=None, parent_id=None, attributes=None):
+        """ Initializes a span and starts it
+
+            Args:
+                tracer (bambou.NURESTTracer): the tracer exporting the span
+                name (string): the name of the operation
+                trace_id (string): the identifier of the trace. Default is a new trace
+                parent_id (string): the identifier of the parent span
+                attributes (dict): initial attributes
+        """
+
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else dict()
+        self.error = None
+        self.start_time = time()
+        self.end_time = None
+
+    def __enter__(self):
+        """ Makes the span the current span of the thread """
+
+        self._tracer._push_span(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Restores the previous current span and ends the span """
+
+        self._tracer._pop_span(self)
+
+        if exc_value is not None:
+            self.set_error(exc_value)
+
+        self.end()
+
+    def __repr__(self):
+        """ Representation of the span """
+
+        return '<NURESTSpan %s %s>' % (self.name, self.span_id)
+
+    # Properties
+
+    @property
+    def duration(self):
+        """ Get the duration in seconds, or None if the span is not ended """
+
+        if self.end_time is None:
+            return None
+
+        return self.end_time - self.start_time
+
+    @property
+    def is_ended(self):
+        """ Check if the span has been ended """
+
+        return self.end_time is not None
+
+    # Methods
+
+    def set_attribute(self, name, value):
+        """ Sets an attribute
+
+            Args:
+                name (string): the attribute name
+                value: the attribute value
+        """
+
+        self.attributes[name] = value
+
+    def set_attributes(self, **attributes):
+        """ Sets several attributes """
+
+        self.attributes.update(attributes)
+
+    def set_error(self, error):
+        """ Marks the span as failed
+
+            Args:
+                error: the exception or the error message
+        """
+
+        self.error = error if isinstance(error, basestring) else '%s: %s' % (error.__class__.__name__, error)
+
+    def end(self):
+        """ Ends the span and sends it to the exporters
+
+            Ending a span more than once has no effect.
+        """
+
+        if self.end_time is not None:
+            return
+
+        self.end_time = time()
+        self._tracer._export(self)
+
+    def to_dict(self):
+        """ Converts the span into a dictionary """
+
+        return {'name': self.name,
+                'trace_id': self.trace_id,
+                'span_id': self.span_id,
+                'parent_id': self.parent_id,
+                'start_time': self.start_time,
+                'end_time': self.end_time,
+                'duration': self.duration,
+                'attributes': self.attributes,
+                'error': self.error}
+
+
+class _NURESTNoopSpan(object):
+    """ Span returned when tracing is disabled """
+
+    name = None
+    trace_id = None
+    span_id = None
+    parent_id = None
+    error = None
+    duration = None
+    is_ended = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def set_attribute(self, name, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def set_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+    def to_dict(self):
+        return dict()
+
+
+class NURESTSpanExporter(object):
+    """ Receives ended spans
+
+        Subclasses override `export` to send spans to a tracing backend.
+    """
+
+    def export(self, span):
+        """ Called when a span has ended
+
+            Args:
+                span (bambou.NURESTSpan): the ended span
+        """
+
+        pass
+
+    def shutdown(self):
+        """ Called when the exporter is removed from the tracer """
+
+        pass
+
+
+class NURESTJSONFileSpanExporter(NURESTSpanExporter):
+    """ Writes spans into a file, one JSON document per line """
+
+    def __init__(self, path):
+        """ Initializes the exporter
+
+            Args:
+                path (string): the path of the file. Spans are appended to it
+        """
+
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        """ Appends the span to the file """
+
+        line = json.dumps(span.to_dict(), default=str)
+
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a')
+
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def shutdown(self):
+        """ Closes the file """
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class NURESTTracer(object):
+    """ Lightweight tracer for bambou operations
+
+        :class:`bambou.NURESTFetcher` and :class:`bambou.NURESTObject` operations create
+        a span, and each HTTP request creates a child `http` span holding the method, url,
+        status code, sizes, network and decoding times, and the connection transaction id.
+        Operations started while a span is current, including from the callbacks
+        of an asynchronous call, become children of that span.
+
+        Tracing is disabled until an exporter is registered.
+
+        Example:
+            >>> tracer = NURESTTracer.get_default_tracer()
+            >>> tracer.add_exporter(NURESTJSONFileSpanExporter('/tmp/bambou-spans.json'))
+            >>> with tracer.start_span('sync', enterprise=enterprise.id):
+            ...     for domain in enterprise.domains.get():
+            ...         domain.subnets.fetch()
+    """
+
+    NOOP_SPAN = _NURESTNoopSpan()
+
+    __default_tracer = None
+
+    def __init__(self):
+        """ Initializes a tracer without exporters """
+
+        self._exporters = list()
+        self._local = threading.local()
+
+    # Class Methods
+
+    @classmethod
+    def get_default_tracer(cls):
+        """ Get the tracer used by bambou
+
+            Returns:
+                (bambou.NURESTTracer): the default tracer
+        """
+
+        if NURESTTracer.__default_tracer is None:
+            NURESTTracer.__default_tracer = cls()
+
+        return NURESTTracer.__default_tracer
+
+    # Properties
+
+    @property
+    def exporters(self):
+        """ Get the registered exporters """
+
+        return tuple(self._exporters)
+
+    # Methods
+
+    def is_enabled(self):
+        """ Check if spans are recorded
+
+            Returns:
+                Returns True if at least one exporter is registered
+        """
+
+        return len(self._exporters) > 0
+
+    def add_exporter(self, exporter):
+        """ Registers an exporter
+
+            Args:
+                exporter (bambou.NURESTSpanExporter): the exporter
+        """
+
+        if exporter not in self._exporters:
+            self._exporters = self._exporters + [exporter]
+
+    def remove_exporter(self, exporter):
+        """ Unregisters an exporter and shuts it down
+
+            Args:
+                exporter (bambou.NURESTSpanExporter): the exporter
+        """
+
+        if exporter in self._exporters:
+            self._exporters = [registered for registered in self._exporters if registered is not exporter]
+            exporter.shutdown()
+
+    def get_current_span(self):
+        """ Get the current span of the thread
+
+            Returns:
+                (bambou.NURESTSpan): the current span, or None
+        """
+
+        stack = getattr(self._local, 'stack', None)
+
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def activate(self, span):
+        """ Makes a span the current span of the thread inside a `with` block
+
+            Unlike using the span itself in the `with` statement, the span
+            is not ended when leaving the block.
+
+            Args:
+                span (bambou.NURESTSpan): the span, or None
+        """
+
+        if span is None or span is self.NOOP_SPAN:
+            yield span
+            return
+
+        self._push_span(span)
+
+        try:
+            yield span
+        finally:
+            self._pop_span(span)
+
+    def start_span(self, name, parent=None, **attributes):
+        """ Starts a span
+
+            Args:
+                name (string): the name of the operation
+                parent (bambou.NURESTSpan): the parent span. Default is the current span
+                attributes: attributes of the span
+
+            Returns:
+                (bambou.NURESTSpan): the started span, or a span that records nothing if tracing is disabled
+        """
+
+        if not self._exporters:
+            return self.NOOP_SPAN
+
+        if parent is None or parent is self.NOOP_SPAN:
+            parent = self.get_current_span()
+
+        if parent is None:
+            return NURESTSpan(self, name, attributes=attributes)
+
+        return NURESTSpan(self, name, trace_id=parent.trace_id, parent_id=parent.span_id, attributes=attributes)
+
+    # Private methods
+
+    def _push_span(self, span):
+        """ Makes a span the current span of the thread """
+
+        stack = getattr(self._local, 'stack', None)
+
+        if stack is None:
+            stack = self._local.stack = list()
+
+        stack.append(span)
+
+    def _pop_span(self, span):
+        """ Removes a span from the current spans of the thread """
+
+        stack = getattr(self._local, 'stack', None)
+
+        if stack and span in stack:
+            stack.remove(span)
+
+    def _export(self, span):
+        """ Sends an ended span to the exporters """
+
+        for exporter in self._exporters:
+            exporter.export(span)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import threading
+
+from Queue import Queue, Empty
+from time import time
+
+from .nurest_fetcher import NURESTFetcher
+from .nurest_session import _NURESTSessionCurrentContext
+from .nurest_tracer import NURESTTracer
+
+
+class NURESTTreeFetcher(object):
+    """ Fetches a tree of objects level by level
+
+        Each level fetches all the pages of the selected children fetchers
+        of the objects found at the previous level, using a pool of threads.
+        The fetched children are stored in the fetchers of their parent, as a
+        complete fetch would do.
+
+        Example:
+            >>> tree_fetcher = NURESTTreeFetcher(child_types=['domain', 'zone', 'subnet'], concurrency=8)
+            >>> tree_fetcher.fetch(enterprise)
+            [{'level': 1, 'parents': 1, 'requests': 1, 'objects': 12, 'seconds': 0.02}, ...]
+            >>> enterprise.domains[0].zones
+            [<NUZone at 1>, <NUZone at 2>]
+    """
+
+    def __init__(self, child_types=None, depth=None, concurrency=4, page_size=None, progress_callback=None):
+        """ Initializes a tree fetcher
+
+            Args:
+                child_types (list): ReST names or classes of the children to fetch. Default fetches all fetchers with a `child` relationship
+                depth (int): maximum number of levels to fetch. Default fetches until no children are found
+                concurrency (int): maximum number of concurrent requests
+                page_size (int): number of objects per page. Default is NURESTFetcher.PAGE_SIZE
+                progress_callback (function): called from the fetching threads as progress_callback(level, fetched, total) each time a fetcher is complete
+        """
+
+        self.child_types = set(child_type if isinstance(child_type, basestring) else child_type.rest_name for child_type in child_types) if child_types is not None else None
+        self.depth = depth
+        self.concurrency = max(1, concurrency)
+        self.page_size = page_size or NURESTFetcher.PAGE_SIZE
+        self.progress_callback = progress_callback
+
+    # Methods
+
+    def get_fetchers(self, nurest_object):
+        """ Get the selected children fetchers of an object
+
+            Without child types, only the fetchers with a `child` relationship
+            are selected, as member or root fetchers return objects that are
+            already part of the tree.
+
+            Args:
+                nurest_object (bambou.NURESTObject): the parent object
+
+            Returns:
+                list: the fetchers to use
+        """
+
+        fetchers = list()
+
+        for rest_name, fetcher in nurest_object._fetchers_registry.iteritems():
+            if self.child_types is None:
+                if fetcher.relationship == 'child':
+                    fetchers.append(fetcher)
+
+            elif rest_name in self.child_types:
+                fetchers.append(fetcher)
+
+        return fetchers
+
+    def fetch(self, nurest_object):
+        """ Fetches the tree under the given object
+
+            Args:
+                nurest_object (bambou.NURESTObject): the root of the tree
+
+            Returns:
+                list: statistics of each level, as dictionaries with `level`, `parents`, `requests`, `objects` and `seconds` keys.
+                Objects found more than once are counted and explored only the first time.
+
+            Raises:
+                Re-raises the first error raised by a fetch. The levels already fetched are kept.
+        """
+
+        tracer = NURESTTracer.get_default_tracer()
+        levels = list()
+        parents = [nurest_object]
+        visited = set([(nurest_object.rest_name, nurest_object.id)])
+
+        with tracer.start_span('fetch_tree', rest_name=nurest_object.rest_name, id=nurest_object.id) as span:
+            while parents and (self.depth is None or len(levels) < self.depth):
+                fetchers = list()
+                fetcher_ids = set()
+
+                # Fetchers are lists: compare them by identity
+                for parent in parents:
+                    for fetcher in self.get_fetchers(parent):
+                        if id(fetcher) not in fetcher_ids:
+                            fetcher_ids.add(id(fetcher))
+                            fetchers.append(fetcher)
+
+                if not fetchers:
+                    break
+
+                started_at = time()
+                (objects, nb_requests) = self._fetch_level(len(levels) + 1, fetchers, span)
+                children = list()
+
+                for child in objects:
+                    key = (child.rest_name, child.id)
+
+                    if key not in visited:
+                        visited.add(key)
+                        children.append(child)
+
+                levels.append({'level': len(levels) + 1,
+                               'parents': len(parents),
+                               'requests': nb_requests,
+                               'objects': len(children),
+                               'seconds': time() - started_at})
+
+                parents = children
+
+            span.set_attributes(levels=len(levels), objects=sum(level['objects'] for level in levels))
+
+        return levels
+
+    def _fetch_level(self, level, fetchers, span):
+        """ Fetches all pages of the given fetchers using the thread pool
+
+            Returns:
+                tuple: (fetched objects, number of requests)
+        """
+
+        session = _NURESTSessionCurrentContext.session
+        tracer = NURESTTracer.get_default_tracer()
+        queue = Queue()
+        lock = threading.Lock()
+        state = {'children': list(), 'requests': 0, 'completed': 0, 'error': None}
+
+        for fetcher in fetchers:
+            queue.put(fetcher)
+
+        def work():
+            _NURESTSessionCurrentContext.session = session
+
+            with tracer.activate(span):
+                while state['error'] is None:
+                    try:
+                        fetcher = queue.get_nowait()
+                    except Empty:
+                        return
+
+                    try:
+                        (objects, nb_requests) = self._fetch_all_pages(fetcher)
+                    except Exception as exc:
+                        with lock:
+                            if state['error'] is None:
+                                state['error'] = exc
+                        return
+
+                    with lock:
+                        state['children'].extend(objects)
+                        state['requests'] += nb_requests
+                        state['completed'] += 1
+                        completed = state['completed']
+
+                    if self.progress_callback:
+                        self.progress_callback(level, completed, len(fetchers))
+
+        threads = [threading.Thread(target=work) for _ in range(min(self.concurrency, len(fetchers)))]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        if state['error'] is not None:
+            raise state['error']
+
+        return (state['children'], state['requests'])
+
+    def _fetch_all_pages(self, fetcher):
+        """ Fetches all pages of a fetcher and stores the objects in it
+
+            The fetcher is left unchanged if a page cannot be fetched.
+
+            Returns:
+                tuple: (fetched objects, number of requests)
+        """
+
+        (objects, nb_requests) = fetcher._fetch_all_pages(page_size=self.page_size)
+
+        if objects is None:
+            return (list(), nb_requests)
+
+        fetcher[:] = objects
+        fetcher._mirror_objects(objects)
+        fetcher.current_total_count = len(objects)
+        fetcher.current_page = nb_requests - 1
+
+        return (objects, nb_requests)
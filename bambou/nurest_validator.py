@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+
+
+VALIDATION_ERROR_REQUIRED = 'required'
+VALIDATION_ERROR_TYPE = 'type'
+VALIDATION_ERROR_MIN_LENGTH = 'min_length'
+VALIDATION_ERROR_MAX_LENGTH = 'max_length'
+VALIDATION_ERROR_CHOICES = 'choices'
+
+
+class NURESTValidator(object):
+    """ Validation rules of a NURESTObject class
+
+        The rules are read from the exposed attributes of the first validated
+        instance of a class, and reused for all other instances. Validating only
+        collects failures as tuples. Error messages are formatted by `format_errors`
+        when the errors of an object are read.
+    """
+
+    __validators = dict()
+    __lock = threading.Lock()
+
+    def __init__(self, attributes):
+        """ Compiles the rules of exposed attributes
+
+            Args:
+                attributes (dict): the NURemoteAttribute objects by local name
+        """
+
+        self.nb_attributes = len(attributes)
+        self._rules = list()
+
+        for local_name, attribute in attributes.iteritems():
+            choices = attribute.choices
+
+            if choices:
+                try:
+                    choices = frozenset(choices)
+                except TypeError:
+                    pass
+
+            self._rules.append((local_name,
+                                attribute,
+                                attribute.is_required,
+                                attribute.attribute_type,
+                                attribute.attribute_type is str,
+                                attribute.min_length,
+                                attribute.max_length,
+                                choices or None))
+
+    # Class Methods
+
+    @classmethod
+    def get_validator(cls, nurest_object):
+        """ Get the validator of the class of an object
+
+            Args:
+                nurest_object (bambou.NURESTObject): the object to validate
+
+            Returns:
+                (bambou.nurest_validator.NURESTValidator): the validator
+        """
+
+        object_class = nurest_object.__class__
+        validator = cls.__validators.get(object_class)
+
+        if validator is not None and validator.nb_attributes == len(nurest_object._attributes):
+            return validator
+
+        validator = cls(nurest_object._attributes)
+
+        # Objects exposing other attributes than the other instances of their class
+        # are validated with their own rules, without replacing the compiled ones
+        with cls.__lock:
+            cls.__validators.setdefault(object_class, validator)
+
+        return validator
+
+    @classmethod
+    def format_errors(cls, failures):
+        """ Formats validation failures
+
+            Args:
+                failures (list): the failures returned by `get_failures`
+
+            Returns:
+                dict: the errors by local name, with a title, a description and the remote name
+        """
+
+        errors = dict()
+
+        for (local_name, error, attribute, value) in failures:
+            remote_name = attribute.remote_name
+
+            if error == VALIDATION_ERROR_REQUIRED:
+                errors[local_name] = {'title': 'Invalid input', 'description': 'This value is mandatory.', 'remote_name': remote_name}
+
+            elif error == VALIDATION_ERROR_TYPE:
+                errors[local_name] = {'title': 'Wrong type', 'description': 'Attribute %s type should be %s but is %s' % (remote_name, attribute.attribute_type, type(value)), 'remote_name': remote_name}
+
+            elif error == VALIDATION_ERROR_MIN_LENGTH:
+                errors[local_name] = {'title': 'Invalid lenght', 'description': 'Attribute %s minimum size should be %s but is %s' % (remote_name, attribute.min_length, len(value)), 'remote_name': remote_name}
+
+            elif error == VALIDATION_ERROR_MAX_LENGTH:
+                errors[local_name] = {'title': 'Invalid lenght', 'description': 'Attribute %s maximum size should be %s but is %s' % (remote_name, attribute.max_length, len(value)), 'remote_name': remote_name}
+
+            else:
+                errors[local_name] = {'title': 'Invalid input', 'description': 'Invalid input', 'remote_name': remote_name}
+
+        return errors
+
+    # Methods
+
+    def get_failures(self, nurest_object):
+        """ Checks the attributes of an object
+
+            Args:
+                nurest_object (bambou.NURESTObject): the object to validate
+
+            Returns:
+                list: a (local_name, error, attribute, value) tuple for each invalid attribute
+        """
+
+        failures = list()
+
+        for (local_name, attribute, is_required, attribute_type, is_string, min_length, max_length, choices) in self._rules:
+            value = getattr(nurest_object, local_name, None)
+
+            if value is None:
+                if is_required:
+                    failures.append((local_name, VALIDATION_ERROR_REQUIRED, attribute, value))
+                continue
+
+            if is_required and value == "":
+                failures.append((local_name, VALIDATION_ERROR_REQUIRED, attribute, value))
+                continue
+
+            value_type = type(value)
+
+            if value_type is not attribute_type and not (is_string and value_type is unicode):
+                failures.append((local_name, VALIDATION_ERROR_TYPE, attribute, value))
+                continue
+
+            if min_length and len(value) < min_length:
+                failures.append((local_name, VALIDATION_ERROR_MIN_LENGTH, attribute, value))
+                continue
+
+            if max_length and len(value) > max_length:
+                failures.append((local_name, VALIDATION_ERROR_MAX_LENGTH, attribute, value))
+                continue
+
+            if choices:
+                try:
+                    is_valid_choice = value in choices
+                except TypeError:  # unhashable values cannot be looked up in a frozenset
+                    is_valid_choice = value in attribute.choices
+
+                if not is_valid_choice:
+                    failures.append((local_name, VALIDATION_ERROR_CHOICES, attribute, value))
+
+        return failures
@@ -0,0 +1,679 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import argparse
+import importlib
+import json
+import random
+import threading
+import uuid
+
+from base64 import urlsafe_b64decode
+from time import sleep, time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+except ImportError:  # pragma: no cover
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+
+from bambou.config import BambouConfig
+from bambou.exceptions import InternalConsitencyError
+from bambou.nurest_filter import NURESTFilter
+from bambou.nurest_modelcontroller import NURESTModelController
+
+
+class _ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
+    """ HTTP server handling each request in a thread """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _NURESTStandInRequestHandler(BaseHTTPRequestHandler):
+    """ Dispatches requests to the NURESTStandInServer """
+
+    def log_message(self, format, *args):
+        """ Silences the access log """
+
+        pass
+
+    def do_GET(self):
+        self.server.stand_in.handle(self, 'GET')
+
+    def do_HEAD(self):
+        self.server.stand_in.handle(self, 'HEAD')
+
+    def do_POST(self):
+        self.server.stand_in.handle(self, 'POST')
+
+    def do_PUT(self):
+        self.server.stand_in.handle(self, 'PUT')
+
+    def do_DELETE(self):
+        self.server.stand_in.handle(self, 'DELETE')
+
+
+class NURESTStandInServer(object):
+    """ Local HTTP server standing in for the VSD API
+
+        The server relies on the models registered in :class:`bambou.NURESTModelController`
+        to know which resources exist and which attributes they have. Objects are
+        stored in memory and can be created, fetched, updated, deleted and assigned
+        under their parent urls. Lists support paging, ordering and
+        `X-Nuage-Filter` predicates evaluated by :class:`bambou.NURESTFilter`.
+
+        The server also emulates the confirmation of deletions with a 300 response,
+        the expiration of API keys with 419 responses, and generates push events on
+        the `/events` long poll for each change. Latency and errors can be injected
+        to test the behavior of clients under load.
+
+        Example:
+            >>> NURESTModelController.register_model(NUEnterprise)
+            >>> with NURESTStandInServer(latency=(0.005, 0.02), error_rate=0.01) as server:
+            ...     server.add_objects('enterprises', [{'name': 'enterprise %s' % i} for i in range(100)])
+            ...     session = NUVSDSession(username='csproot', password='csproot', enterprise='csp', api_url=server.url)
+            ...     session.start()
+
+        The server can also be started as a separate process, after importing
+        the modules registering the models:
+
+            $ python -m bambou.testing.nurest_stand_in_server --module vspk.v4_0 --port 8443
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, api_prefix='api', version='3.2', root_resource_name='me', password=None,
+                 api_key_lifetime=None, latency=0, error_rate=0, error_status_code=500, confirm_deletes=True,
+                 validate=True, generate_events=True, events_timeout=1.0, seed=None, max_page_size=None):
+        """ Initializes the server
+
+            Args:
+                host (string): the address to listen on
+                port (int): the port to listen on. Default is a free port
+                api_prefix (string): the api prefix
+                version (string): the api version
+                root_resource_name (string): the resource name of the root object, used to get the API key
+                password (string): the password to accept. Default accepts any password
+                api_key_lifetime (float): number of seconds before an API key expires. Default never expires
+                latency (float or tuple): number of seconds to wait before responding, or a (min, max) range
+                error_rate (float): probability for a request to fail with error_status_code
+                error_status_code (int): the status code of injected errors
+                confirm_deletes (bool): True to answer deletions without response choice with a 300 response
+                validate (bool): True to validate created and updated objects with their model
+                generate_events (bool): True to generate push events for each change
+                events_timeout (float): number of seconds the `/events` long poll waits for events
+                seed (int): seed of the random generator used to inject latency and errors
+                max_page_size (int): maximum number of objects per page, whatever the requested page size. Default is no limit
+        """
+
+        self.host = host
+        self.port = port
+        self.base_path = '/%s/v%s' % (api_prefix, str(version).replace('.', '_'))
+        self.root_resource_name = root_resource_name
+        self.password = password
+        self.api_key_lifetime = api_key_lifetime
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status_code = error_status_code
+        self.confirm_deletes = confirm_deletes
+        self.validate = validate
+        self.generate_events = generate_events
+        self.events_timeout = events_timeout
+        self.max_page_size = max_page_size
+        self.request_count = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._objects = dict()
+        self._children = dict()
+        self._assignments = dict()
+        self._api_keys = dict()
+        self._failures = list()
+        self._events = list()
+        self._events_condition = threading.Condition()
+        self._root_id = uuid.uuid4().hex
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        """ Starts the server in a `with` statement """
+
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Stops the server """
+
+        self.stop()
+
+    # Properties
+
+    @property
+    def url(self):
+        """ Get the url to give as `api_url` to the session """
+
+        return 'http://%s:%s' % (self.host, self.port)
+
+    # Control
+
+    def start(self):
+        """ Starts serving in a thread """
+
+        self._server = _ThreadedHTTPServer((self.host, self.port), _NURESTStandInRequestHandler)
+        self._server.stand_in = self
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, name='stand-in-vsd')
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """ Stops serving """
+
+        with self._events_condition:
+            self._events_condition.notify_all()
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def wait(self):
+        """ Blocks until the server is stopped or the process is interrupted """
+
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+    # Data
+
+    def add_objects(self, resource_name, dictionaries, parent_id=None):
+        """ Stores objects without generating events
+
+            Args:
+                resource_name (string): the resource name of a registered model, like `enterprises`
+                dictionaries (list): dictionaries of remote attributes. Missing IDs are generated
+                parent_id (string): the ID of the parent object. Default is the root object
+
+            Returns:
+                list: the stored dictionaries
+        """
+
+        model = self._get_model(resource_name)
+
+        if model is None:
+            raise ValueError('No model registered for resource %s' % resource_name)
+
+        parent_type = self._objects[parent_id]['rest_name'] if parent_id else None
+
+        with self._lock:
+            return [self._store(model, dictionary, parent_id, parent_type) for dictionary in dictionaries]
+
+    def get_object(self, object_id):
+        """ Get a stored object
+
+            Args:
+                object_id (string): the ID of the object
+
+            Returns:
+                dict: the remote attributes of the object, or None
+        """
+
+        with self._lock:
+            entry = self._objects.get(object_id)
+            return dict(entry['data']) if entry else None
+
+    def get_objects(self, resource_name, parent_id=None):
+        """ Get the stored children of an object
+
+            Args:
+                resource_name (string): the resource name of the children
+                parent_id (string): the ID of the parent object. Default is the root object
+
+            Returns:
+                list: the remote attributes of the children, including assigned objects
+        """
+
+        with self._lock:
+            return [dict(self._objects[object_id]['data']) for object_id in self._get_children_ids(parent_id, resource_name)]
+
+    def expire_api_key(self):
+        """ Makes requests with current API keys receive a 419 response """
+
+        with self._lock:
+            self._api_keys = dict()
+
+    def fail_next(self, count=1, status_code=500):
+        """ Makes the next requests fail
+
+            Args:
+                count (int): the number of requests to fail
+                status_code (int): the status code to send
+        """
+
+        with self._lock:
+            self._failures.extend([status_code] * count)
+
+    def push_events(self, events):
+        """ Queues events for the `/events` long poll
+
+            Args:
+                events (list): the event dictionaries
+        """
+
+        with self._events_condition:
+            self._events.extend(events)
+            self._events_condition.notify_all()
+
+    # Request handling
+
+    def handle(self, handler, method):
+        """ Handles a request
+
+            Args:
+                handler (BaseHTTPRequestHandler): the handler of the request
+                method (string): the HTTP method
+        """
+
+        with self._lock:
+            self.request_count += 1
+            failure = self._failures.pop(0) if self._failures else None
+
+        parsed_url = urlparse(handler.path)
+        path = parsed_url.path
+
+        if not path.startswith(self.base_path):
+            return self._send_error(handler, 404, 'Not Found', 'Unknown url %s' % path)
+
+        segments = [segment for segment in path[len(self.base_path):].split('/') if segment]
+
+        if segments == ['events']:
+            if not self._is_authorized(handler):
+                return self._send(handler, 419, None)
+
+            return self._handle_events(handler)
+
+        self._wait_latency()
+
+        if failure is None and self.error_rate and self._random.random() < self.error_rate:
+            failure = self.error_status_code
+
+        if failure is not None:
+            return self._send_error(handler, failure, 'Injected Error', 'This error has been injected by the stand-in server')
+
+        try:
+            length = int(handler.headers.get('Content-Length') or 0)
+            body = handler.rfile.read(length) if length else None
+            data = json.loads(body) if body else None
+        except ValueError:
+            return self._send_error(handler, 400, 'Bad Request', 'The body is not valid JSON')
+
+        if segments and segments[0] == self.root_resource_name:
+            if len(segments) == 1:
+                return self._handle_root(handler, method, data)
+
+            segments = segments[1:]
+
+        if not self._is_authorized(handler):
+            return self._send(handler, 419, None)
+
+        if not segments:
+            return self._send_error(handler, 404, 'Not Found', 'Unknown url %s' % path)
+
+        if len(segments) % 2 == 1:
+            parent_id = segments[-2] if len(segments) > 1 else None
+            return self._handle_children(handler, method, parent_id, segments[-1], data)
+
+        query = parse_qs(parsed_url.query)
+        return self._handle_object(handler, method, segments[-2], segments[-1], data, 'responseChoice' in query)
+
+    def _handle_root(self, handler, method, data):
+        """ Authenticates the user and sends the root object with a new API key """
+
+        user, secret = self._get_credentials(handler)
+
+        if user is None or (self.password is not None and secret != self.password and not self._is_authorized(handler)):
+            return self._send_error(handler, 401, 'Unauthorized', 'Invalid credentials')
+
+        api_key = uuid.uuid4().hex
+
+        with self._lock:
+            self._api_keys[api_key] = time()
+
+        root = {BambouConfig.get_id_remote_name(): self._root_id,
+                'APIKey': api_key,
+                'APIKeyExpiry': int((time() + self.api_key_lifetime) * 1000) if self.api_key_lifetime else None,
+                'userName': user,
+                'enterpriseName': handler.headers.get('X-Nuage-Organization'),
+                'role': 'CSPROOT'}
+
+        self._send(handler, 200, [root])
+
+    def _handle_children(self, handler, method, parent_id, resource_name, data):
+        """ Lists, counts, creates or assigns children """
+
+        model = self._get_model(resource_name)
+
+        if model is None:
+            return self._send_error(handler, 404, 'Not Found', 'Unknown resource %s' % resource_name)
+
+        with self._lock:
+            if parent_id and parent_id not in self._objects:
+                return self._send_error(handler, 404, 'Not Found', 'Object %s does not exist' % parent_id)
+
+            if method in ('GET', 'HEAD'):
+                return self._send_children(handler, method, parent_id, resource_name)
+
+            if method == 'POST':
+                parent_type = self._objects[parent_id]['rest_name'] if parent_id else None
+                errors = self._validate(model, data)
+
+                if errors:
+                    return self._send(handler, 409, {'errors': errors})
+
+                dictionary = self._store(model, data, parent_id, parent_type)
+                self._add_event('CREATE', model.rest_name, dictionary)
+
+                return self._send(handler, 201, [dictionary])
+
+            if method == 'PUT':
+                object_ids = [object_id for object_id in (data or list()) if object_id in self._objects]
+                self._assignments[(parent_id, resource_name)] = object_ids
+
+                return self._send(handler, 200, None)
+
+        self._send_error(handler, 405, 'Method Not Allowed', 'Method %s is not allowed on %s' % (method, resource_name))
+
+    def _handle_object(self, handler, method, resource_name, object_id, data, has_response_choice):
+        """ Gets, updates or deletes an object """
+
+        with self._lock:
+            entry = self._objects.get(object_id)
+
+            if entry is None or entry['resource_name'] != resource_name:
+                return self._send_error(handler, 404, 'Not Found', 'Object %s does not exist' % object_id)
+
+            if method == 'GET':
+                return self._send(handler, 200, [dict(entry['data'])])
+
+            if method == 'PUT':
+                changes = dict((name, value) for name, value in (data or dict()).items() if name in entry['data'] and name != BambouConfig.get_id_remote_name())
+                dictionary = dict(entry['data'])
+                dictionary.update(changes)
+                errors = self._validate(entry['model'], dictionary)
+
+                if errors:
+                    return self._send(handler, 409, {'errors': errors})
+
+                dictionary['lastUpdatedDate'] = time() * 1000
+                entry['data'] = dictionary
+                self._add_event('UPDATE', entry['rest_name'], dictionary)
+
+                return self._send(handler, 200, [dict(dictionary)])
+
+            if method == 'DELETE':
+                if self.confirm_deletes and not has_response_choice:
+                    return self._send(handler, 300, {'choices': [{'id': 1, 'label': 'OK'}, {'id': 0, 'label': 'Cancel'}],
+                                                     'errors': [{'property': '', 'descriptions': [{'title': 'Delete', 'description': 'Are you sure you want to delete %s?' % object_id}]}]})
+
+                self._remove(object_id)
+                self._add_event('DELETE', entry['rest_name'], entry['data'])
+
+                return self._send(handler, 204, None)
+
+        self._send_error(handler, 405, 'Method Not Allowed', 'Method %s is not allowed on %s' % (method, resource_name))
+
+    def _handle_events(self, handler):
+        """ Waits for events and sends them """
+
+        with self._events_condition:
+            if not self._events:
+                self._events_condition.wait(self.events_timeout)
+
+            events = self._events
+            self._events = list()
+
+        self._send(handler, 200, {'uuid': uuid.uuid4().hex, 'events': events})
+
+    def _send_children(self, handler, method, parent_id, resource_name):
+        """ Sends a page of children """
+
+        objects = [self._objects[object_id]['data'] for object_id in self._get_children_ids(parent_id, resource_name)]
+        predicate = handler.headers.get('X-Nuage-Filter')
+        order_by = handler.headers.get('X-Nuage-OrderBy')
+
+        if predicate:
+            objects = [obj for obj in objects if self._matches(obj, predicate)]
+
+        if order_by:
+            parts = order_by.split()
+            objects = sorted(objects, key=lambda obj: obj.get(parts[0]), reverse=len(parts) > 1 and parts[1].upper() == 'DESC')
+
+        page = int(handler.headers.get('X-Nuage-Page') or 0)
+        page_size = int(handler.headers.get('X-Nuage-PageSize') or 50)
+
+        if self.max_page_size:
+            page_size = min(page_size, self.max_page_size)
+
+        headers = {'X-Nuage-Count': len(objects), 'X-Nuage-Page': page, 'X-Nuage-PageSize': page_size}
+
+        if order_by:
+            headers['X-Nuage-OrderBy'] = order_by
+
+        if method == 'HEAD':
+            return self._send(handler, 200, None, headers)
+
+        self._send(handler, 200, [dict(obj) for obj in objects[page * page_size:(page + 1) * page_size]], headers)
+
+    # Private methods
+
+    def _get_model(self, resource_name):
+        """ Get the model registered for a resource name """
+
+        return NURESTModelController.get_first_model_with_resource_name(resource_name)
+
+    def _get_children_ids(self, parent_id, resource_name):
+        """ Get the IDs of the children and assigned objects """
+
+        key = (parent_id, resource_name)
+
+        return self._children.get(key, list()) + [object_id for object_id in self._assignments.get(key, list()) if object_id in self._objects]
+
+    def _store(self, model, data, parent_id, parent_type):
+        """ Stores a new object built from its model """
+
+        nurest_object = model()
+        nurest_object.from_dict(data or dict())
+
+        id_remote_name = BambouConfig.get_id_remote_name()
+        dictionary = nurest_object.to_dict()
+        dictionary[id_remote_name] = dictionary.get(id_remote_name) or uuid.uuid4().hex
+        dictionary['parentID'] = parent_id
+        dictionary['parentType'] = parent_type
+        dictionary['creationDate'] = dictionary['lastUpdatedDate'] = time() * 1000
+        dictionary['owner'] = self._root_id
+
+        self._objects[dictionary[id_remote_name]] = {'model': model, 'rest_name': model.rest_name, 'resource_name': model.resource_name, 'parent_id': parent_id, 'data': dictionary}
+        self._children.setdefault((parent_id, model.resource_name), list()).append(dictionary[id_remote_name])
+
+        return dict(dictionary)
+
+    def _remove(self, object_id):
+        """ Removes an object and its descendants """
+
+        entry = self._objects.pop(object_id)
+        self._children[(entry['parent_id'], entry['resource_name'])].remove(object_id)
+
+        for (parent_id, resource_name), object_ids in list(self._children.items()):
+            if parent_id == object_id:
+                for child_id in list(object_ids):
+                    self._remove(child_id)
+
+        for key in list(self._assignments):
+            if key[0] == object_id:
+                del self._assignments[key]
+
+    def _validate(self, model, data):
+        """ Validates remote attributes with the model
+
+            Returns:
+                list: the errors, in the VSD format
+        """
+
+        if not self.validate:
+            return None
+
+        nurest_object = model()
+        nurest_object.from_dict(data or dict())
+
+        if nurest_object.validate():
+            return None
+
+        return [{'property': error['remote_name'], 'descriptions': [{'title': error['title'], 'description': error['description']}]} for error in nurest_object.errors.values()]
+
+    def _add_event(self, event_type, rest_name, dictionary):
+        """ Queues a push event for a change """
+
+        if not self.generate_events:
+            return
+
+        self.push_events([{'type': event_type,
+                           'entityType': rest_name,
+                           'updateMechanism': 'DEFAULT',
+                           'eventReceivedTime': int(time() * 1000),
+                           'entities': [dict(dictionary)]}])
+
+    def _get_credentials(self, handler):
+        """ Decodes the user and the password or API key of the Authorization header """
+
+        authorization = handler.headers.get('Authorization') or ''
+
+        try:
+            credentials = urlsafe_b64decode(authorization.replace('XREST ', '').strip())
+        except Exception:
+            return (None, None)
+
+        if ':' not in credentials:
+            return (None, None)
+
+        return tuple(credentials.split(':', 1))
+
+    def _is_authorized(self, handler):
+        """ Checks that the request uses a valid API key """
+
+        user, api_key = self._get_credentials(handler)
+
+        with self._lock:
+            issued_at = self._api_keys.get(api_key)
+
+            if issued_at is None:
+                return False
+
+            if self.api_key_lifetime is not None and time() - issued_at > self.api_key_lifetime:
+                del self._api_keys[api_key]
+                return False
+
+        return True
+
+    def _matches(self, obj, predicate):
+        """ Evaluates a filter predicate, or searches the text in all values if it is not a valid filter """
+
+        try:
+            return NURESTFilter.compile(predicate).matches(obj)
+        except InternalConsitencyError:
+            return any(predicate in '%s' % value for value in obj.values())
+
+    def _wait_latency(self):
+        """ Waits for the configured latency """
+
+        latency = self._random.uniform(*self.latency) if isinstance(self.latency, (tuple, list)) else self.latency
+
+        if latency:
+            sleep(latency)
+
+    def _send_error(self, handler, status_code, title, description):
+        """ Sends an error in the VSD format """
+
+        self._send(handler, status_code, {'errors': [{'property': '', 'descriptions': [{'title': title, 'description': description}]}]})
+
+    def _send(self, handler, status_code, data, headers=None):
+        """ Sends a JSON response """
+
+        body = json.dumps(data) if data is not None else ''
+
+        handler.send_response(status_code)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+
+        for name, value in (headers or dict()).items():
+            handler.send_header(name, str(value))
+
+        handler.end_headers()
+
+        if handler.command != 'HEAD':
+            handler.wfile.write(body)
+
+
+def main(argv=None):
+    """ Starts a stand-in server from the command line """
+
+    parser = argparse.ArgumentParser(description='Local VSD stand-in server')
+    parser.add_argument('--module', action='append', default=[], help='module to import to register the models. Can be repeated')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8443, help='port to listen on')
+    parser.add_argument('--api-prefix', default='api', help='api prefix')
+    parser.add_argument('--version', default='3.2', help='api version')
+    parser.add_argument('--password', help='password to accept. Default accepts any password')
+    parser.add_argument('--api-key-lifetime', type=float, help='number of seconds before an API key expires')
+    parser.add_argument('--latency', type=float, nargs='+', default=[0], help='latency in seconds, or a min and max latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='probability for a request to fail')
+    args = parser.parse_args(argv)
+
+    for module in args.module:
+        importlib.import_module(module)
+
+    server = NURESTStandInServer(host=args.host,
+                                 port=args.port,
+                                 api_prefix=args.api_prefix,
+                                 version=args.version,
+                                 password=args.password,
+                                 api_key_lifetime=args.api_key_lifetime,
+                                 latency=tuple(args.latency) if len(args.latency) > 1 else args.latency[0],
+                                 error_rate=args.error_rate)
+
+    server.start()
+    print('Serving VSD stand-in on %s%s' % (server.url, server.base_path))
+    server.wait()
+
+
+if __name__ == '__main__':
+    main()
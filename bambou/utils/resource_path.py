@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse
+
+
+def get_resource_path_segments(url, base_url=None):
+    """ Get the segments of the path of a resource url
+
+        Args:
+            url (string): the url of the resource
+            base_url (string): the API url, that will be removed from the path
+
+        Returns:
+            list: the path segments, like `['enterprises', 'xxx', 'domains']`
+    """
+
+    path = urlparse(url).path
+
+    if base_url:
+        base_path = urlparse(base_url).path.rstrip('/')
+
+        if path.startswith(base_path):
+            path = path[len(base_path):]
+
+    return [segment for segment in path.split('/') if segment]
+
+
+def get_resource_path_template(url, base_url=None):
+    """ Get the path of a resource url where identifiers are replaced by `{id}`
+
+        Args:
+            url (string): the url of the resource
+            base_url (string): the API url, that will be removed from the path
+
+        Returns:
+            string: the path template, like `enterprises/{id}/domains`
+    """
+
+    segments = get_resource_path_segments(url, base_url)
+
+    for index in range(1, len(segments), 2):
+        segments[index] = '{id}'
+
+    return '/'.join(segments)
+
+
+def get_resource_name(url, base_url=None):
+    """ Get the name of the resource targeted by a resource url
+
+        Args:
+            url (string): the url of the resource
+            base_url (string): the API url, that will be removed from the path
+
+        Returns:
+            string: the resource name, like `domains`, or None if the path is empty
+    """
+
+    segments = get_resource_path_segments(url, base_url)
+
+    if not segments:
+        return None
+
+    return segments[(len(segments) - 1) & ~1]
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from bambou import NURESTObject, NURESTRootObject, NURESTFetcher, NURESTSession, NURESTModelController
+
+
+class BenchEnterprise(NURESTObject):
+    """ Enterprise with a realistic number of attributes """
+
+    __rest_name__ = "enterprise"
+    __resource_name__ = "enterprises"
+
+    def __init__(self, **kwargs):
+        """ Creates a new enterprise """
+
+        super(BenchEnterprise, self).__init__()
+
+        self.name = None
+        self.description = None
+        self.customer_id = None
+        self.dictionary_version = None
+        self.enterprise_profile_id = None
+        self.floating_ips_quota = None
+        self.floating_ips_used = None
+        self.allow_advanced_qos_configuration = None
+        self.allowed_forwarding_classes = None
+        self.external_id = None
+
+        self.expose_attribute(local_name='name', remote_name='name', attribute_type=str, is_required=True)
+        self.expose_attribute(local_name='description', remote_name='description', attribute_type=str, max_length=255)
+        self.expose_attribute(local_name='customer_id', remote_name='customerID', attribute_type=int)
+        self.expose_attribute(local_name='dictionary_version', remote_name='dictionaryVersion', attribute_type=int)
+        self.expose_attribute(local_name='enterprise_profile_id', remote_name='enterpriseProfileID', attribute_type=str)
+        self.expose_attribute(local_name='floating_ips_quota', remote_name='floatingIPsQuota', attribute_type=int)
+        self.expose_attribute(local_name='floating_ips_used', remote_name='floatingIPsUsed', attribute_type=int)
+        self.expose_attribute(local_name='allow_advanced_qos_configuration', remote_name='allowAdvancedQOSConfiguration', attribute_type=bool)
+        self.expose_attribute(local_name='allowed_forwarding_classes', remote_name='allowedForwardingClasses', attribute_type=list)
+        self.expose_attribute(local_name='external_id', remote_name='externalID', attribute_type=str)
+
+        self._compute_args(**kwargs)
+
+
+NURESTModelController.register_model(BenchEnterprise)
+
+
+class BenchEnterprisesFetcher(NURESTFetcher):
+    """ Fetcher of BenchEnterprise objects """
+
+    @classmethod
+    def managed_class(cls):
+        """ Returns the BenchEnterprise class """
+
+        return BenchEnterprise
+
+
+class BenchUser(NURESTRootObject):
+    """ Root object of the benchmarks """
+
+    __rest_name__ = "me"
+    __resource_name__ = "me"
+
+    def __init__(self, **kwargs):
+        """ Creates a new user """
+
+        super(BenchUser, self).__init__()
+
+        self.enterprise_name = None
+        self.expose_attribute(local_name='enterprise_name', remote_name='enterpriseName', attribute_type=str)
+
+        self.enterprises = BenchEnterprisesFetcher.fetcher_with_object(parent_object=self)
+
+        self._compute_args(**kwargs)
+
+
+class BenchSession(NURESTSession):
+    """ Session of the benchmarks """
+
+    def create_root_object(self):
+        """ Creates a new user """
+
+        return BenchUser()
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015, Alcatel-Lucent Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#     * Redistributions of source code must retain the above copyright
+#       notice, this list of conditions and the following disclaimer.
+#     * Redistributions in binary form must reproduce the above copyright
+#       notice, this list of conditions and the following disclaimer in the
+#       documentation and/or other materials provided with the distribution.
+#     * Neither the name of the copyright holder nor the names of its contributors
+#       may be used to endorse or promote products derived from this software without
+#       specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+""" Runs the bambou benchmarks against a local VSD stand-in server
+
+    Usage:
+        python -m benchmarks.run [--objects 5000] [--saves 200] [--events 5000] [--output results.json]
+
+    Results are printed as JSON, so they can be stored and compared
+    between revisions to track performance regressions.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+
+from bambou import BambouConfig, NURESTConnection, NURESTRequest, NURESTSnapshot
+from bambou.testing import NURESTStandInServer
+
+from .models import BenchEnterprise, BenchSession, BenchUser
+
+
+PAGE_SIZE = 50
+
+
+def _percentile(values, percent):
+    """ Get the percentile of a list of values """
+
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+
+    return values[index]
+
+
+def _get_rss():
+    """ Get the resident memory of the process in bytes """
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError):  # pragma: no cover
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _make_enterprise_dict(index):
+    """ Build the remote representation of an enterprise """
+
+    return {'name': 'enterprise-%s' % index,
+            'description': 'Enterprise number %s used for benchmarks' % index,
+            'customerID': 10000 + index,
+            'dictionaryVersion': 2,
+            'enterpriseProfileID': 'a3a1b4b0-8ed1-4d6c-9c3b-0b2c7c5b9a%02d' % (index % 100),
+            'floatingIPsQuota': 16,
+            'floatingIPsUsed': index % 16,
+            'allowAdvancedQOSConfiguration': index % 2 == 0,
+            'allowedForwardingClasses': ['A', 'B', 'C'],
+            'externalID': None}
+
+
+def bench_fetch_pages(session, nb_objects):
+    """ Fetch all enterprises page by page """
+
+    fetcher = session.root_object.enterprises
+    nb_pages = 0
+    nb_fetched = 0
+
+    started_at = time.time()
+
+    while True:
+        (_, _, objects) = fetcher.fetch(page=nb_pages, page_size=PAGE_SIZE, commit=False)
+        nb_pages += 1
+
+        if not objects:
+            break
+
+        nb_fetched += len(objects)
+
+    elapsed = time.time() - started_at
+
+    return {'pages': nb_pages,
+            'objects': nb_fetched,
+            'seconds': elapsed,
+            'pages_per_second': nb_pages / elapsed,
+            'objects_per_second': nb_fetched / elapsed}
+
+
+def bench_deserialize(nb_objects):
+    """ Build objects from dictionaries, without HTTP """
+
+    dictionaries = [_make_enterprise_dict(index) for index in range(nb_objects)]
+
+    started_at = time.time()
+
+    for dictionary in dictionaries:
+        BenchEnterprise().from_dict(dictionary)
+
+    elapsed = time.time() - started_at
+
+    return {'objects': nb_objects,
+            'seconds': elapsed,
+            'objects_per_second': nb_objects / elapsed}
+
+
+def bench_validate(nb_objects):
+    """ Validate objects, without HTTP """
+
+    objects = list()
+
+    for index in range(nb_objects):
+        nurest_object = BenchEnterprise()
+        nurest_object.from_dict(_make_enterprise_dict(index))
+        objects.append(nurest_object)
+
+    started_at = time.time()
+    invalid_objects = BenchEnterprise.validate_many(objects)
+    elapsed = time.time() - started_at
+
+    return {'objects': nb_objects,
+            'invalid_objects': len(invalid_objects),
+            'seconds': elapsed,
+            'objects_per_second': nb_objects / elapsed}
+
+
+def bench_serialize(nb_objects, nb_repeats=5):
+    """ Serialize the same objects several times, as repeated sends do """
+
+    objects = list()
+
+    for index in range(nb_objects):
+        nurest_object = BenchEnterprise()
+        nurest_object.from_dict(_make_enterprise_dict(index))
+        objects.append(nurest_object)
+
+    started_at = time.time()
+
+    for _ in range(nb_repeats):
+        for nurest_object in objects:
+            nurest_object.to_json()
+
+    elapsed = time.time() - started_at
+    nb_serializations = nb_objects * nb_repeats
+
+    return {'objects': nb_objects,
+            'repeats': nb_repeats,
+            'seconds': elapsed,
+            'serializations_per_second': nb_serializations / elapsed}
+
+
+def bench_clone(nb_objects):
+    """ Clone a template object, compared to rebuilding it from to_dict """
+
+    template = BenchEnterprise()
+    template.from_dict(_make_enterprise_dict(0))
+
+    started_at = time.time()
+
+    for _ in range(nb_objects):
+        BenchEnterprise(data=template.to_dict())
+
+    constructor_elapsed = time.time() - started_at
+
+    started_at = time.time()
+
+    for _ in range(nb_objects):
+        template.copy()
+
+    elapsed = time.time() - started_at
+
+    return {'objects': nb_objects,
+            'seconds': elapsed,
+            'constructor_seconds': constructor_elapsed,
+            'speedup': constructor_elapsed / elapsed}
+
+
+def bench_request_construction(session, nb_requests):
+    """ Build child requests with their authentication headers, without sending them """
+
+    enterprise = BenchEnterprise()
+    enterprise.id = 'enterprise-0'
+    controller = session.login_controller
+
+    started_at = time.time()
+
+    for _ in range(nb_requests):
+        request = NURESTRequest(method='GET', url=enterprise.get_resource_url_for_child_type(BenchEnterprise), page=0)
+        NURESTConnection(request=request, async=False)
+        request.headers.update(controller.get_authentication_headers(user=controller.user, api_key=controller.api_key))
+
+    elapsed = time.time() - started_at
+
+    return {'requests': nb_requests,
+            'seconds': elapsed,
+            'requests_per_second': nb_requests / elapsed}
+
+
+def bench_save(session, nb_saves):
+    """ Update one attribute of an enterprise and save it """
+
+    (_, _, enterprises) = session.root_object.enterprises.fetch(page_size=1, commit=False)
+    enterprise = enterprises[0]
+    latencies = list()
+
+    for index in range(nb_saves):
+        enterprise.description = 'saved %s' % index
+
+        started_at = time.time()
+        enterprise.save()
+        latencies.append(time.time() - started_at)
+
+    return {'saves': nb_saves,
+            'mean_ms': 1000 * sum(latencies) / len(latencies),
+            'p50_ms': 1000 * _percentile(latencies, 50),
+            'p95_ms': 1000 * _percentile(latencies, 95),
+            'max_ms': 1000 * max(latencies)}
+
+
+def bench_push_events(session, server, nb_events, batch_size=100):
+    """ Receive events through the push center """
+
+    push_center = session.push_center
+    push_center.get_last_events()
+    push_center.start()
+
+    started_at = time.time()
+    nb_received = 0
+
+    try:
+        for index in range(0, nb_events, batch_size):
+            server.push_events([{'type': 'UPDATE', 'entityType': 'enterprise', 'entities': [_make_enterprise_dict(index + offset)]} for offset in range(min(batch_size, nb_events - index))])
+
+        deadline = started_at + 60
+
+        while nb_received < nb_events and time.time() < deadline:
+            nb_received += len(push_center.get_last_events())
+            time.sleep(0.001)
+
+        elapsed = time.time() - started_at
+    finally:
+        push_center.stop()
+
+    return {'events': nb_received,
+            'seconds': elapsed,
+            'events_per_second': nb_received / elapsed}
+
+
+def bench_refetch(session, nb_objects):
+    """ Fetch all enterprises again in a fetcher that holds them, computing the changes """
+
+    fetcher = session.root_object.enterprises
+    fetcher.fetch(page_size=nb_objects)
+
+    started_at = time.time()
+    changes = fetcher.fetch_changes(page_size=nb_objects)
+    elapsed = time.time() - started_at
+
+    fetcher.flush()
+
+    return {'objects': nb_objects,
+            'changes': len(changes),
+            'seconds': elapsed,
+            'objects_per_second': nb_objects / elapsed}
+
+
+def bench_snapshot(session):
+    """ Save the fetched tree to a snapshot, then restore and read it """
+
+    session.root_object.fetch_tree(page_size=500)
+    directory = tempfile.mkdtemp()
+
+    try:
+        path = os.path.join(directory, 'tree.snap')
+
+        started_at = time.time()
+        nb_objects = NURESTSnapshot(path, compress=True).save(session.root_object)
+        save_elapsed = time.time() - started_at
+
+        user = BenchUser()
+        started_at = time.time()
+        NURESTSnapshot(path).restore(user)
+        restore_elapsed = time.time() - started_at
+
+        started_at = time.time()
+        len(user.enterprises)
+        materialize_elapsed = time.time() - started_at
+
+        return {'objects': nb_objects,
+                'file_size': os.path.getsize(path),
+                'save_seconds': save_elapsed,
+                'restore_seconds': restore_elapsed,
+                'materialize_seconds': materialize_elapsed}
+    finally:
+        shutil.rmtree(directory)
+
+
+def bench_memory(nb_objects):
+    """ Measure the resident memory used by fetched objects """
+
+    dictionaries = [_make_enterprise_dict(index) for index in range(nb_objects)]
+
+    gc.collect()
+    rss_before = _get_rss()
+
+    objects = list()
+    for dictionary in dictionaries:
+        nurest_object = BenchEnterprise()
+        nurest_object.from_dict(dictionary)
+        objects.append(nurest_object)
+
+    gc.collect()
+    rss_after = _get_rss()
+
+    return {'objects': len(objects),
+            'bytes': rss_after - rss_before,
+            'bytes_per_object': float(rss_after - rss_before) / len(objects)}
+
+
+def run_benchmarks(nb_objects=5000, nb_saves=200, nb_events=5000):
+    """ Run all benchmarks
+
+        Args:
+            nb_objects (int): number of enterprises stored in the fake server
+            nb_saves (int): number of saves
+            nb_events (int): number of push events
+
+        Returns:
+            dict: the environment and the results of each benchmark
+    """
+
+    metrics_enabled = BambouConfig._metrics_enabled
+    BambouConfig.set_metrics_enabled(False)
+
+    server = NURESTStandInServer(validate=False, generate_events=False, events_timeout=0.2)
+    server.add_objects('enterprises', [_make_enterprise_dict(index) for index in range(nb_objects)])
+    server.start()
+
+    try:
+        session = BenchSession(username='csproot', password='csproot', enterprise='csp', api_url=server.url, api_prefix='api', version='3.2')
+        session.start()
+
+        results = dict()
+        results['fetch_pages'] = bench_fetch_pages(session, nb_objects)
+        results['deserialize'] = bench_deserialize(nb_objects)
+        results['validate'] = bench_validate(nb_objects)
+        results['serialize'] = bench_serialize(nb_objects)
+        results['clone'] = bench_clone(nb_objects)
+        results['request_construction'] = bench_request_construction(session, nb_objects * 10)
+        results['save'] = bench_save(session, nb_saves)
+        results['push_events'] = bench_push_events(session, server, nb_events)
+        results['refetch'] = bench_refetch(session, nb_objects)
+        results['snapshot'] = bench_snapshot(session)
+        results['memory'] = bench_memory(nb_objects)
+    finally:
+        server.stop()
+        BambouConfig.set_metrics_enabled(metrics_enabled)
+
+    return {'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {'objects': nb_objects, 'saves': nb_saves, 'events': nb_events},
+            'results': results}
+
+
+def main(argv=None):
+    """ Command line entry point """
+
+    parser = argparse.ArgumentParser(description='Run bambou benchmarks against a local VSD stand-in server')
+    parser.add_argument('--objects', type=int, default=5000, help='number of enterprises stored in the fake server')
+    parser.add_argument('--saves', type=int, default=200, help='number of saves')
+    parser.add_argument('--events', type=int, default=5000, help='number of push events')
+    parser.add_argument('--output', help='file to write the JSON results to')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(nb_objects=args.objects, nb_saves=args.saves, nb_events=args.events)
+    output = json.dumps(results, indent=4, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+    print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
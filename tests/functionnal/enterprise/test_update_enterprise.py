@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from unittest import TestCase
 from mock import patch
 
@@ -43,6 +45,55 @@ class Update(TestCase):
         self.assertEqual(enterprise.name,"Another name")
         self.assertEqual(connection.response.status_code, 200)
 
+    def test_update_sends_changes_only(self):
+        """ PUT /enterprises update enterprise sends changed attributes only """
+
+        enterprise = get_valid_enterprise(id=2, name=u"Enterprise")
+        enterprise._reset_dirty_attributes()
+        enterprise.description = "A description"
+        mock = MockUtils.create_mock_response(status_code=200, data=enterprise)
+
+        with patch('requests.request', mock):
+            (obj, connection) = enterprise.save()
+
+        data = json.loads(MockUtils.get_mock_parameter(mock, 'data'))
+
+        self.assertEqual(data, {'ID': 2, 'description': 'A description'})
+        self.assertFalse(enterprise.is_dirty)
+
+    def test_update_without_changes(self):
+        """ PUT /enterprises update enterprise without changes does nothing """
+
+        enterprise = get_valid_enterprise(id=2, name=u"Enterprise")
+        enterprise._reset_dirty_attributes()
+        mock = MockUtils.create_mock_response(status_code=200, data=enterprise)
+
+        with patch('requests.request', mock):
+            (obj, connection) = enterprise.save()
+
+        self.assertFalse(mock.called)
+        self.assertEqual(obj, enterprise)
+        self.assertEqual(connection.response.status_code, 304)
+        self.assertTrue(connection.has_succeed())
+
+    def test_update_without_changes_async(self):
+        """ PUT /enterprises update enterprise without changes calls the callback with a complete connection """
+
+        enterprise = get_valid_enterprise(id=2, name=u"Enterprise")
+        enterprise._reset_dirty_attributes()
+        mock = MockUtils.create_mock_response(status_code=200, data=enterprise)
+        results = list()
+
+        def did_save(obj, connection):
+            results.append((obj, connection.response.status_code))
+
+        with patch('requests.request', mock):
+            transaction_id = enterprise.save(async=True, callback=did_save)
+
+        self.assertFalse(mock.called)
+        self.assertIsNotNone(transaction_id)
+        self.assertEqual(results, [(enterprise, 304)])
+
     def test_update_raise_error(self):
         """ PUT /enterprises update enterprise raise error """
 
@@ -53,3 +104,5 @@ class Update(TestCase):
         with patch('requests.request', mock):
             with self.assertRaises(BambouHTTPError):
                 (obj, connection) = enterprise.save()
+
+        self.assertTrue(enterprise.is_dirty)
@@ -1,9 +1,14 @@
 # -*- coding:utf-8 -*-
 
+import threading
+
 from unittest import TestCase
 
+from bambou import NURESTModelController, NURESTObjectStore
+from bambou.config import BambouConfig
+from bambou.testing import NURESTStandInServer
 from tests import start_session
-from tests.models import Group, User
+from tests.models import Enterprise, Group, User, NURESTTestSession
 
 
 class TestFlushFetcher(TestCase):
@@ -89,3 +94,210 @@ class TestListOperatorsFetcher(TestCase):
 
         with self.assertRaises(ValueError):
             user.groups.index(group3)
+
+
+class TestChangesFetcher(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        NURESTModelController.register_model(Enterprise)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index, 'lastUpdatedDate': 1000} for index in range(5)])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+
+    def tearDown(self):
+        self.server.stop()
+
+    def change_server_objects(self):
+        """ Updates, deletes and creates enterprises on the server """
+
+        enterprises = self.user.enterprises.get(commit=False)
+
+        enterprises[1].name = 'renamed'
+        enterprises[1].save()
+        enterprises[2].delete()
+        enterprises[4].delete()
+
+        self.server.add_objects('enterprises', [{'name': 'new'}])
+
+    def test_fetch_changes(self):
+        """ Fetch changes """
+
+        changes = self.user.enterprises.fetch_changes()
+
+        self.assertEqual(len(changes.added), 5)
+        self.assertEqual(self.user.enterprises.fetch_changes().updated, [])
+
+        self.change_server_objects()
+        changes = self.user.enterprises.fetch_changes()
+
+        self.assertEqual([enterprise.name for enterprise in changes.added], ['new'])
+        self.assertEqual([enterprise.name for enterprise in changes.updated], ['renamed'])
+        self.assertIs(changes.updated[0], self.user.enterprises[1])
+        self.assertEqual([enterprise.name for enterprise in changes.removed], ['enterprise-2', 'enterprise-4'])
+        self.assertEqual([enterprise.name for enterprise in self.user.enterprises], ['enterprise-0', 'renamed', 'enterprise-3', 'new'])
+
+    def test_fetch_without_changes(self):
+        """ Fetch does not compute changes unless asked """
+
+        self.user.enterprises.fetch()
+        self.assertIsNone(self.user.enterprises.current_changes)
+
+        self.change_server_objects()
+        self.user.enterprises.fetch(changes=True)
+
+        self.assertEqual(repr(self.user.enterprises.current_changes), '<NURESTChangeSet added=1 updated=1 removed=2>')
+
+    def test_fetch_positional_arguments(self):
+        """ Async and callback keep their positions in fetch arguments """
+
+        results = list()
+        done = threading.Event()
+
+        def did_fetch(fetcher, parent, enterprises):
+            results.append(len(enterprises))
+            done.set()
+
+        self.user.enterprises.fetch(None, None, [], None, None, None, True, True, did_fetch)
+        done.wait(5)
+
+        self.assertEqual(results, [5])
+
+    def test_fetch_changes_in_store(self):
+        """ Fetch changes of a fetcher backed by a store """
+
+        with NURESTObjectStore() as store:
+            self.user.enterprises.store = store
+            self.user.enterprises.fetch()
+
+            self.change_server_objects()
+            changes = self.user.enterprises.fetch_changes()
+
+            self.assertEqual([enterprise.name for enterprise in changes.added], ['new'])
+            self.assertEqual([enterprise.name for enterprise in changes.updated], ['renamed'])
+            self.assertEqual([enterprise.name for enterprise in changes.removed], ['enterprise-2', 'enterprise-4'])
+            self.assertEqual(len(self.user.enterprises), 4)
+
+
+class TestSyncFetcher(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        NURESTModelController.register_model(Enterprise)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index} for index in range(12)])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+
+    def tearDown(self):
+        self.server.stop()
+
+    def change_server_objects(self):
+        """ Updates, deletes and creates enterprises on the server """
+
+        enterprises = self.user.enterprises.get(commit=False, page_size=20)
+
+        enterprises[1].name = 'renamed'
+        enterprises[1].save()
+        enterprises[2].delete()
+        enterprises[11].delete()
+
+        self.server.add_objects('enterprises', [{'name': 'new'}])
+
+    def test_sync(self):
+        """ Sync fetches all objects, then only the changed ones """
+
+        changes = self.user.enterprises.sync(page_size=5)
+        watermark = self.user.enterprises.current_watermark
+
+        self.assertEqual(len(changes.added), 12)
+        self.assertEqual(len(self.user.enterprises), 12)
+        self.assertEqual(watermark, max(enterprise.last_updated_date for enterprise in self.user.enterprises))
+
+        request_count = self.server.request_count
+        changes = self.user.enterprises.sync(page_size=5)
+
+        self.assertFalse(changes)
+        self.assertEqual(self.server.request_count, request_count + 2)
+        self.assertEqual(self.user.enterprises.current_watermark, watermark)
+
+        self.change_server_objects()
+        changes = self.user.enterprises.sync(page_size=5)
+
+        self.assertEqual([enterprise.name for enterprise in changes.added], ['new'])
+        self.assertEqual([enterprise.name for enterprise in changes.updated], ['renamed'])
+        self.assertEqual([enterprise.name for enterprise in changes.removed], ['enterprise-2', 'enterprise-11'])
+        self.assertIs(self.user.enterprises.current_changes, changes)
+        self.assertGreater(self.user.enterprises.current_watermark, watermark)
+        self.assertEqual(sorted(enterprise.id for enterprise in self.user.enterprises), sorted(enterprise['ID'] for enterprise in self.server.get_objects('enterprises')))
+
+    def test_sync_with_smaller_pages(self):
+        """ Sync fetches all objects when the server returns smaller pages than requested """
+
+        self.server.max_page_size = 3
+
+        changes = self.user.enterprises.sync(page_size=5)
+
+        self.assertEqual(len(changes.added), 12)
+        self.assertEqual(len(self.user.enterprises), 12)
+
+        self.server.max_page_size = None
+        self.change_server_objects()
+        self.server.max_page_size = 3
+        changes = self.user.enterprises.sync(page_size=5)
+
+        self.assertEqual(repr(changes), '<NURESTChangeSet added=1 updated=1 removed=2>')
+        self.assertEqual(len(self.user.enterprises), 11)
+
+    def test_failed_sync(self):
+        """ Sync does not merge anything when a page cannot be fetched """
+
+        self.user.enterprises.fetch(page_size=20)
+        BambouConfig.set_should_raise_bambou_http_error(False)
+
+        try:
+            self.server.fail_next(status_code=500)
+            self.assertIsNone(self.user.enterprises.sync(page_size=5))
+
+            self.assertEqual(len(self.user.enterprises), 12)
+            self.assertIsNone(self.user.enterprises.current_changes)
+            self.assertIsNone(self.user.enterprises.current_watermark)
+
+            self.user.enterprises.sync(page_size=5)
+            watermark = self.user.enterprises.current_watermark
+
+            self.server.fail_next(status_code=500)
+            self.assertIsNone(self.user.enterprises.sync(page_size=5))
+            self.assertEqual(self.user.enterprises.current_watermark, watermark)
+        finally:
+            BambouConfig.set_should_raise_bambou_http_error(True)
+
+    def test_sync_without_reconcile(self):
+        """ Sync does not detect deletions without reconciliation """
+
+        self.user.enterprises.sync()
+        self.change_server_objects()
+
+        changes = self.user.enterprises.sync(reconcile=False)
+
+        self.assertEqual(repr(changes), '<NURESTChangeSet added=1 updated=1 removed=0>')
+        self.assertEqual(len(self.user.enterprises), 13)
+
+        self.user.enterprises.flush()
+        self.assertIsNone(self.user.enterprises.current_watermark)
+
+    def test_watermark_filter(self):
+        """ Watermarks are sent as filters """
+
+        self.assertEqual(self.user.enterprises._get_watermark_filter(1500), 'lastUpdatedDate >= 1500')
+        self.assertEqual(self.user.enterprises._get_watermark_filter(1500.25, 'name == "a"'), '(name == "a") and lastUpdatedDate >= 1500.25')
+        self.assertEqual(self.user.enterprises._get_watermark_filter(1476000000000.0), 'lastUpdatedDate >= 1476000000000')
@@ -1,5 +1,8 @@
 # -*- coding:utf-8 -*-
 
+import json
+
+from mock import patch
 from unittest import TestCase
 
 from bambou import NURESTRootObject
@@ -7,6 +10,7 @@ from bambou.exceptions import InternalConsitencyError
 
 from tests import start_session
 from tests.models import Enterprise, EnterprisesFetcher, Group, GroupsFetcher, User, Employee
+from tests.utils import MockUtils
 
 
 class GetResourceTests(TestCase):
@@ -57,6 +61,29 @@ class GetResourceTests(TestCase):
         enterprise.id = 4
         self.assertEquals(enterprise.get_resource_url_for_child_type(Enterprise), 'https://vsd:8443/api/v3_2/enterprises/4/enterprises')
 
+    def test_resource_url_follows_id(self):
+        """ Get object resource url after its id changes """
+
+        enterprise = Enterprise()
+        self.assertEquals(enterprise.get_resource_url(), 'https://vsd:8443/api/v3_2/enterprises')
+        self.assertEquals(enterprise.get_resource_url_for_child_type(Group), 'https://vsd:8443/api/v3_2/enterprises/groups')
+
+        enterprise.id = '4'
+        self.assertEquals(enterprise.get_resource_url(), 'https://vsd:8443/api/v3_2/enterprises/4')
+        self.assertEquals(enterprise.get_resource_url_for_child_type(Group), 'https://vsd:8443/api/v3_2/enterprises/4/groups')
+
+    def test_overridden_resource_url(self):
+        """ Get child resource url of an object overriding its resource url """
+
+        class ScopedEnterprise(Enterprise):
+
+            def get_resource_url(self):
+                return '%s/scoped' % super(ScopedEnterprise, self).get_resource_url()
+
+        enterprise = ScopedEnterprise()
+        enterprise.id = '4'
+        self.assertEquals(enterprise.get_resource_url_for_child_type(Group), 'https://vsd:8443/api/v3_2/enterprises/4/scoped/groups')
+
     def test_object_with_id(self):
         """ Get object resource base url """
 
@@ -169,6 +196,83 @@ class CompressionTests(TestCase):
         self.assertEquals(enterprise.owner, 'Alcatel')
         self.assertEquals(enterprise.name, 'AnotherEnterprise')
 
+    def test_to_dict_is_cached_until_attribute_changes(self):
+        """ Cached to_dict is invalidated by attribute writes """
+
+        enterprise = Enterprise()
+        enterprise.name = 'Alcatel'
+
+        first = enterprise.to_dict()
+        self.assertIsNotNone(enterprise._serialization_cache)
+
+        second = enterprise.to_dict()
+        self.assertEquals(first, second)
+        self.assertIsNot(first, second)
+
+        second['name'] = 'Modified copy'
+        self.assertEquals(enterprise.to_dict()['name'], 'Alcatel')
+
+        enterprise.name = 'Nokia'
+        self.assertIsNone(enterprise._serialization_cache)
+        self.assertEquals(enterprise.to_dict()['name'], 'Nokia')
+
+        enterprise.from_dict({'description': 'updated'})
+        self.assertEquals(enterprise.to_dict()['description'], 'updated')
+
+    def test_to_dict_sees_in_place_changes(self):
+        """ Cached to_dict is invalidated when a list attribute is changed in place """
+
+        enterprise = Enterprise()
+        enterprise.name = 'Alcatel'
+        enterprise.allowed_forwarding_classes = ['A']
+
+        self.assertEquals(enterprise.to_dict()['allowedForwardingClasses'], ['A'])
+
+        enterprise.allowed_forwarding_classes.append('B')
+        self.assertEquals(enterprise.to_dict()['allowedForwardingClasses'], ['A', 'B'])
+
+    def test_to_dict_with_nested_objects_is_not_cached(self):
+        """ Objects holding other objects are serialized every time """
+
+        enterprise = Enterprise()
+        ceo = User()
+        ceo.firstname = 'John'
+        enterprise.ceo = ceo
+
+        self.assertEquals(enterprise.to_dict()['ceo']['firstName'], 'John')
+        self.assertIsNone(enterprise._serialization_cache)
+
+        ceo.firstname = 'Jane'
+        self.assertEquals(enterprise.to_dict()['ceo']['firstName'], 'Jane')
+
+    def test_to_json(self):
+        """ Get object as JSON """
+
+        enterprise = Enterprise()
+        enterprise.name = 'Alcatel'
+
+        encoded = enterprise.to_json()
+        self.assertEquals(json.loads(encoded), enterprise.to_dict())
+        self.assertIs(enterprise.to_json(), encoded)
+
+        enterprise.name = 'Nokia'
+        self.assertEquals(json.loads(enterprise.to_json())['name'], 'Nokia')
+
+    def test_create_child_sends_cached_json(self):
+        """ Creating an object sends its cached JSON representation """
+
+        user = User()
+        enterprise = Enterprise()
+        enterprise.name = 'Alcatel'
+        encoded = enterprise.to_json()
+
+        mock = MockUtils.create_mock_response(status_code=201, data=[enterprise])
+
+        with patch('requests.request', mock):
+            user.create_child(enterprise)
+
+        self.assertIs(mock.call_args[1]['data'], encoded)
+
 
 class AttributeTests(TestCase):
 
@@ -269,6 +373,56 @@ class AttributeTests(TestCase):
         self.assertEqual(len(enterprise.errors), 1)
         self.assertIn("token", enterprise.errors)
 
+    def test_validate_errors_messages(self):
+        """ Get validation errors messages """
+
+        enterprise = Enterprise()
+        enterprise.name = "ent1"
+        enterprise.token = "1"
+        enterprise.validate()
+
+        self.assertEqual(enterprise.errors['token'], {'title': 'Invalid lenght',
+                                                      'description': 'Attribute token minimum size should be 5 but is 1',
+                                                      'remote_name': 'token'})
+
+        enterprise.token = "12345"
+
+        self.assertTrue(enterprise.validate())
+        self.assertEqual(enterprise.errors, {})
+
+    def test_validate_many(self):
+        """ Validate many objects and get invalid ones """
+
+        enterprises = [Enterprise() for index in range(5)]
+
+        for index, enterprise in enumerate(enterprises):
+            enterprise.name = 'enterprise %s' % index
+
+        enterprises[1].name = None
+        enterprises[3].token = "1"
+
+        invalid_enterprises = Enterprise.validate_many(enterprises)
+
+        self.assertEqual([enterprise for (enterprise, errors) in invalid_enterprises], [enterprises[1], enterprises[3]])
+        self.assertEqual(invalid_enterprises[0][1].keys(), ['name'])
+        self.assertEqual(invalid_enterprises[1][1].keys(), ['token'])
+
+    def test_validate_with_extra_attribute(self):
+        """ Get validate with an attribute exposed by a single instance """
+
+        other_enterprise = Enterprise()
+        other_enterprise.name = 'other'
+        other_enterprise.validate()
+
+        enterprise = Enterprise()
+        enterprise.name = 'enterprise'
+        enterprise.extra = 1
+        enterprise.expose_attribute(local_name='extra', attribute_type=str)
+
+        self.assertFalse(enterprise.validate())
+        self.assertEqual(enterprise.errors.keys(), ['extra'])
+        self.assertTrue(other_enterprise.validate())
+
     def test_get_attribute_infos(self):
         """ Get validate with too long attribute """
 
@@ -314,6 +468,121 @@ class CopyTests(TestCase):
         self.assertNotEqual(enterprise, enterprise_copy)
         self.assertEqual(enterprise.to_dict(), enterprise_copy.to_dict())
 
+    def test_copy_does_not_share_state(self):
+        """ Copy gets its own local id, parent and fetchers """
+
+        enterprise = Enterprise(id='1')
+        group = Group(id='4', name='admins')
+        group.parent_object = enterprise
+        group.employees.append(Employee(id='2'))
+
+        group_copy = group.copy()
+
+        self.assertNotEqual(group.local_id, group_copy.local_id)
+        self.assertEqual(group_copy.name, 'admins')
+        self.assertEqual(group_copy.id, '4')
+        self.assertIsNone(group_copy.parent_object)
+        self.assertIsNot(group_copy.employees, group.employees)
+        self.assertIs(group_copy.employees.parent_object, group_copy)
+        self.assertIs(group_copy.fetcher_for_rest_name('user'), group_copy.employees)
+        self.assertEqual(len(group_copy.employees), 0)
+        self.assertEqual(group_copy._dirty_attributes, set(['name', 'parent_id', 'parent_type', 'creation_date', 'last_updated_date', 'owner']))
+
+        group_copy.name = 'others'
+        self.assertEqual(group.name, 'admins')
+
+    def test_copy_is_shallow_by_default(self):
+        """ Copy shares list and object values unless deep is set """
+
+        enterprise = Enterprise()
+        enterprise.allowed_forwarding_classes = ['A']
+        enterprise.ceo = User()
+
+        enterprise_copy = enterprise.copy()
+        self.assertIs(enterprise_copy.allowed_forwarding_classes, enterprise.allowed_forwarding_classes)
+        self.assertIs(enterprise_copy.ceo, enterprise.ceo)
+
+        enterprise_copy = enterprise.copy(deep=True)
+        enterprise_copy.allowed_forwarding_classes.append('B')
+        self.assertEqual(enterprise.allowed_forwarding_classes, ['A'])
+        self.assertIsNot(enterprise_copy.ceo, enterprise.ceo)
+        self.assertIsInstance(enterprise_copy.ceo, User)
+
+    def test_deep_copy_keeps_source_clean(self):
+        """ Deep copy does not mark the copied object dirty """
+
+        enterprise = Enterprise(id='4')
+        enterprise.allowed_forwarding_classes = ['A']
+        enterprise.ceo = User()
+        enterprise._reset_dirty_attributes()
+
+        enterprise_copy = enterprise.copy(deep=True)
+
+        self.assertFalse(enterprise.is_dirty)
+        self.assertIn('allowed_forwarding_classes', enterprise_copy.dirty_attributes)
+
+
+class DirtyAttributesTests(TestCase):
+
+    def test_new_instance_is_not_dirty(self):
+        """ New instance without arguments has no pending changes """
+
+        enterprise = Enterprise()
+
+        self.assertFalse(enterprise.is_dirty)
+        self.assertEqual(enterprise.dirty_attributes, [])
+        self.assertEqual(enterprise.get_changes(), {})
+
+    def test_attribute_write_marks_dirty(self):
+        """ Writing an exposed attribute marks it as dirty """
+
+        enterprise = Enterprise()
+        enterprise.id = '4'
+        enterprise.name = 'changed'
+        enterprise.not_exposed = 'value'
+
+        self.assertTrue(enterprise.is_dirty)
+        self.assertEqual(enterprise.dirty_attributes, ['name'])
+        self.assertEqual(enterprise.get_changes(), {'name': 'changed'})
+
+    def test_constructor_arguments_are_dirty(self):
+        """ Arguments given to the constructor are dirty """
+
+        enterprise = Enterprise(id='4', description='desc')
+
+        self.assertEqual(enterprise.get_changes(), {'description': 'desc'})
+
+    def test_from_dict_remote_names(self):
+        """ Changes are returned with remote names """
+
+        enterprise = Enterprise()
+        enterprise.allowed_forwarding_classes = 'A'
+
+        self.assertEqual(enterprise.get_changes(), {'allowedForwardingClasses': 'A'})
+
+    def test_reset_dirty_attributes(self):
+        """ Resetting dirty attributes """
+
+        enterprise = Enterprise()
+        enterprise.name = 'changed'
+        enterprise.description = 'desc'
+
+        enterprise._reset_dirty_attributes(['name'])
+        self.assertEqual(enterprise.dirty_attributes, ['description'])
+
+        enterprise._reset_dirty_attributes()
+        self.assertFalse(enterprise.is_dirty)
+
+    def test_dirty_object_equals(self):
+        """ Dirty objects can still be compared """
+
+        enterprise1 = Enterprise(id='4', description='enterprise')
+        enterprise2 = Enterprise(id='4', description='enterprise2')
+
+        self.assertTrue(enterprise1.is_dirty)
+        self.assertTrue(enterprise1.equals(enterprise2))
+
+
 class ComparisonTests(TestCase):
 
     def test_compare_instance(self):
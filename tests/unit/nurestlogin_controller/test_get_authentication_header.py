@@ -54,4 +54,37 @@ class GetAuthenticationHeader(TestCase):
         controller.password = None
         controller.api_key = None
 
-        self.assertEquals(controller.get_authentication_header(password='password') , 'XREST dXNlcm5hbWU6cGFzc3dvcmQ=')
\ No newline at end of file
+        self.assertEquals(controller.get_authentication_header(password='password') , 'XREST dXNlcm5hbWU6cGFzc3dvcmQ=')
+
+
+class GetAuthenticationHeaders(TestCase):
+
+    def test_headers_are_cached(self):
+        """ Get the same header set until the credentials change """
+
+        controller = NURESTLoginController()
+        controller.user = 'username'
+        controller.enterprise = 'enterprise'
+        controller.api_key = '123456'
+
+        headers = controller.get_authentication_headers()
+
+        self.assertEquals(headers, {'X-Nuage-Organization': 'enterprise', 'Authorization': 'XREST dXNlcm5hbWU6MTIzNDU2'})
+        self.assertIs(controller.get_authentication_headers(), headers)
+
+        controller.api_key = '654321'
+        self.assertEquals(controller.get_authentication_headers()['Authorization'], 'XREST dXNlcm5hbWU6NjU0MzIx')
+
+    def test_headers_with_impersonation(self):
+        """ Get the proxy user header while impersonating """
+
+        controller = NURESTLoginController()
+        controller.user = 'username'
+        controller.enterprise = 'enterprise'
+        controller.api_key = '123456'
+
+        controller.impersonate(user='other', enterprise='ent')
+        self.assertEquals(controller.get_authentication_headers()['X-Nuage-ProxyUser'], 'other@ent')
+
+        controller.stop_impersonate()
+        self.assertNotIn('X-Nuage-ProxyUser', controller.get_authentication_headers())
@@ -1,5 +1,6 @@
 # -*- coding:utf-8 -*-
 
+from mock import patch
 from unittest import TestCase
 from bambou import NURESTPushCenter
 from tests import start_session
@@ -35,7 +36,10 @@ class PushCenterRunningTests(TestCase):
 
         push_center = NURESTPushCenter()
         push_center.url = 'http://www.google.fr'
-        push_center.start()
-        self.assertEquals(push_center.is_running, True)
-        push_center.stop()
-        self.assertEquals(push_center.is_running, False)
+
+        # Do not leave a long poll running in the background after the test
+        with patch('bambou.nurest_push_center.NURESTConnection'):
+            push_center.start()
+            self.assertEquals(push_center.is_running, True)
+            push_center.stop()
+            self.assertEquals(push_center.is_running, False)
@@ -0,0 +1,105 @@
+# -*- coding:utf-8 -*-
+
+import time
+
+from mock import patch
+from unittest import TestCase
+
+from bambou import NURESTAPIKeyRenewer, NURESTModelController
+from bambou.testing import NURESTStandInServer
+from tests.models import Enterprise, NURESTTestSession
+
+
+class APIKeyRenewerTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        NURESTModelController.register_model(Enterprise)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(password='password', api_key_lifetime=1, events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index} for index in range(3)])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+
+    def tearDown(self):
+        self.session.stop_api_key_renewal()
+        self.server.stop()
+
+    def test_renewal_delay(self):
+        """ Renewal is scheduled before the expiry """
+
+        renewer = NURESTAPIKeyRenewer(session=self.session, lead_time=0.5, jitter=0)
+        self.assertAlmostEqual(renewer.get_renewal_delay(), 0.5, delta=0.2)
+
+        renewer.lead_time = 10
+        self.assertEqual(renewer.get_renewal_delay(), 0)
+
+        self.session.root_object.api_key_expiry = None
+        self.assertIsNone(renewer.get_renewal_delay())
+
+        renewer.api_key_lifetime = 20
+        self.assertAlmostEqual(renewer.get_renewal_delay(), 10, delta=0.2)
+
+    def test_renew_api_key(self):
+        """ Renewing swaps the API key of the session and keeps its root object """
+
+        root_object = self.session.root_object
+        root_object.enterprises.fetch()
+        api_key = self.session.login_controller.api_key
+
+        self.assertIs(self.session.renew_api_key(), root_object)
+        self.assertIs(self.session.root_object, root_object)
+        self.assertNotEqual(root_object.api_key, api_key)
+        self.assertEqual(self.session.login_controller.api_key, root_object.api_key)
+        self.assertEqual(len(root_object.enterprises), 3)
+        self.assertFalse(root_object.is_dirty)
+
+    def test_background_renewal(self):
+        """ Requests never see an expired API key while the renewer runs """
+
+        renewer = self.session.start_api_key_renewal(lead_time=0.7, jitter=0.05)
+        self.assertTrue(renewer.is_running)
+
+        deadline = time.time() + 1.5
+
+        while time.time() < deadline:
+            self.assertEqual(len(self.session.root_object.enterprises.get()), 3)
+            time.sleep(0.05)
+
+        self.assertGreaterEqual(renewer.renewal_count, 2)
+        self.assertEqual(renewer.failure_count, 0)
+        self.assertEqual(self.session.reauthentication_count, 0)
+
+        self.session.stop_api_key_renewal()
+        self.assertFalse(renewer.is_running)
+        self.assertIsNone(self.session.api_key_renewer)
+
+    def test_stop_does_not_renew(self):
+        """ Stopping the renewer does not renew the key once more """
+
+        renewer = NURESTAPIKeyRenewer(session=self.session, lead_time=0, jitter=0, api_key_lifetime=60)
+        wait = renewer._stop_event.wait
+
+        # Event.wait returns None before Python 2.7
+        with patch.object(renewer._stop_event, 'wait', side_effect=lambda timeout=None: wait(timeout) and None):
+            with patch.object(renewer, 'renew') as renew:
+                renewer.start()
+                time.sleep(0.1)
+                renewer.stop()
+
+        self.assertFalse(renew.called)
+        self.assertFalse(renewer.is_running)
+
+    def test_failed_renewal(self):
+        """ Failed renewals are counted and keep the current key """
+
+        api_key = self.session.login_controller.api_key
+        renewer = NURESTAPIKeyRenewer(session=self.session)
+
+        self.server.fail_next(status_code=500)
+
+        self.assertFalse(renewer.renew())
+        self.assertEqual(renewer.failure_count, 1)
+        self.assertEqual(self.session.login_controller.api_key, api_key)
@@ -0,0 +1,18 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from benchmarks.run import run_benchmarks
+
+
+class BenchmarksTests(TestCase):
+
+    def test_run_benchmarks(self):
+        """ Benchmarks run and report their results """
+
+        results = run_benchmarks(nb_objects=60, nb_saves=3, nb_events=20)
+
+        self.assertEqual(sorted(results['results'].keys()), ['clone', 'deserialize', 'fetch_pages', 'memory', 'push_events', 'refetch', 'request_construction', 'save', 'serialize', 'snapshot', 'validate'])
+        self.assertEqual(results['results']['fetch_pages']['objects'], 60)
+        self.assertEqual(results['results']['fetch_pages']['pages'], 3)
+        self.assertEqual(results['results']['push_events']['events'], 20)
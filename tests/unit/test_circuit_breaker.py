@@ -0,0 +1,129 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+from mock import patch, MagicMock
+
+from bambou import NURESTCircuitBreaker, NURESTRateLimiter
+from bambou.exceptions import BambouHTTPError, BambouCircuitOpenError, BambouRateLimitError
+from tests import start_session
+from tests.models import Enterprise
+from tests.utils import MockUtils
+
+
+class CircuitBreakerTests(TestCase):
+
+    def test_endpoint_key(self):
+        """ Endpoint keys replace identifiers """
+
+        key = NURESTCircuitBreaker.get_endpoint_key('GET', 'https://vsd:8443/api/v3_2/enterprises/xxx/domains?responseChoice=1', 'https://vsd:8443/api/v3_2')
+        self.assertEqual(key, 'GET enterprises/{id}/domains')
+
+        key = NURESTCircuitBreaker.get_endpoint_key('PUT', 'https://vsd:8443/api/v3_2/domains/yyy', 'https://vsd:8443/api/v3_2')
+        self.assertEqual(key, 'PUT domains/{id}')
+
+    def test_open_after_failures(self):
+        """ Circuit opens after consecutive failures """
+
+        breaker = NURESTCircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+        breaker.record_failure('GET a')
+        self.assertEqual(breaker.get_state('GET a'), 'closed')
+        self.assertTrue(breaker.allow_request('GET a'))
+
+        breaker.record_failure('GET a')
+        self.assertEqual(breaker.get_state('GET a'), 'open')
+        self.assertFalse(breaker.allow_request('GET a'))
+        self.assertTrue(breaker.allow_request('GET b'))
+        self.assertEqual(breaker.get_states()['GET a']['rejected'], 1)
+
+    def test_success_resets_failures(self):
+        """ Success resets the failure count """
+
+        breaker = NURESTCircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure('GET a')
+        breaker.record_response('GET a', 200)
+        breaker.record_response('GET a', 503)
+
+        self.assertEqual(breaker.get_state('GET a'), 'closed')
+
+    def test_half_open(self):
+        """ Circuit becomes half open after the recovery timeout """
+
+        breaker = NURESTCircuitBreaker(failure_threshold=1, recovery_timeout=0)
+
+        breaker.record_failure('GET a')
+        self.assertTrue(breaker.allow_request('GET a'))
+        self.assertEqual(breaker.get_state('GET a'), 'half_open')
+        self.assertFalse(breaker.allow_request('GET a'))
+
+        breaker.record_failure('GET a')
+        self.assertEqual(breaker.get_state('GET a'), 'open')
+
+        self.assertTrue(breaker.allow_request('GET a'))
+        breaker.record_success('GET a')
+        self.assertEqual(breaker.get_state('GET a'), 'closed')
+
+    def test_release_request(self):
+        """ Released half open requests give their slot back """
+
+        breaker = NURESTCircuitBreaker(failure_threshold=1, recovery_timeout=0)
+
+        breaker.record_failure('GET a')
+        self.assertTrue(breaker.allow_request('GET a'))
+        self.assertFalse(breaker.allow_request('GET a'))
+
+        breaker.release_request('GET a')
+        self.assertEqual(breaker.get_state('GET a'), 'half_open')
+        self.assertTrue(breaker.allow_request('GET a'))
+
+
+class CircuitBreakerConnectionTests(TestCase):
+
+    def setUp(self):
+        self.session = start_session()
+        self.session.circuit_breaker = NURESTCircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+    def tearDown(self):
+        self.session.circuit_breaker = None
+
+    def test_fast_fail(self):
+        """ GET fails without sending request when circuit is open """
+
+        mock = MagicMock(return_value=MockUtils.build_response(503))
+
+        with patch('requests.request', mock):
+            for i in range(2):
+                with self.assertRaises(BambouHTTPError):
+                    Enterprise(id='4').fetch()
+
+            with self.assertRaises(BambouCircuitOpenError) as context:
+                Enterprise(id='5').fetch()
+
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(context.exception.endpoint_key, 'GET enterprises/{id}')
+        self.assertEqual(context.exception.connection.response.status_code, 503)
+        self.assertEqual(self.session.circuit_breaker.get_state('PUT enterprises/{id}'), 'closed')
+
+    def test_rate_limited_probe(self):
+        """ A half open probe rejected by the rate limiter does not block the circuit """
+
+        self.session.circuit_breaker = NURESTCircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        self.session.rate_limiter = NURESTRateLimiter(rate=0.001, burst=1, blocking=False)
+
+        try:
+            with patch('requests.request', MagicMock(return_value=MockUtils.build_response(503))):
+                with self.assertRaises(BambouHTTPError):
+                    Enterprise(id='4').fetch()
+
+            with self.assertRaises(BambouRateLimitError):
+                Enterprise(id='4').fetch()
+
+            self.session.rate_limiter = None
+
+            with patch('requests.request', MagicMock(return_value=MockUtils.build_response(200))):
+                Enterprise(id='4').fetch()
+
+            self.assertEqual(self.session.circuit_breaker.get_state('GET enterprises/{id}'), 'closed')
+        finally:
+            self.session.rate_limiter = None
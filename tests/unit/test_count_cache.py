@@ -0,0 +1,119 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from bambou import NURESTCountCache, NURESTModelController, NURESTRequest
+from bambou.testing import NURESTStandInServer
+from tests.models import Enterprise, NURESTTestSession
+
+
+class CountCacheTests(TestCase):
+
+    def test_keys(self):
+        """ Keys identify the url, filter and query parameters of requests """
+
+        request1 = NURESTRequest(method='GET', url='https://vsd/enterprises', filter='name == "a"', page=2, order_by='name')
+        request2 = NURESTRequest(method='HEAD', url='https://vsd/enterprises', filter='name == "a"', params={'b': 1, 'a': 2})
+        request3 = NURESTRequest(method='HEAD', url='https://vsd/enterprises', filter='name == "a"')
+
+        request4 = NURESTRequest(method='HEAD', url='https://vsd/enterprises')
+        request4.set_header('X-Nuage-GroupBy', 'true')
+
+        self.assertEqual(NURESTCountCache.get_key(request1), NURESTCountCache.get_key(request3))
+        self.assertNotEqual(NURESTCountCache.get_key(request1), NURESTCountCache.get_key(request2))
+        self.assertIsNone(NURESTCountCache.get_key(request4))
+
+    def test_expiration_and_size(self):
+        """ Counts expire, and the oldest counts are dropped first """
+
+        cache = NURESTCountCache(ttl=60, max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.get_stats(), {'hits': 1, 'misses': 1, 'entries': 2})
+
+        cache.ttl = -1
+        cache.set('b', 2)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 1)
+
+
+class CountCacheFetchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        NURESTModelController.register_model(Enterprise)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index, 'description': 'group %s' % (index % 2)} for index in range(30)])
+
+        self.count_cache = NURESTCountCache(ttl=60)
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2', count_cache=self.count_cache)
+        self.session.start()
+        self.user = self.session.root_object
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_get_page(self):
+        """ Pages are fetched with the total count in a single request """
+
+        request_count = self.server.request_count
+        (enterprises, total_count) = self.user.enterprises.get_page(filter='description == "group 1"', page=1, page_size=10)
+
+        self.assertEqual(len(enterprises), 5)
+        self.assertEqual(total_count, 15)
+        self.assertEqual(len(self.user.enterprises), 5)
+        self.assertEqual(self.user.enterprises.current_total_count, 15)
+        self.assertEqual(self.server.request_count, request_count + 1)
+
+        self.assertEqual(self.user.enterprises.get_count(filter='description == "group 1"'), 15)
+        self.assertEqual(self.server.request_count, request_count + 1)
+
+        self.assertEqual(self.user.enterprises.get_count(filter='description == "group 0"'), 15)
+        self.assertEqual(self.user.enterprises.get_count(filter='description == "group 0"'), 15)
+        self.assertEqual(self.server.request_count, request_count + 2)
+
+    def test_writes_clear_cache(self):
+        """ Creating objects clears the cached counts """
+
+        self.assertEqual(self.user.enterprises.get_count(), 30)
+
+        enterprise = Enterprise()
+        enterprise.name = 'new'
+        self.user.create_child(enterprise)
+
+        self.assertEqual(len(self.count_cache), 0)
+        self.assertEqual(self.user.enterprises.get_count(), 31)
+
+    def test_sync_ignores_cache(self):
+        """ Sync reconciliation does not use cached counts """
+
+        self.user.enterprises.sync()
+        self.assertEqual(self.user.enterprises.get_count(), 30)
+
+        # Deleted by another client: the cached count is stale
+        self.session.count_cache = None
+        self.user.enterprises[0].delete()
+        self.session.count_cache = self.count_cache
+
+        changes = self.user.enterprises.sync()
+
+        self.assertEqual([enterprise.name for enterprise in changes.removed], ['enterprise-0'])
+        self.assertEqual(len(self.user.enterprises), 29)
+        self.assertEqual(self.user.enterprises.get_count(), 29)
+
+    def test_without_cache(self):
+        """ Counts are always requested without count cache """
+
+        self.session.count_cache = None
+        request_count = self.server.request_count
+
+        self.user.enterprises.get_page(page_size=10)
+        self.assertEqual(self.user.enterprises.get_count(), 30)
+        self.assertEqual(self.server.request_count, request_count + 2)
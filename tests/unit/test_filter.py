@@ -0,0 +1,123 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from bambou import NURESTFilter, NURESTModelController
+from bambou.exceptions import InternalConsitencyError
+from bambou.testing import NURESTStandInServer
+from tests import start_session
+from tests.models import Enterprise, User, NURESTTestSession
+
+
+class FilterTests(TestCase):
+
+    def setUp(self):
+        self.dictionary = {'ID': 'd1', 'name': 'prod-1', 'priority': 12, 'description': 'web front', 'tags': ['a', 'b'], 'enabled': True, 'parentID': None}
+
+    def assertMatches(self, expression, expected=True):
+        """ Asserts the dictionary matches the filter expression, or not """
+
+        self.assertEqual(NURESTFilter(expression).matches(self.dictionary), expected, expression)
+
+    def test_comparisons(self):
+        """ Attributes are compared with literals """
+
+        self.assertMatches('name == "prod-1"')
+        self.assertMatches("name == 'prod-2'", False)
+        self.assertMatches('name != "prod-2"')
+        self.assertMatches('priority == 12')
+        self.assertMatches('priority == "12"')
+        self.assertMatches('priority > 10')
+        self.assertMatches('priority < 10', False)
+        self.assertMatches('priority >= 12')
+        self.assertMatches('priority <= 11.5', False)
+        self.assertMatches('enabled == true')
+        self.assertMatches('parentID == null')
+        self.assertMatches('missing > 3', False)
+        self.assertMatches('missing != "x"')
+
+    def test_text_operators(self):
+        """ Texts and lists are searched """
+
+        self.assertMatches('description contains "front"')
+        self.assertMatches('tags contains "b"')
+        self.assertMatches('tags contains "c"', False)
+        self.assertMatches('name startswith "prod"')
+        self.assertMatches('name endswith "prod"', False)
+        self.assertMatches('"web"')
+        self.assertMatches('"mobile"', False)
+
+    def test_boolean_operators(self):
+        """ Comparisons are combined with and, or, not and parentheses """
+
+        self.assertMatches('name startswith "prod" and (priority > 20 or description contains "web")')
+        self.assertMatches('name startswith "prod" AND priority > 20 OR description contains "web"')
+        self.assertMatches('name == "x" or priority == 1', False)
+        self.assertMatches('priority > 10 && not (name == "x" || enabled == false)')
+        self.assertMatches('NOT name == "prod-1"', False)
+
+    def test_invalid_expressions(self):
+        """ Invalid expressions raise errors """
+
+        for expression in ('name ==', 'name == "x" and', '(name == "x"', 'name = "x"', 'name == other', 'name "x"', 'null'):
+            with self.assertRaises(InternalConsitencyError):
+                NURESTFilter(expression)
+
+    def test_compile(self):
+        """ Compiled filters are shared """
+
+        self.assertIs(NURESTFilter.compile('name == "a"'), NURESTFilter.compile('name == "a"'))
+        self.assertIsNot(NURESTFilter.compile('name == "a"'), NURESTFilter.compile('name == "b"'))
+
+    def test_objects(self):
+        """ Objects are filtered by remote and local attribute names """
+
+        start_session()
+
+        user = User()
+        user.firstname = 'John'
+        user.enterprise_name = 'Nuage'
+
+        self.assertTrue(NURESTFilter('firstName == "John" and enterpriseName == "Nuage"').matches(user))
+        self.assertTrue(NURESTFilter('firstname == "John" and enterprise_name == "Nuage"').matches(user))
+        self.assertTrue(NURESTFilter('"Nua"').matches(user))
+        self.assertFalse(NURESTFilter('lastName != null').matches(user))
+
+
+class FetcherFilterTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        NURESTModelController.register_model(Enterprise)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index, 'description': 'group %s' % (index % 3)} for index in range(9)])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_filter_local(self):
+        """ Fetched objects are filtered without requests """
+
+        self.user.enterprises.fetch()
+        request_count = self.server.request_count
+
+        enterprises = self.user.enterprises.filter_local('description == "group 1" and name != "enterprise-4"')
+
+        self.assertEqual([enterprise.name for enterprise in enterprises], ['enterprise-1', 'enterprise-7'])
+        self.assertEqual(self.server.request_count, request_count)
+
+    def test_stand_in_server_filter(self):
+        """ The stand-in server evaluates the same filters """
+
+        expression = 'description == "group 1" or name endswith "-2"'
+        self.user.enterprises.fetch()
+        expected = [enterprise.name for enterprise in self.user.enterprises.filter_local(expression)]
+
+        self.assertEqual([enterprise.name for enterprise in self.user.enterprises.get(filter=expression)], expected)
+        self.assertEqual(self.user.enterprises.get_count(filter='enterprise-8'), 1)
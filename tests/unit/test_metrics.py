@@ -0,0 +1,132 @@
+# -*- coding:utf-8 -*-
+
+import os
+
+from unittest import TestCase
+from mock import patch, MagicMock
+
+import requests
+
+from bambou import NURESTMetrics, NURESTRequest, BambouConfig
+from tests import start_session
+from tests.models import Enterprise, User
+from tests.utils import MockUtils
+
+
+class MetricsTests(TestCase):
+
+    def test_disabled_by_default(self):
+        """ Metrics are not collected unless enabled """
+
+        if os.environ.get('BAMBOU_METRICS'):
+            self.skipTest('BAMBOU_METRICS is set')
+
+        self.assertFalse(NURESTMetrics.is_enabled())
+
+    def test_counters_and_gauges(self):
+        """ Counters and gauges are stored by labels """
+
+        metrics = NURESTMetrics()
+        metrics.increment('requests', method='GET')
+        metrics.increment('requests', 2, method='GET')
+        metrics.increment('requests', method='PUT')
+        metrics.add_to_gauge('in_flight', 1)
+        metrics.add_to_gauge('in_flight', -1)
+        metrics.set_gauge('queued', 4)
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual(snapshot['counters']['requests'], {(('method', 'GET'),): 3, (('method', 'PUT'),): 1})
+        self.assertEqual(snapshot['gauges'], {'in_flight': {(): 0}, 'queued': {(): 4}})
+
+    def test_histogram(self):
+        """ Histograms have cumulative buckets """
+
+        metrics = NURESTMetrics()
+        metrics.observe('latency', 0.5, buckets=(1, 2, float('inf')))
+        metrics.observe('latency', 1.5, buckets=(1, 2, float('inf')))
+        metrics.observe('latency', 5, buckets=(1, 2, float('inf')))
+
+        histogram = metrics.snapshot()['histograms']['latency'][()]
+
+        self.assertEqual(histogram['buckets'], [(1, 1), (2, 2), (float('inf'), 3)])
+        self.assertEqual(histogram['sum'], 7)
+        self.assertEqual(histogram['count'], 3)
+
+    def test_collectors(self):
+        """ Collectors are called before reading """
+
+        metrics = NURESTMetrics()
+        collector = lambda registry: registry.set_gauge('collected', 1)
+        metrics.add_collector(collector)
+
+        self.assertEqual(metrics.snapshot()['gauges']['collected'], {(): 1})
+
+        metrics.remove_collector(collector)
+
+    def test_to_text(self):
+        """ Text exposition format """
+
+        metrics = NURESTMetrics()
+        metrics.increment('requests', method='GET', status='200')
+        metrics.observe('latency', 0.5, buckets=(1, float('inf')))
+
+        self.assertEqual(metrics.to_text(), '# TYPE requests counter\n'
+                                            'requests{method="GET",status="200"} 1\n'
+                                            '# TYPE latency histogram\n'
+                                            'latency_bucket{le="1"} 1\n'
+                                            'latency_bucket{le="+Inf"} 1\n'
+                                            'latency_sum 0.5\n'
+                                            'latency_count 1\n')
+
+
+class MetricsConnectionTests(TestCase):
+
+    def setUp(self):
+        start_session()
+        BambouConfig.set_metrics_enabled(True)
+        self.metrics = NURESTMetrics.get_default_metrics()
+        self.metrics.reset()
+
+    def tearDown(self):
+        BambouConfig.set_metrics_enabled(False)
+
+    def test_fetch_metrics(self):
+        """ Fetching populates request and fetch metrics """
+
+        user = User()
+        mock = MockUtils.create_mock_response(status_code=200, data=[Enterprise(id='1'), Enterprise(id='2')])
+
+        with patch('requests.request', mock):
+            user.enterprises.fetch()
+
+        snapshot = self.metrics.snapshot()
+        labels = (('method', 'GET'), ('resource', 'enterprises'))
+
+        self.assertEqual(snapshot['counters']['bambou_http_requests_total'], {labels + (('status', '200'),): 1})
+        self.assertEqual(snapshot['counters']['bambou_fetched_objects_total'], {(('resource', 'enterprises'),): 2})
+        self.assertEqual(snapshot['histograms']['bambou_http_request_duration_seconds'][labels]['count'], 1)
+        self.assertTrue(snapshot['histograms']['bambou_http_response_size_bytes'][labels]['sum'] > 0)
+        self.assertEqual(snapshot['gauges']['bambou_http_requests_in_flight'], {(): 0})
+
+    def test_timeout_metrics(self):
+        """ Timeouts are counted """
+
+        mock = MagicMock(side_effect=requests.exceptions.Timeout())
+
+        with patch('requests.request', mock):
+            Enterprise(id='4').send_request(request=NURESTRequest(method='GET', url='https://vsd:8443/api/v3_2/enterprises/4'))
+
+        self.assertEqual(self.metrics.snapshot()['counters']['bambou_http_timeouts_total'], {(('method', 'GET'), ('resource', 'enterprises')): 1})
+
+    def test_disabled_metrics(self):
+        """ Metrics are not collected when disabled """
+
+        BambouConfig.set_metrics_enabled(False)
+        user = User()
+        mock = MockUtils.create_mock_response(status_code=200, data=[])
+
+        with patch('requests.request', mock):
+            user.enterprises.fetch()
+
+        self.assertEqual(self.metrics.snapshot()['counters'], {})
@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+from mock import patch, MagicMock
+
+import requests
+
+from bambou import NURESTMiddleware, NURESTRequest, NURESTResponse
+from tests import start_session
+from tests.models import Enterprise
+from tests.utils import MockUtils
+
+
+class RecordingMiddleware(NURESTMiddleware):
+
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def pre_send(self, connection):
+        self.calls.append((self.name, 'pre_send', connection.request.method, connection.transaction_id))
+
+    def post_receive(self, connection, elapsed):
+        self.calls.append((self.name, 'post_receive', connection.response.status_code, connection.transaction_id))
+
+    def on_error(self, connection, exception, elapsed):
+        self.calls.append((self.name, 'on_error', exception.__class__.__name__, connection.transaction_id))
+
+    def on_timeout(self, connection, elapsed):
+        self.calls.append((self.name, 'on_timeout', None, connection.transaction_id))
+
+
+class CachingMiddleware(NURESTMiddleware):
+
+    def pre_send(self, connection):
+        return NURESTResponse(status_code=200, headers={}, data=[{'ID': '4', 'description': 'cached'}])
+
+
+class HeaderMiddleware(NURESTMiddleware):
+
+    def pre_send(self, connection):
+        connection.request.set_header('X-Trace', 'trace')
+
+
+class MiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.session = start_session()
+        self.calls = list()
+
+    def test_add_remove_middleware(self):
+        """ Middlewares can be added once and removed """
+
+        middleware = NURESTMiddleware()
+
+        self.session.add_middleware(middleware)
+        self.session.add_middleware(middleware)
+        self.assertEqual(self.session.middlewares, (middleware,))
+
+        self.session.remove_middleware(middleware)
+        self.assertEqual(self.session.middlewares, ())
+
+    def test_hooks_order(self):
+        """ Middlewares are called in order before sending, and in reverse order after receiving """
+
+        self.session.add_middleware(RecordingMiddleware('first', self.calls))
+        self.session.add_middleware(RecordingMiddleware('second', self.calls))
+
+        mock = MockUtils.create_mock_response(status_code=200, data=[Enterprise(id='4')])
+
+        with patch('requests.request', mock):
+            (obj, connection) = Enterprise(id='4').fetch()
+
+        transaction_id = connection.transaction_id
+
+        self.assertEqual(self.calls, [('first', 'pre_send', 'GET', transaction_id),
+                                      ('second', 'pre_send', 'GET', transaction_id),
+                                      ('second', 'post_receive', 200, transaction_id),
+                                      ('first', 'post_receive', 200, transaction_id)])
+
+    def test_on_error(self):
+        """ Errors are reported to middlewares """
+
+        self.session.add_middleware(RecordingMiddleware('first', self.calls))
+
+        mock = MagicMock(side_effect=requests.exceptions.ConnectionError())
+
+        with patch('requests.request', mock):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                Enterprise(id='4').fetch()
+
+        self.assertEqual(self.calls[-1][1:3], ('on_error', 'ConnectionError'))
+
+    def test_on_timeout(self):
+        """ Timeouts are reported to middlewares """
+
+        self.session.add_middleware(RecordingMiddleware('first', self.calls))
+
+        mock = MagicMock(side_effect=requests.exceptions.Timeout())
+
+        with patch('requests.request', mock):
+            Enterprise(id='4').send_request(request=NURESTRequest(method='GET', url='https://vsd:8443/api/v3_2/enterprises/4'))
+
+        self.assertEqual(self.calls[-1][1], 'on_timeout')
+
+    def test_pre_send_response(self):
+        """ Responses returned by pre_send are used instead of sending the request """
+
+        self.session.add_middleware(CachingMiddleware())
+        mock = MockUtils.create_mock_response(status_code=200, data=[])
+
+        with patch('requests.request', mock):
+            (obj, connection) = Enterprise(id='4').fetch()
+
+        self.assertFalse(mock.called)
+        self.assertEqual(obj.description, 'cached')
+
+    def test_pre_send_modify_request(self):
+        """ Requests can be modified by pre_send """
+
+        self.session.add_middleware(HeaderMiddleware())
+        mock = MockUtils.create_mock_response(status_code=200, data=[])
+
+        with patch('requests.request', mock):
+            Enterprise(id='4').fetch()
+
+        self.assertEqual(MockUtils.get_mock_parameter(mock, 'headers')['X-Trace'], 'trace')
@@ -0,0 +1,147 @@
+# -*- coding:utf-8 -*-
+
+from time import sleep, time
+from unittest import TestCase
+
+from bambou import NURESTModelController, NURESTMirror
+from bambou.testing import NURESTStandInServer
+from tests import start_session
+from tests.models import Enterprise, Group, Employee, NURESTTestSession
+
+
+def make_enterprise(id, name):
+    """ Creates an enterprise with an id """
+
+    enterprise = Enterprise(id=id)
+    enterprise.name = name
+    return enterprise
+
+
+class MirrorTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        start_session()
+        NURESTModelController.register_model(Enterprise)
+
+    def setUp(self):
+        self.mirror = NURESTMirror()
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def test_add_and_query(self):
+        """ Mirrored objects are queried with their local attribute names """
+
+        enterprises = [make_enterprise('e%s' % index, 'enterprise-%s' % index) for index in range(5)]
+        enterprises[3].groups = ['A', 'B']
+
+        self.assertEqual(self.mirror.add(enterprises + [Enterprise()]), 5)
+        self.assertEqual(self.mirror.rest_names, ['enterprise'])
+        self.assertEqual(self.mirror.count(Enterprise), 5)
+        self.assertEqual(self.mirror.count('enterprise', where='name > ?', parameters=('enterprise-2',)), 2)
+
+        results = self.mirror.query(Enterprise, where='name LIKE ?', parameters=('%-3',))
+
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], Enterprise)
+        self.assertEqual(results[0].id, 'e3')
+        self.assertEqual(results[0].groups, ['A', 'B'])
+        self.assertFalse(results[0].is_dirty)
+
+        names = [enterprise.name for enterprise in self.mirror.query('enterprise', order_by='name DESC', limit=2)]
+        self.assertEqual(names, ['enterprise-4', 'enterprise-3'])
+
+    def test_replace_and_remove(self):
+        """ Objects with the same id are replaced, and can be removed """
+
+        self.mirror.add([make_enterprise('e1', 'first'), make_enterprise('e2', 'second')])
+        self.mirror.add([make_enterprise('e1', 'renamed')])
+
+        self.assertEqual(self.mirror.get(Enterprise, 'e1').name, 'renamed')
+        self.assertEqual(self.mirror.remove(Enterprise, ['e2', 'unknown']), 1)
+        self.assertIsNone(self.mirror.get(Enterprise, 'e2'))
+        self.assertEqual(self.mirror.remove(Group, ['g1']), 0)
+
+        self.mirror.clear()
+        self.assertEqual(self.mirror.rest_names, [])
+        self.assertEqual(self.mirror.query(Enterprise), [])
+
+    def test_push_events(self):
+        """ Push events are applied to the mirror """
+
+        self.mirror.add([make_enterprise('e1', 'first'), make_enterprise('e2', 'second')])
+        self.mirror.did_receive_push({'events': [
+            {'type': 'UPDATE', 'entityType': 'enterprise', 'entities': [{'ID': 'e1', 'name': 'updated'}]},
+            {'type': 'CREATE', 'entityType': 'enterprise', 'entities': [{'ID': 'e3', 'name': 'third'}]},
+            {'type': 'DELETE', 'entityType': 'enterprise', 'entities': [{'ID': 'e2', 'name': 'second'}]},
+            {'type': 'CREATE', 'entityType': 'unknown', 'entities': [{'ID': 'u1'}]}]})
+
+        self.assertEqual([(enterprise.id, enterprise.name) for enterprise in self.mirror.query(Enterprise, order_by='id')], [('e1', 'updated'), ('e3', 'third')])
+
+
+class MirrorFetchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for model in (Enterprise, Group, Employee):
+            NURESTModelController.register_model(model)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index} for index in range(5)])
+
+        groups = self.server.add_objects('groups', [{'name': 'group-%s' % index} for index in range(2)])
+        self.server.add_objects('users', [{'firstname': 'employee-%s' % index} for index in range(3)], parent_id=groups[0]['ID'])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+        self.mirror = NURESTMirror()
+        self.session.mirror = self.mirror
+
+    def tearDown(self):
+        self.mirror.close()
+        self.server.stop()
+
+    def test_committed_fetches(self):
+        """ Committed fetches are mirrored """
+
+        self.user.enterprises.fetch()
+        self.user.groups.fetch(commit=False)
+
+        self.assertEqual(self.mirror.count(Enterprise), 5)
+        self.assertEqual(self.mirror.count(Group), 0)
+
+    def test_fetch_tree(self):
+        """ Fetched trees are mirrored """
+
+        self.user.fetch_tree(child_types=['group', 'user'])
+        group = self.user.groups[0]
+
+        self.assertEqual(self.mirror.count(Group), 2)
+        self.assertEqual(self.mirror.count(Employee, where='parent_id = ?', parameters=(group.id,)), 3)
+
+    def test_push_center(self):
+        """ Changes received by the push center are mirrored """
+
+        self.user.enterprises.fetch()
+        self.mirror.start_listening(self.session.push_center)
+        self.session.push_center.start()
+
+        try:
+            enterprise = self.user.enterprises[0]
+            enterprise.name = 'renamed'
+            enterprise.save()
+
+            timeout = time() + 5
+
+            while self.mirror.count(Enterprise, where='name = ?', parameters=('renamed',)) == 0 and time() < timeout:
+                sleep(0.05)
+
+            self.assertEqual(self.mirror.get(Enterprise, enterprise.id).name, 'renamed')
+
+        finally:
+            self.mirror.stop_listening()
+            self.session.push_center.stop()
+            sleep(0.2)  # let the last long polling request end before stopping the server
@@ -0,0 +1,239 @@
+# -*- coding:utf-8 -*-
+
+import os
+
+from unittest import TestCase
+
+from bambou import NURESTModelController, NURESTObjectStore
+from bambou.exceptions import InternalConsitencyError
+from bambou.testing import NURESTStandInServer
+from tests import start_session
+from tests.models import Enterprise, Group, Employee, User, NURESTTestSession
+
+
+class ObjectStoreTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        start_session()
+
+    def setUp(self):
+        self.store = NURESTObjectStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_put_and_get(self):
+        """ Stored objects are read back by id and by parent """
+
+        for index in range(3):
+            enterprise = Enterprise(id='e%s' % index)
+            enterprise.name = 'enterprise-%s' % index
+            self.store.put(enterprise, parent_id='root')
+
+        self.assertEqual(len(self.store), 3)
+        self.assertIn('e1', self.store)
+        self.assertEqual(self.store.get_dict('e1', 'root', 'enterprise')['name'], 'enterprise-1')
+        self.assertIsNone(self.store.get_dict('unknown', 'root', 'enterprise'))
+        self.assertEqual(self.store.get_ids('root', 'enterprise'), ['e0', 'e1', 'e2'])
+        self.assertEqual(self.store.count('root', 'enterprise'), 3)
+        self.assertTrue(self.store.has_child('e2', 'root', 'enterprise'))
+        self.assertEqual(self.store.get_id(1, 'root', 'enterprise'), 'e1')
+        self.assertEqual(self.store.get_id(slice(1, None), 'root', 'enterprise'), ['e1', 'e2'])
+        self.assertEqual(self.store.get_index('e2', 'root', 'enterprise'), 2)
+        self.assertIsNone(self.store.get_index('e2', 'other', 'enterprise'))
+
+    def test_replace_remove_and_compact(self):
+        """ Replaced and removed objects are not read anymore, and compact reclaims their space """
+
+        enterprise = Enterprise(id='e1')
+        enterprise.name = 'first'
+        self.store.put(enterprise, parent_id='root')
+        self.store.get_dict('e1', 'root', 'enterprise')
+
+        enterprise.name = 'second'
+        self.store.put(enterprise, parent_id='root')
+        self.store.put(Enterprise(id='e2'), parent_id='root')
+
+        self.assertEqual(self.store.get_dict('e1', 'root', 'enterprise')['name'], 'second')
+        self.assertEqual(self.store.get_ids('root', 'enterprise'), ['e1', 'e2'])
+
+        self.assertTrue(self.store.remove('e2', 'root', 'enterprise'))
+        self.assertFalse(self.store.remove('e2', 'root', 'enterprise'))
+
+        size = self.store.size
+        self.store.compact()
+
+        self.assertLess(self.store.size, size)
+        self.assertEqual(self.store.get_dict('e1', 'root', 'enterprise')['name'], 'second')
+        self.assertEqual(self.store.get_ids('root', 'enterprise'), ['e1'])
+
+    def test_same_object_under_two_parents(self):
+        """ An object can be the child of several parents """
+
+        enterprise = Enterprise(id='e1')
+        enterprise.name = 'shared'
+        self.store.put(enterprise, parent_id='root')
+        self.store.put(enterprise, parent_id='other')
+        self.store.put(enterprise, parent_id='root')
+
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.get_ids('root', 'enterprise'), ['e1'])
+        self.assertEqual(self.store.get_ids('other', 'enterprise'), ['e1'])
+
+        self.assertTrue(self.store.remove('e1', 'root', 'enterprise'))
+        self.assertIn('e1', self.store)
+        self.assertEqual(self.store.get_dict('e1', 'other', 'enterprise')['name'], 'shared')
+
+        self.store.clear_children('other', 'enterprise')
+        self.assertNotIn('e1', self.store)
+
+    def test_object_without_id(self):
+        """ Objects without id cannot be stored """
+
+        with self.assertRaises(InternalConsitencyError):
+            self.store.put(Enterprise())
+
+    def test_temporary_file(self):
+        """ Temporary store files are removed on close """
+
+        with NURESTObjectStore() as store:
+            path = store.path
+            self.assertTrue(os.path.exists(path))
+
+        self.assertFalse(os.path.exists(path))
+
+    def test_fetcher_backed_by_store(self):
+        """ Fetcher contents can be moved to a store and back """
+
+        user = User()
+        user.enterprises.append(Enterprise(id='e1', name='one'))
+        user.enterprises.store = self.store
+
+        self.assertEqual(list.__len__(user.enterprises), 0)
+        self.assertEqual(len(user.enterprises), 1)
+
+        user.enterprises.append(Enterprise(id='e2', name='two'))
+        user.enterprises.append(Enterprise(id='e3', name='three'))
+
+        self.assertEqual([enterprise.id for enterprise in user.enterprises], ['e1', 'e2', 'e3'])
+        self.assertEqual(user.enterprises[-1].id, 'e3')
+        self.assertEqual([enterprise.id for enterprise in user.enterprises[1:]], ['e2', 'e3'])
+        self.assertIn(Enterprise(id='e2'), user.enterprises)
+        self.assertEqual(user.enterprises.index(Enterprise(id='e2')), 1)
+
+        user.enterprises.remove(Enterprise(id='e2'))
+        self.assertEqual(len(user.enterprises), 2)
+
+        user.enterprises.store = None
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual([enterprise.id for enterprise in user.enterprises], ['e1', 'e3'])
+
+        user.enterprises.store = self.store
+        user.enterprises.flush()
+        self.assertEqual(len(self.store), 0)
+
+    def test_fetchers_sharing_objects(self):
+        """ Fetchers sharing a store keep their own children """
+
+        groups = [Group(id='g1'), Group(id='g2')]
+
+        for group in groups:
+            group.employees.store = self.store
+            group.employees.append(Employee(id='shared'))
+
+        groups[0].employees.append(Employee(id='other'))
+        groups[1].employees.append(Employee(id='shared'))
+
+        self.assertEqual([employee.id for employee in groups[0].employees], ['shared', 'other'])
+        self.assertEqual([employee.id for employee in groups[1].employees], ['shared'])
+
+        groups[1].employees.remove(Employee(id='shared'))
+        self.assertEqual(groups[0].employees.index(Employee(id='shared')), 0)
+        self.assertEqual(len(groups[1].employees), 0)
+
+    def test_fetcher_list_operations(self):
+        """ Item assignment, deletion, pop, sort and reverse go through the store """
+
+        user = User()
+        user.groups.store = self.store
+
+        for index in range(4):
+            group = Group(id='g%s' % index)
+            group.name = 'group-%s' % index
+            user.groups.append(group)
+
+        group = Group(id='g1')
+        group.name = 'renamed'
+        user.update_child(group)
+        self.assertEqual(user.groups[1].name, 'renamed')
+
+        del user.groups[0]
+        self.assertEqual([group.id for group in user.groups], ['g1', 'g2', 'g3'])
+
+        self.assertEqual(user.groups.pop().id, 'g3')
+        self.assertEqual(len(user.groups), 2)
+
+        user.groups.reverse()
+        self.assertEqual([group.id for group in user.groups], ['g2', 'g1'])
+
+        user.groups.sort(key=lambda group: group.id)
+        self.assertEqual([group.id for group in user.groups], ['g1', 'g2'])
+        self.assertEqual([group.id for group in reversed(user.groups)], ['g2', 'g1'])
+
+        user.groups[:] = [Group(id='g5')]
+        self.assertEqual(self.store.get_ids(None, 'group'), ['g5'])
+        self.assertEqual(list.__len__(user.groups), 0)
+
+
+class ObjectStoreFetchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for model in (Enterprise, Group, Employee):
+            NURESTModelController.register_model(model)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index} for index in range(5)])
+
+        groups = self.server.add_objects('groups', [{'name': 'group-%s' % index} for index in range(2)])
+        self.server.add_objects('users', [{'firstname': 'employee-%s' % index} for index in range(3)], parent_id=groups[1]['ID'])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+        self.store = NURESTObjectStore()
+
+    def tearDown(self):
+        self.store.close()
+        self.server.stop()
+
+    def test_fetch_into_store(self):
+        """ Fetched objects are committed to the store """
+
+        self.user.enterprises.store = self.store
+        self.user.enterprises.fetch()
+
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(list.__len__(self.user.enterprises), 0)
+        self.assertEqual([enterprise.name for enterprise in self.user.enterprises], ['enterprise-%s' % index for index in range(5)])
+        self.assertFalse(self.user.enterprises[0].is_dirty)
+
+        self.user.enterprises.fetch(filter='name == "enterprise-1"')
+
+        self.assertEqual([enterprise.name for enterprise in self.user.enterprises], ['enterprise-1'])
+        self.assertEqual(len(self.store), 1)
+
+    def test_fetch_tree_into_store(self):
+        """ Fetched trees can be kept in a store """
+
+        self.user.groups.store = self.store
+        self.user.fetch_tree(child_types=['group'])
+
+        group = self.user.groups[1]
+        group.employees.store = self.store
+        group.employees.fetch()
+
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(self.store.count(group.id, 'user'), 3)
@@ -0,0 +1,148 @@
+# -*- coding:utf-8 -*-
+
+import json
+import os
+import pstats
+import signal
+import tempfile
+
+from unittest import TestCase
+from mock import patch
+
+from bambou import NURESTProfiler, BambouConfig
+from bambou.config import _parse_sample_rate
+from bambou.exceptions import InternalConsitencyError
+from tests import start_session
+from tests.models import Enterprise, User
+from tests.utils import MockUtils
+
+
+class ProfilerTests(TestCase):
+
+    def setUp(self):
+        start_session()
+        self.profiler = NURESTProfiler.get_default_profiler()
+        self.profiler.reset()
+        self.mock = MockUtils.create_mock_response(status_code=200, data=[Enterprise(id='1'), Enterprise(id='2')])
+
+    def tearDown(self):
+        BambouConfig.set_profiling_enabled(False, sample_rate=1)
+
+    def _make_temporary_path(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        return path
+
+    def test_record(self):
+        """ Timing is aggregated by phase """
+
+        profiler = NURESTProfiler()
+        profiler.record('phase', 2.0)
+        profiler.record('phase', 1.0)
+        profiler.record('phase', 3.0)
+
+        self.assertEqual(profiler.get_stats(), {'phase': {'count': 3, 'total': 6.0, 'min': 1.0, 'max': 3.0, 'mean': 2.0}})
+
+    def test_disabled_profiling(self):
+        """ Nothing is recorded when profiling is disabled """
+
+        user = User()
+
+        with patch('requests.request', self.mock):
+            user.enterprises.fetch()
+
+        self.assertEqual(self.profiler.get_stats(), {})
+
+    def test_profile_block(self):
+        """ Hot paths are timed inside a profile block """
+
+        user = User()
+
+        with patch('requests.request', self.mock):
+            with NURESTProfiler.profile() as profiler:
+                user.enterprises.fetch()
+                user.enterprises[0].to_dict()
+
+        stats = profiler.get_stats()
+
+        self.assertFalse(BambouConfig._profiling_enabled)
+        self.assertEqual(sorted(stats.keys()), ['did_fetch', 'from_dict', 'http', 'json_decode', 'to_dict'])
+        self.assertEqual(stats['did_fetch']['count'], 1)
+        self.assertEqual(stats['http']['count'], 1)
+        self.assertTrue(stats['from_dict']['count'] >= 2)
+
+    def test_sample_rate(self):
+        """ Calls out of the sample are not timed """
+
+        with NURESTProfiler.profile(sample_rate=0):
+            Enterprise(id='1').to_dict()
+
+        self.assertEqual(self.profiler.get_stats(), {})
+
+    def test_parse_sample_rate(self):
+        """ Malformed or out of range sample rates are ignored or clamped """
+
+        self.assertEqual(_parse_sample_rate(None), 1.0)
+        self.assertEqual(_parse_sample_rate('often'), 1.0)
+        self.assertEqual(_parse_sample_rate('nan'), 1.0)
+        self.assertEqual(_parse_sample_rate('0.25'), 0.25)
+        self.assertEqual(_parse_sample_rate('-1'), 0.0)
+        self.assertEqual(_parse_sample_rate('10'), 1.0)
+
+    def test_cprofile(self):
+        """ cProfile stats are written when leaving the block """
+
+        path = self._make_temporary_path()
+
+        with NURESTProfiler.profile(cprofile_path=path):
+            Enterprise(id='1').to_dict()
+
+        functions = [function for (filename, line, function) in pstats.Stats(path).stats]
+
+        self.assertIn('to_dict', functions)
+
+    def test_signal_handler_without_sigusr2(self):
+        """ A signal must be given on platforms without SIGUSR2 """
+
+        with patch('bambou.nurest_profiler.signal', spec=[]):
+            with self.assertRaises(InternalConsitencyError):
+                NURESTProfiler.install_signal_handler()
+
+    def test_dump_stats_at_exit(self):
+        """ Stats are written at exit only if profiling is enabled """
+
+        path = self._make_temporary_path()
+
+        with patch('atexit.register') as register:
+            NURESTProfiler.dump_stats_at_exit(path)
+
+        dump_stats = register.call_args[0][0]
+
+        with NURESTProfiler.profile():
+            Enterprise(id='1').to_dict()
+            dump_stats()
+
+        with open(path) as f:
+            self.assertEqual(json.load(f)['to_dict']['count'], 1)
+
+    def test_signal_handler(self):
+        """ Signals toggle profiling and dump the stats """
+
+        path = self._make_temporary_path()
+        previous_handler = signal.getsignal(signal.SIGUSR2)
+        self.addCleanup(signal.signal, signal.SIGUSR2, previous_handler)
+
+        NURESTProfiler.install_signal_handler(stats_path=path)
+
+        os.kill(os.getpid(), signal.SIGUSR2)
+        self.assertTrue(BambouConfig._profiling_enabled)
+
+        Enterprise(id='1').to_dict()
+
+        os.kill(os.getpid(), signal.SIGUSR2)
+        self.assertFalse(BambouConfig._profiling_enabled)
+
+        with open(path) as f:
+            self.assertEqual(json.load(f)['to_dict']['count'], 1)
@@ -0,0 +1,108 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+from mock import patch
+
+from bambou import NURESTRateLimiter
+from bambou.exceptions import BambouRateLimitError
+from bambou.utils.resource_path import get_resource_name, get_resource_path_template
+from tests import start_session
+from tests.models import Enterprise
+from tests.utils import MockUtils
+
+
+class ResourcePathTests(TestCase):
+
+    def test_resource_name(self):
+        """ Get resource name from url """
+
+        base_url = 'https://vsd:8443/api/v3_2'
+
+        self.assertEqual(get_resource_name('https://vsd:8443/api/v3_2/enterprises', base_url), 'enterprises')
+        self.assertEqual(get_resource_name('https://vsd:8443/api/v3_2/enterprises/xxx', base_url), 'enterprises')
+        self.assertEqual(get_resource_name('https://vsd:8443/api/v3_2/enterprises/xxx/domains?responseChoice=1', base_url), 'domains')
+        self.assertEqual(get_resource_name('https://vsd:8443/api/v3_2', base_url), None)
+
+    def test_resource_path_template(self):
+        """ Get resource path template from url """
+
+        self.assertEqual(get_resource_path_template('https://vsd:8443/api/v3_2/enterprises/xxx/domains', 'https://vsd:8443/api/v3_2'), 'enterprises/{id}/domains')
+
+
+class RateLimiterTests(TestCase):
+
+    def test_burst_then_wait(self):
+        """ Requests wait when the burst is consumed """
+
+        limiter = NURESTRateLimiter(rate=1000, burst=2)
+
+        with patch('bambou.nurest_rate_limiter.sleep') as sleep:
+            self.assertEqual(limiter.acquire(), 0)
+            self.assertEqual(limiter.acquire(), 0)
+            self.assertTrue(limiter.acquire() > 0)
+
+        self.assertEqual(sleep.call_count, 1)
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['waits'], 1)
+        self.assertTrue(stats['wait_time'] > 0)
+
+    def test_non_blocking(self):
+        """ Non blocking limiter raises """
+
+        limiter = NURESTRateLimiter(rate=0.001, blocking=False)
+        limiter.acquire()
+
+        with self.assertRaises(BambouRateLimitError):
+            limiter.acquire()
+
+        self.assertEqual(limiter.get_stats()['rejected'], 1)
+
+    def test_max_wait(self):
+        """ Blocking limiter raises when wait is too long """
+
+        limiter = NURESTRateLimiter(rate=0.001, max_wait=1)
+        limiter.acquire()
+
+        with self.assertRaises(BambouRateLimitError):
+            limiter.acquire()
+
+    def test_resource_rates(self):
+        """ Resource overrides have their own bucket """
+
+        limiter = NURESTRateLimiter(rate=None, resource_rates={'domains': 0.001})
+
+        limiter.acquire('domains')
+        limiter.acquire('enterprises')
+        limiter.acquire('enterprises')
+
+        with patch('bambou.nurest_rate_limiter.sleep') as sleep:
+            limiter.acquire('domains')
+
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(limiter.get_stats()['resources']['domains']['waits'], 1)
+        self.assertEqual(limiter.get_stats()['requests'], 4)
+
+
+class RateLimiterConnectionTests(TestCase):
+
+    def setUp(self):
+        self.session = start_session()
+        self.session.rate_limiter = NURESTRateLimiter(rate=None, resource_rates={'enterprises': 0.001}, blocking=False)
+
+    def tearDown(self):
+        self.session.rate_limiter = None
+
+    def test_limit_resource(self):
+        """ GET is not sent when rate is reached """
+
+        mock = MockUtils.create_mock_response(status_code=200, data=Enterprise(id='4'))
+
+        with patch('requests.request', mock):
+            Enterprise(id='4').fetch()
+
+            with self.assertRaises(BambouRateLimitError):
+                Enterprise(id='4').fetch()
+
+        self.assertEqual(mock.call_count, 1)
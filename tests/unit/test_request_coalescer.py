@@ -0,0 +1,179 @@
+# -*- coding:utf-8 -*-
+
+import threading
+import time
+
+from unittest import TestCase
+from mock import patch
+
+from bambou import NURESTCircuitBreaker, NURESTRequestCoalescer, NURESTRequest
+from bambou.nurest_session import _NURESTSessionCurrentContext
+from tests import start_session
+from tests.models import Enterprise
+from tests.utils import MockUtils
+
+
+class RequestCoalescerTests(TestCase):
+
+    def test_get_key(self):
+        """ Keys depend on url, params and headers """
+
+        request1 = NURESTRequest(method='GET', url='https://vsd/enterprises', filter='name == "a"')
+        request2 = NURESTRequest(method='GET', url='https://vsd/enterprises', filter='name == "a"')
+        request3 = NURESTRequest(method='GET', url='https://vsd/enterprises', filter='name == "b"')
+        request4 = NURESTRequest(method='HEAD', url='https://vsd/enterprises', filter='name == "a"')
+
+        self.assertEqual(NURESTRequestCoalescer.get_key(request1), NURESTRequestCoalescer.get_key(request2))
+        self.assertNotEqual(NURESTRequestCoalescer.get_key(request1), NURESTRequestCoalescer.get_key(request3))
+        self.assertNotEqual(NURESTRequestCoalescer.get_key(request1), NURESTRequestCoalescer.get_key(request4))
+
+    def test_perform_concurrent_calls(self):
+        """ Concurrent identical calls are performed once """
+
+        coalescer = NURESTRequestCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+        calls = list()
+        results = list()
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return 'result'
+
+        def perform():
+            results.append(coalescer.perform('key', function))
+
+        leader = threading.Thread(target=perform)
+        leader.start()
+        started.wait()
+
+        followers = [threading.Thread(target=perform) for i in range(3)]
+
+        for follower in followers:
+            follower.start()
+
+        while coalescer.get_stats()['coalesced'] < 3:
+            pass
+
+        release.set()
+
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['result'] * 4)
+        self.assertEqual(coalescer.get_stats(), {'requests': 4, 'coalesced': 3, 'in_flight': 0})
+
+    def test_perform_exception(self):
+        """ Exceptions are raised and the call is removed """
+
+        coalescer = NURESTRequestCoalescer()
+
+        def function():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            coalescer.perform('key', function)
+
+        self.assertEqual(coalescer.perform('key', lambda: 'result'), 'result')
+
+
+class RequestCoalescerConnectionTests(TestCase):
+
+    def setUp(self):
+        self.session = start_session()
+        self.session.request_coalescer = NURESTRequestCoalescer()
+
+    def tearDown(self):
+        self.session.request_coalescer = None
+
+    def test_sequential_requests(self):
+        """ Sequential GET are not coalesced """
+
+        mock = MockUtils.create_mock_response(status_code=200, data=Enterprise(id='4'))
+
+        with patch('requests.request', mock):
+            Enterprise(id='4').fetch()
+            Enterprise(id='4').fetch()
+
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(self.session.request_coalescer.get_stats()['coalesced'], 0)
+
+    def test_concurrent_requests(self):
+        """ Concurrent GET share the same response """
+
+        response = MockUtils.create_mock_response(status_code=200, data=[Enterprise(id='4', description='desc')]).return_value
+        release = threading.Event()
+        calls = list()
+        enterprises = [Enterprise(id='4') for i in range(4)]
+
+        def request(**kwargs):
+            calls.append(1)
+            release.wait()
+            return response
+
+        def fetch(enterprise):
+            _NURESTSessionCurrentContext.session = self.session
+            enterprise.fetch()
+
+        with patch('requests.request', request):
+            threads = [threading.Thread(target=fetch, args=(enterprise,)) for enterprise in enterprises]
+
+            for thread in threads:
+                thread.start()
+
+            while self.session.request_coalescer.get_stats()['requests'] < 4:
+                pass
+
+            release.set()
+
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([enterprise.description for enterprise in enterprises], ['desc'] * 4)
+
+    def test_concurrent_requests_with_half_open_circuit(self):
+        """ Concurrent GET share the single trial of a half open circuit and get their own response """
+
+        self.session.circuit_breaker = NURESTCircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        self.addCleanup(setattr, self.session, 'circuit_breaker', None)
+        self.session.circuit_breaker.record_failure('GET enterprises/{id}')
+
+        response = MockUtils.create_mock_response(status_code=200, data=[Enterprise(id='4', description='desc')]).return_value
+        release = threading.Event()
+        calls = list()
+        responses = list()
+        enterprises = [Enterprise(id='4') for i in range(4)]
+
+        def request(**kwargs):
+            calls.append(1)
+            release.wait()
+            return response
+
+        def fetch(enterprise):
+            _NURESTSessionCurrentContext.session = self.session
+            responses.append(enterprise.fetch()[1].response)
+
+        with patch('requests.request', request):
+            threads = [threading.Thread(target=fetch, args=(enterprise,)) for enterprise in enterprises]
+
+            for thread in threads:
+                thread.start()
+
+            deadline = time.time() + 5
+
+            while self.session.request_coalescer.get_stats()['requests'] < 4 and time.time() < deadline:
+                pass
+
+            release.set()
+
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([enterprise.description for enterprise in enterprises], ['desc'] * 4)
+        self.assertEqual(len(set(id(response) for response in responses)), 4)
+        self.assertEqual(self.session.circuit_breaker.get_state('GET enterprises/{id}'), 'closed')
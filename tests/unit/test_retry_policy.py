@@ -0,0 +1,134 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+from mock import patch, MagicMock
+
+import requests
+
+from bambou import NURESTRetryPolicy
+from bambou.exceptions import BambouHTTPError
+from tests import start_session
+from tests.models import Enterprise
+from tests.utils import MockUtils
+
+
+class RetryPolicyTests(TestCase):
+
+    def test_retry_delay(self):
+        """ Retry delay of retryable responses """
+
+        policy = NURESTRetryPolicy(max_attempts=3, backoff_factor=1, jitter=False)
+
+        self.assertEqual(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(503)), 1)
+        self.assertEqual(policy.get_retry_delay('GET', 2, response=MockUtils.build_response(503)), 2)
+        self.assertIsNone(policy.get_retry_delay('GET', 3, response=MockUtils.build_response(503)))
+        self.assertEqual(policy.get_stats(), {'attempts': 0, 'retries': 2, 'give_ups': 1, 'budget_exhausted': 0})
+
+    def test_not_retryable(self):
+        """ Non idempotent methods and other status codes are not retried """
+
+        policy = NURESTRetryPolicy(jitter=False)
+
+        self.assertIsNone(policy.get_retry_delay('POST', 1, response=MockUtils.build_response(503)))
+        self.assertIsNone(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(404)))
+        self.assertIsNone(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(200)))
+        self.assertEqual(policy.give_ups, 0)
+
+    def test_retry_on_timeout(self):
+        """ Timeouts are retried unless disabled """
+
+        policy = NURESTRetryPolicy(backoff_factor=1, jitter=False)
+        self.assertEqual(policy.get_retry_delay('GET', 1, exception=requests.exceptions.Timeout()), 1)
+
+        policy = NURESTRetryPolicy(retry_on_timeout=False)
+        self.assertIsNone(policy.get_retry_delay('GET', 1, exception=requests.exceptions.Timeout()))
+
+    def test_retry_after(self):
+        """ Retry-After header is honored """
+
+        policy = NURESTRetryPolicy(backoff_factor=1, max_backoff=10, jitter=False)
+
+        self.assertEqual(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(503, {'Retry-After': '5'})), 5)
+        self.assertEqual(policy.get_stats(), {'attempts': 0, 'retries': 1, 'give_ups': 0, 'budget_exhausted': 0})
+
+        self.assertIsNone(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(503, {'Retry-After': '60'})))
+        self.assertEqual(policy.get_stats(), {'attempts': 0, 'retries': 1, 'give_ups': 1, 'budget_exhausted': 0})
+
+    def test_jitter(self):
+        """ Jitter keeps backoff in bounds """
+
+        policy = NURESTRetryPolicy(backoff_factor=1, max_backoff=3)
+
+        for attempt in range(1, 10):
+            self.assertTrue(0 <= policy.get_backoff(attempt) <= 3)
+
+    def test_budget(self):
+        """ Retries are limited by the budget """
+
+        policy = NURESTRetryPolicy(max_attempts=10, budget_ratio=0.5, budget_min_retries=1, jitter=False)
+
+        policy.did_attempt(1)
+        policy.did_attempt(1)
+        policy.did_attempt(1)
+        policy.did_attempt(1)
+
+        self.assertIsNotNone(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(503)))
+        self.assertIsNotNone(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(503)))
+        self.assertIsNone(policy.get_retry_delay('GET', 1, response=MockUtils.build_response(503)))
+        self.assertEqual(policy.budget_exhausted, 1)
+
+
+class RetryConnectionTests(TestCase):
+
+    def setUp(self):
+        self.session = start_session()
+        self.session.retry_policy = NURESTRetryPolicy(max_attempts=3, backoff_factor=0, jitter=False)
+
+    def tearDown(self):
+        self.session.retry_policy = None
+
+    def test_retry_until_success(self):
+        """ GET is sent again after a 503 """
+
+        mock = MagicMock(side_effect=[MockUtils.build_response(503), MockUtils.build_response(503), MockUtils.build_response(200)])
+
+        with patch('requests.request', mock):
+            (obj, connection) = Enterprise(id='4').fetch()
+
+        self.assertEqual(mock.call_count, 3)
+        self.assertEqual(connection.response.status_code, 200)
+        self.assertEqual(self.session.retry_policy.get_stats(), {'attempts': 3, 'retries': 2, 'give_ups': 0, 'budget_exhausted': 0})
+
+    def test_retry_give_up(self):
+        """ GET gives up after max attempts """
+
+        mock = MagicMock(return_value=MockUtils.build_response(503))
+
+        with patch('requests.request', mock):
+            with self.assertRaises(BambouHTTPError):
+                Enterprise(id='4').fetch()
+
+        self.assertEqual(mock.call_count, 3)
+        self.assertEqual(self.session.retry_policy.give_ups, 1)
+
+    def test_retry_connection_error(self):
+        """ GET is sent again after a connection error """
+
+        mock = MagicMock(side_effect=[requests.exceptions.ConnectionError(), MockUtils.build_response(200)])
+
+        with patch('requests.request', mock):
+            (obj, connection) = Enterprise(id='4').fetch()
+
+        self.assertEqual(mock.call_count, 2)
+
+    def test_no_retry_for_post(self):
+        """ POST is not sent again """
+
+        mock = MagicMock(return_value=MockUtils.build_response(503))
+        parent = Enterprise(id='4')
+
+        with patch('requests.request', mock):
+            with self.assertRaises(BambouHTTPError):
+                parent.create_child(Enterprise())
+
+        self.assertEqual(mock.call_count, 1)
@@ -0,0 +1,138 @@
+# -*- coding:utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from mock import patch
+from unittest import TestCase
+
+from bambou import NURESTModelController, NURESTSnapshot
+from bambou.exceptions import InternalConsitencyError
+from bambou.testing import NURESTStandInServer
+from tests.models import Enterprise, Group, Employee, NURESTTestSession
+
+
+class SnapshotTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for model in (Enterprise, Group, Employee):
+            NURESTModelController.register_model(model)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index, 'allowedForwardingClasses': ['A']} for index in range(5)])
+
+        groups = self.server.add_objects('groups', [{'name': 'group-%s' % index} for index in range(3)])
+
+        for index, group in enumerate(groups):
+            self.server.add_objects('users', [{'firstname': 'employee-%s' % employee} for employee in range(index * 2)], parent_id=group['ID'])
+
+        self.session = self._start_session()
+        self.session.root_object.fetch_tree(page_size=2)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def _start_session(self):
+        session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        session.start()
+
+        return session
+
+    def _assert_restored(self, compress):
+        path = os.path.join(self.directory, 'tree.snap')
+        self.session.root_object.enterprises.current_watermark = 1476000000000.5
+
+        self.assertEqual(self.session.snapshot(path, compress=compress), 14)
+
+        session = self._start_session()
+        user = session.root_object
+        request_count = self.server.request_count
+
+        self.assertEqual(session.restore(path), 14)
+        self.assertIsNotNone(user.groups._snapshot)
+
+        self.assertEqual([enterprise.name for enterprise in user.enterprises], ['enterprise-%s' % index for index in range(5)])
+        self.assertEqual(user.enterprises[0].allowed_forwarding_classes, ['A'])
+        self.assertEqual(user.enterprises.current_total_count, 5)
+        self.assertEqual(user.enterprises.current_page, 2)
+        self.assertEqual(user.enterprises.current_watermark, 1476000000000.5)
+        self.assertFalse(user.enterprises[0].is_dirty)
+        self.assertIs(user.enterprises[0].parent, user)
+
+        groups = dict((group.name, group) for group in user.groups)
+        self.assertEqual(sorted(employee.firstname for employee in groups['group-2'].employees), ['employee-%s' % index for index in range(4)])
+        self.assertEqual(len(groups['group-0'].employees), 0)
+        self.assertEqual(self.server.request_count, request_count)
+
+    def test_snapshot_and_restore(self):
+        """ Saved objects are restored with their parent links and pagination state """
+
+        self._assert_restored(compress=False)
+
+    def test_compressed_snapshot(self):
+        """ Compressed snapshots are detected and restored """
+
+        self._assert_restored(compress=True)
+
+    def test_fetch_after_restore(self):
+        """ Fetching after a restore updates the restored objects """
+
+        path = os.path.join(self.directory, 'tree.snap')
+        self.session.snapshot(path)
+
+        session = self._start_session()
+        session.restore(path)
+
+        self.server.add_objects('enterprises', [{'name': 'enterprise-new'}])
+        session.root_object.enterprises.fetch(page_size=10)
+
+        self.assertEqual(len(session.root_object.enterprises), 6)
+
+    def test_modify_before_load(self):
+        """ Restored fetchers are loaded before being modified """
+
+        path = os.path.join(self.directory, 'tree.snap')
+        self.session.snapshot(path)
+
+        session = self._start_session()
+        session.restore(path)
+        enterprises = session.root_object.enterprises
+
+        del enterprises[0]
+        self.assertEqual(enterprises.pop().name, 'enterprise-4')
+        self.assertEqual([enterprise.name for enterprise in enterprises], ['enterprise-%s' % index for index in range(1, 4)])
+
+    def test_failed_save_keeps_snapshot(self):
+        """ A failed save keeps the previous snapshot """
+
+        path = os.path.join(self.directory, 'tree.snap')
+        self.session.snapshot(path)
+
+        with patch.object(Enterprise, 'to_dict', side_effect=ValueError('failure')):
+            with self.assertRaises(ValueError):
+                self.session.snapshot(path)
+
+        self.assertEqual(os.listdir(self.directory), ['tree.snap'])
+        self.assertEqual(self._start_session().restore(path), 14)
+
+    def test_invalid_snapshot(self):
+        """ Files that are not snapshots of the same root are refused """
+
+        path = os.path.join(self.directory, 'invalid.snap')
+
+        with open(path, 'wb') as stream:
+            stream.write('not a snapshot')
+
+        with self.assertRaises(InternalConsitencyError):
+            self.session.restore(path)
+
+        group = self.session.root_object.groups[2]
+        NURESTSnapshot(path).save(group)
+
+        with self.assertRaises(InternalConsitencyError):
+            self.session.restore(path)
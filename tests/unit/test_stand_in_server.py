@@ -0,0 +1,220 @@
+# -*- coding:utf-8 -*-
+
+import requests
+import threading
+import time
+
+from base64 import urlsafe_b64encode
+from mock import patch
+from unittest import TestCase
+
+from bambou import NURESTModelController
+from bambou.exceptions import BambouHTTPError
+from bambou.testing import NURESTStandInServer
+from tests.models import Enterprise, Group, Employee, NURESTTestSession
+
+
+class StandInServerTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for model in (Enterprise, Group, Employee):
+            NURESTModelController.register_model(model)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(password='password', events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index, 'description': 'ent %s' % (index % 3)} for index in range(120)])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_paging_and_count(self):
+        """ Lists are paged and counted """
+
+        (_, _, enterprises) = self.user.enterprises.fetch(page=2, page_size=50)
+
+        self.assertEqual(len(enterprises), 20)
+        self.assertEqual(enterprises[0].name, 'enterprise-100')
+        self.assertEqual(self.user.enterprises.current_total_count, 120)
+        self.assertEqual(self.user.enterprises.get_count(filter='description == "ent 1"'), 40)
+
+    def test_filter_and_order(self):
+        """ Lists are filtered and ordered """
+
+        enterprises = self.user.enterprises.get(filter='description == "ent 2"', order_by='name DESC', page_size=3)
+
+        self.assertEqual([enterprise.name for enterprise in enterprises], ['enterprise-98', 'enterprise-95', 'enterprise-92'])
+
+    def test_create_update_delete(self):
+        """ Objects are created, updated and deleted """
+
+        enterprise = Enterprise(description='created')
+        enterprise.name = 'new'
+        self.user.create_child(enterprise)
+
+        self.assertIsNotNone(enterprise.id)
+        self.assertIsNotNone(enterprise.creation_date)
+        self.assertEqual(self.server.get_object(enterprise.id)['name'], 'new')
+
+        enterprise.description = 'updated'
+        enterprise.save()
+
+        self.assertEqual(self.server.get_object(enterprise.id)['description'], 'updated')
+
+        (_, connection) = enterprise.delete(response_choice=None)
+
+        self.assertEqual(connection.response.status_code, 204)
+        self.assertIsNone(self.server.get_object(enterprise.id))
+
+    def test_children_and_assign(self):
+        """ Children are stored under their parent and can be assigned """
+
+        group = Group()
+        group.name = 'group'
+        self.user.create_child(group)
+
+        employee = Employee(firstname='John')
+        group.create_child(employee)
+        other = Employee(firstname='Jane')
+        self.server.add_objects('users', [{'ID': 'jane', 'firstname': 'Jane'}])
+        other.id = 'jane'
+
+        group.assign([other], Employee)
+
+        employees = group.employees.get()
+
+        self.assertEqual([e.firstname for e in employees], ['John', 'Jane'])
+        self.assertEqual(employees[0].parent_id, group.id)
+        self.assertEqual(employees[0].parent_type, 'group')
+
+        group.delete()
+
+        self.assertIsNone(self.server.get_object(employee.id))
+        self.assertIsNotNone(self.server.get_object('jane'))
+
+    def test_validation(self):
+        """ Invalid objects are refused with a 409 response """
+
+        enterprise = Enterprise(description='no name')
+        enterprise.name = None
+
+        with self.assertRaises(BambouHTTPError) as context:
+            self.user.create_child(enterprise)
+
+        self.assertEqual(context.exception.connection.response.status_code, 409)
+        self.assertEqual(context.exception.connection.response.errors[0]['property'], 'name')
+
+    def test_unknown_resource(self):
+        """ Resources without registered model are not found """
+
+        with self.assertRaises(ValueError):
+            self.server.add_objects('unknowns', [{}])
+
+    def test_injected_errors(self):
+        """ Errors can be injected """
+
+        self.server.fail_next(status_code=503)
+
+        with self.assertRaises(BambouHTTPError) as context:
+            self.user.enterprises.fetch()
+
+        self.assertEqual(context.exception.connection.response.status_code, 503)
+        self.assertEqual(len(self.user.enterprises.get(page_size=10)), 10)
+
+    def test_authentication(self):
+        """ API keys are checked and can expire """
+
+        url = '%s/api/v3_2/enterprises' % self.server.url
+        headers = {'Authorization': 'XREST %s' % urlsafe_b64encode('user:%s' % self.session.login_controller.api_key)}
+
+        self.assertEqual(requests.get(url, headers=headers).status_code, 200)
+
+        self.server.expire_api_key()
+
+        self.assertEqual(requests.get(url, headers=headers).status_code, 419)
+        self.assertEqual(requests.get('%s/api/v3_2/me' % self.server.url, headers={'Authorization': 'XREST %s' % urlsafe_b64encode('user:wrong')}).status_code, 401)
+
+    def test_reauthentication(self):
+        """ Concurrent requests with an expired API key log in again only once """
+
+        api_key = self.session.login_controller.api_key
+        self.server.expire_api_key()
+
+        results = list()
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def did_fetch(fetcher, parent, enterprises):
+            with lock:
+                results.append(len(enterprises) if enterprises is not None else None)
+
+                if len(results) == 8:
+                    done.set()
+
+        users = [self.user.copy() for index in range(8)]
+
+        for user in users:
+            user.enterprises.fetch(page_size=5, commit=False, async=True, callback=did_fetch)
+
+        done.wait(10)
+
+        self.assertEqual(results, [5] * 8)
+        self.assertEqual(self.session.reauthentication_count, 1)
+        self.assertNotEqual(self.session.login_controller.api_key, api_key)
+        self.assertFalse(self.session.reauthenticate(expired_api_key=api_key))
+
+    def test_reauthentication_keeps_api_key(self):
+        """ The expired API key is kept until the new one replaces it """
+
+        api_key = self.session.login_controller.api_key
+        self.server.expire_api_key()
+
+        keys = list()
+        create_root_object = self.session.create_root_object
+
+        def create_recording_root_object():
+            root_object = create_root_object()
+            fetch = root_object.fetch
+
+            def recording_fetch(*args, **kwargs):
+                keys.append(self.session.login_controller.api_key)
+                return fetch(*args, **kwargs)
+
+            root_object.fetch = recording_fetch
+            return root_object
+
+        with patch.object(self.session, 'create_root_object', create_recording_root_object):
+            self.assertTrue(self.session.reauthenticate(expired_api_key=api_key))
+
+        self.assertEqual(keys, [api_key])
+        self.assertIs(self.session.root_object, self.user)
+        self.assertNotEqual(self.session.login_controller.api_key, api_key)
+        self.assertEqual(self.user.api_key, self.session.login_controller.api_key)
+
+    def test_push_events(self):
+        """ Changes generate push events """
+
+        push_center = self.session.push_center
+        push_center.start()
+
+        try:
+            enterprise = Enterprise(description='created')
+            enterprise.name = 'pushed'
+            self.user.create_child(enterprise)
+
+            events = list()
+            deadline = time.time() + 5
+
+            while not events and time.time() < deadline:
+                events = push_center.get_last_events()
+                time.sleep(0.01)
+        finally:
+            push_center.stop()
+
+        self.assertEqual(events[0]['type'], 'CREATE')
+        self.assertEqual(events[0]['entityType'], 'enterprise')
+        self.assertEqual(events[0]['entities'][0]['name'], 'pushed')
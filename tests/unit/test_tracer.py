@@ -0,0 +1,226 @@
+# -*- coding:utf-8 -*-
+
+import json
+import os
+import tempfile
+import threading
+
+from unittest import TestCase
+from mock import patch, MagicMock
+
+from bambou import NURESTTracer, NURESTSpanExporter, NURESTJSONFileSpanExporter
+from tests import start_session
+from tests.models import Enterprise, Group, Employee, User
+from tests.utils import MockUtils
+
+
+class RecordingExporter(NURESTSpanExporter):
+
+    def __init__(self):
+        self.spans = list()
+        self.is_shutdown = False
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        self.is_shutdown = True
+
+
+class TracerTests(TestCase):
+
+    def setUp(self):
+        self.tracer = NURESTTracer()
+        self.exporter = RecordingExporter()
+
+    def test_disabled_tracer(self):
+        """ Spans are not recorded without exporters """
+
+        with self.tracer.start_span('operation') as span:
+            self.assertIsNone(self.tracer.get_current_span())
+
+        self.assertIs(span, NURESTTracer.NOOP_SPAN)
+
+    def test_nested_spans(self):
+        """ Spans started in a span block are its children """
+
+        self.tracer.add_exporter(self.exporter)
+
+        with self.tracer.start_span('parent', key='value') as parent:
+            self.assertIs(self.tracer.get_current_span(), parent)
+
+            with self.tracer.start_span('child') as child:
+                child.set_attribute('count', 2)
+
+        self.assertIsNone(self.tracer.get_current_span())
+        self.assertEqual([span.name for span in self.exporter.spans], ['child', 'parent'])
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertEqual(child.parent_id, parent.span_id)
+        self.assertIsNone(parent.parent_id)
+        self.assertEqual(parent.attributes, {'key': 'value'})
+        self.assertEqual(child.attributes, {'count': 2})
+        self.assertTrue(parent.duration >= child.duration)
+
+    def test_span_error(self):
+        """ Exceptions raised in a span block are recorded """
+
+        self.tracer.add_exporter(self.exporter)
+
+        with self.assertRaises(ValueError):
+            with self.tracer.start_span('operation'):
+                raise ValueError('boom')
+
+        self.assertEqual(self.exporter.spans[0].error, 'ValueError: boom')
+
+    def test_activate(self):
+        """ Activated spans are not ended """
+
+        self.tracer.add_exporter(self.exporter)
+        span = self.tracer.start_span('operation')
+
+        with self.tracer.activate(span):
+            self.assertIs(self.tracer.get_current_span(), span)
+
+        self.assertFalse(span.is_ended)
+        self.assertEqual(self.exporter.spans, [])
+
+        span.end()
+        span.end()
+
+        self.assertEqual(self.exporter.spans, [span])
+
+    def test_remove_exporter(self):
+        """ Removed exporters are shut down """
+
+        self.tracer.add_exporter(self.exporter)
+        self.tracer.remove_exporter(self.exporter)
+
+        self.assertTrue(self.exporter.is_shutdown)
+        self.assertFalse(self.tracer.is_enabled())
+
+    def test_json_file_exporter(self):
+        """ JSON file exporter writes one span per line """
+
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        exporter = NURESTJSONFileSpanExporter(path)
+        self.tracer.add_exporter(exporter)
+
+        try:
+            with self.tracer.start_span('parent'):
+                with self.tracer.start_span('child', url='https://vsd'):
+                    pass
+
+            self.tracer.remove_exporter(exporter)
+
+            with open(path) as f:
+                spans = [json.loads(line) for line in f]
+        finally:
+            os.remove(path)
+
+        self.assertEqual([span['name'] for span in spans], ['child', 'parent'])
+        self.assertEqual(spans[0]['parent_id'], spans[1]['span_id'])
+        self.assertEqual(spans[0]['attributes'], {'url': 'https://vsd'})
+
+
+class TracerConnectionTests(TestCase):
+
+    def setUp(self):
+        start_session()
+        self.exporter = RecordingExporter()
+        NURESTTracer.get_default_tracer().add_exporter(self.exporter)
+
+    def tearDown(self):
+        NURESTTracer.get_default_tracer().remove_exporter(self.exporter)
+
+    def test_fetch_spans(self):
+        """ Fetching creates a fetch span and an http child span """
+
+        user = User()
+        mock = MockUtils.create_mock_response(status_code=200, data=[Enterprise(id='1'), Enterprise(id='2')])
+
+        with patch('requests.request', mock):
+            (fetcher, parent, children) = user.enterprises.fetch(page=1)
+
+        http_span, fetch_span = self.exporter.spans
+
+        self.assertEqual(fetch_span.name, 'fetch')
+        self.assertEqual(fetch_span.attributes['resource'], 'enterprises')
+        self.assertEqual(fetch_span.attributes['page'], 1)
+        self.assertEqual(fetch_span.attributes['count'], 2)
+        self.assertIn('build_time', fetch_span.attributes)
+
+        self.assertEqual(http_span.name, 'http')
+        self.assertEqual(http_span.parent_id, fetch_span.span_id)
+        self.assertEqual(http_span.trace_id, fetch_span.trace_id)
+        self.assertEqual(http_span.attributes['method'], 'GET')
+        self.assertEqual(http_span.attributes['status_code'], 200)
+        self.assertEqual(http_span.attributes['transaction_id'], fetcher.current_connection.transaction_id)
+        self.assertTrue(http_span.attributes['response_size'] > 0)
+        self.assertIn('network_time', http_span.attributes)
+        self.assertIn('decode_time', http_span.attributes)
+
+    def test_save_error_span(self):
+        """ Failed operations are recorded """
+
+        enterprise = Enterprise(id='4')
+        enterprise.description = 'changed'
+        mock = MockUtils.create_mock_response(status_code=500, data={})
+
+        with patch('requests.request', mock):
+            with self.assertRaises(Exception):
+                enterprise.save()
+
+        http_span, save_span = self.exporter.spans
+
+        self.assertEqual(save_span.name, 'put')
+        self.assertEqual(save_span.attributes['id'], '4')
+        self.assertEqual(http_span.attributes['status_code'], 500)
+        self.assertTrue(save_span.error.startswith('BambouHTTPError'))
+
+    def test_async_fetch_links_child_fetches(self):
+        """ Fetches made from an asynchronous callback are children of the fetch """
+
+        user = User()
+        done = threading.Event()
+        group_mock = MockUtils.create_mock_response(status_code=200, data=[Group(id='1')])
+        employee_mock = MockUtils.create_mock_response(status_code=200, data=[Employee(id='2')])
+
+        def did_fetch_groups(fetcher, parent, groups):
+            with patch('requests.request', employee_mock):
+                groups[0].employees.fetch()
+            done.set()
+
+        with patch('requests.request', group_mock):
+            user.groups.fetch(async=True, callback=did_fetch_groups)
+            done.wait(5)
+
+        for i in range(100):
+            if len(self.exporter.spans) == 4:
+                break
+            threading.Event().wait(0.01)
+
+        spans = dict((span.attributes.get('resource', span.name) + ':' + span.name, span) for span in self.exporter.spans)
+        groups_span = spans['groups:fetch']
+        employees_span = spans['users:fetch']
+
+        self.assertEqual(len(self.exporter.spans), 4)
+        self.assertEqual(employees_span.parent_id, groups_span.span_id)
+        self.assertEqual(employees_span.trace_id, groups_span.trace_id)
+        self.assertEqual(spans['users:http'].parent_id, employees_span.span_id)
+        self.assertEqual(spans['groups:http'].parent_id, groups_span.span_id)
+
+    def test_response_choice_without_exporter(self):
+        """ Requests sent again after a 300 response work without exporter """
+
+        NURESTTracer.get_default_tracer().remove_exporter(self.exporter)
+
+        enterprise = Enterprise(id='4')
+        responses = [MockUtils.create_mock_response(status_code=300, data={}).return_value,
+                     MockUtils.create_mock_response(status_code=200, data={}).return_value]
+
+        with patch('requests.request', MagicMock(side_effect=responses)):
+            (_, connection) = enterprise.delete(response_choice=None)
+
+        self.assertEqual(connection.response.status_code, 200)
+        self.assertEqual(self.exporter.spans, [])
@@ -0,0 +1,96 @@
+# -*- coding:utf-8 -*-
+
+import threading
+
+from unittest import TestCase
+
+from bambou import NURESTModelController, NURESTTreeFetcher
+from bambou.exceptions import BambouHTTPError
+from bambou.testing import NURESTStandInServer
+from tests.models import Enterprise, Group, Employee, NURESTTestSession
+
+
+class TreeFetcherTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        for model in (Enterprise, Group, Employee):
+            NURESTModelController.register_model(model)
+
+    def setUp(self):
+        self.server = NURESTStandInServer(events_timeout=0.1).start()
+        self.server.add_objects('enterprises', [{'name': 'enterprise-%s' % index} for index in range(5)])
+
+        groups = self.server.add_objects('groups', [{'name': 'group-%s' % index} for index in range(3)])
+
+        for index, group in enumerate(groups):
+            self.server.add_objects('users', [{'firstname': 'employee-%s' % employee} for employee in range(index * 2)], parent_id=group['ID'])
+
+        self.session = NURESTTestSession(username='user', password='password', enterprise='enterprise', api_url=self.server.url, api_prefix='api', version='3.2')
+        self.session.start()
+        self.user = self.session.root_object
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_fetch_tree(self):
+        """ All levels and pages are fetched and attached to their parent """
+
+        progress = list()
+        lock = threading.Lock()
+
+        def did_progress(level, fetched, total):
+            with lock:
+                progress.append((level, fetched, total))
+
+        levels = self.user.fetch_tree(concurrency=3, page_size=2, progress_callback=did_progress)
+
+        self.assertEqual(len(self.user.enterprises), 5)
+        self.assertEqual(self.user.enterprises.current_total_count, 5)
+        self.assertEqual(sorted(len(group.employees) for group in self.user.groups), [0, 2, 4])
+
+        self.assertEqual([(level['level'], level['parents'], level['objects']) for level in levels], [(1, 1, 8), (2, 8, 6)])
+        self.assertEqual(levels[0]['requests'], 5)
+        self.assertEqual(sorted(progress), [(1, 1, 2), (1, 2, 2), (2, 1, 3), (2, 2, 3), (2, 3, 3)])
+
+    def test_fetch_tree_with_child_types_and_depth(self):
+        """ Only selected children are fetched, up to the given depth """
+
+        levels = self.user.fetch_tree(child_types=[Group], depth=1)
+
+        self.assertEqual(len(levels), 1)
+        self.assertEqual(len(self.user.groups), 3)
+        self.assertEqual(len(self.user.enterprises), 0)
+        self.assertEqual([len(group.employees) for group in self.user.groups], [0, 0, 0])
+
+    def test_fetch_tree_skips_member_fetchers(self):
+        """ Only child fetchers are used without child types """
+
+        self.user.enterprises.relationship = 'member'
+        levels = self.user.fetch_tree()
+
+        self.assertEqual([(level['level'], level['parents'], level['objects']) for level in levels], [(1, 1, 3), (2, 3, 6)])
+        self.assertEqual(len(self.user.enterprises), 0)
+
+    def test_fetch_tree_cycle(self):
+        """ Objects already fetched are not explored again """
+
+        user = self.user
+
+        class CyclicTreeFetcher(NURESTTreeFetcher):
+
+            def get_fetchers(self, nurest_object):
+                return [user.groups]
+
+        levels = CyclicTreeFetcher().fetch(self.user)
+
+        self.assertEqual([(level['level'], level['parents'], level['requests'], level['objects']) for level in levels], [(1, 1, 1, 3), (2, 3, 1, 0)])
+        self.assertEqual(len(self.user.groups), 3)
+
+    def test_fetch_tree_error(self):
+        """ Errors stop the fetch and are raised """
+
+        self.server.fail_next(status_code=500)
+
+        with self.assertRaises(BambouHTTPError):
+            self.user.fetch_tree(child_types=['enterprise'], concurrency=1)
@@ -38,6 +38,25 @@ class MockUtils(object):
 
         return MagicMock(return_value=response)
 
+    @classmethod
+    def build_response(cls, status_code, headers=None):
+        """ Build a fake requests response with an empty JSON object
+
+            Args:
+                status_code: the status code
+                headers: a dictionary of headers to add
+
+        """
+
+        response = Response()
+        response.status_code = status_code
+        response._content = '{}'
+
+        if headers:
+            response.headers.update(headers)
+
+        return response
+
     @classmethod
     def get_mock_parameter(cls, mock, name):
         """ Get the argument of a mock call